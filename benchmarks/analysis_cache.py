@@ -0,0 +1,37 @@
+"""Run every analysis twice on a synthetic snapshot, with an empty and with a filled analysis cache.
+
+Run from the repository root: `python -m benchmarks.analysis_cache --pages 3000`
+"""
+import argparse
+import os
+import tempfile
+import time
+
+import main as cli
+import website_analyser.shared.binary_snapshot
+from benchmarks.synthetic import synthetic_graph
+
+COMMANDS = ("metrics", "dead_links", "most_linked", "distances")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--pages", type=int, default=3000)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as directory:
+        snapshot_path = os.path.join(directory, f"site{website_analyser.shared.binary_snapshot.EXTENSION}")
+        website_analyser.shared.binary_snapshot.save(synthetic_graph(args.pages), snapshot_path)
+        run_cli = cli.RunCLI(analysis_cache=os.path.join(directory, "analysis.sqlite"))
+        print(f"pages={args.pages}")
+        for command in COMMANDS:
+            times = []
+            for _ in range(2):
+                start = time.perf_counter()
+                getattr(run_cli.analyse, command)(snapshot_path)
+                times.append(time.perf_counter() - start)
+            print(f"{command:<12} computed={times[0]:8.3f}s cached={times[1] * 1000:8.1f}ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,35 @@
+"""Crawl a local synthetic site with increasing concurrency and report throughput.
+
+Run from the repository root: `python -m benchmarks.crawl_concurrency --pages=300 --latency=0.02`
+"""
+import argparse
+import time
+
+import website_analyser.parsing.crawler
+from benchmarks.local_site import LocalSite
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--pages", type=int, default=300)
+    parser.add_argument("--links", type=int, default=8)
+    parser.add_argument("--latency", type=float, default=0.02)
+    parser.add_argument("--levels", type=int, nargs="+", default=[1, 2, 4, 8, 16, 32])
+    args = parser.parse_args()
+
+    with LocalSite(args.pages, args.links, args.latency) as site:
+        baseline = None
+        for concurrency in args.levels:
+            crawler = website_analyser.parsing.crawler.Crawler(site.starting_url, concurrency=concurrency)
+            start = time.perf_counter()
+            webpages = crawler.get_webpages()
+            elapsed = time.perf_counter() - start
+            baseline = baseline or elapsed
+            print(
+                f"concurrency={concurrency:<4} pages={len(webpages):<6} time={elapsed:8.3f}s "
+                f"pages/s={len(webpages) / elapsed:8.1f} speedup={baseline / elapsed:5.1f}x"
+            )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,55 @@
+"""Recrawl a local synthetic site after changing a share of its pages, from scratch and incrementally.
+
+Run from the repository root: `python -m benchmarks.incremental --pages 1000 --changed 0.05`
+"""
+import argparse
+import random
+import time
+
+import website_analyser.analysing.diff
+import website_analyser.parsing.crawler
+import website_analyser.parsing.fetcher
+import website_analyser.shared.website
+from benchmarks.local_site import LocalSite
+
+Website = website_analyser.shared.website.Website
+
+
+def crawl(site: LocalSite, previous: Website = None):
+    with website_analyser.parsing.fetcher.Fetcher() as fetcher:
+        crawler = website_analyser.parsing.crawler.Crawler(site.starting_url, fetcher=fetcher, previous=previous)
+        start = time.perf_counter()
+        website = Website(crawler.get_webpages())
+        elapsed = time.perf_counter() - start
+    return website, elapsed, fetcher.bytes_count, crawler.not_modified_count
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--pages", type=int, default=1000)
+    parser.add_argument("--links", type=int, default=30)
+    parser.add_argument("--latency", type=float, default=0.005)
+    parser.add_argument("--changed", type=float, default=0.05)
+    args = parser.parse_args()
+
+    with LocalSite(args.pages, args.links, args.latency) as site:
+        previous, _, _, _ = crawl(site)
+        # round trip through JSON, the way a previous structure is loaded
+        previous = Website.from_records(Website.webpage_to_dict(page) for page in previous.webpages)
+        site.change_pages(random.Random(0).sample(range(args.pages), int(args.pages * args.changed)))
+        full, full_time, full_bytes, _ = crawl(site)
+        incremental, incremental_time, incremental_bytes, not_modified = crawl(site, previous)
+
+    diff = website_analyser.analysing.diff.WebsiteDiff.between(previous, incremental)
+    is_same = website_analyser.analysing.diff.WebsiteDiff.between(full, incremental).is_empty
+    print(f"pages={len(full.webpages)} changed={args.changed:.0%} incremental equals full recrawl: {is_same}")
+    print(f"full        time={full_time:7.2f}s bytes={full_bytes}")
+    print(
+        f"incremental time={incremental_time:7.2f}s bytes={incremental_bytes} not modified={not_modified} "
+        f"({full_time / incremental_time:.1f}x faster, {full_bytes / max(incremental_bytes, 1):.1f}x fewer bytes)"
+    )
+    print(f"diff: {diff.summary()}")
+
+
+if __name__ == "__main__":
+    main()
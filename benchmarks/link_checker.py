@@ -0,0 +1,114 @@
+"""Check outbound links spread over several local hosts, one by one, concurrently and again from the status cache.
+
+Run from the repository root: `python -m benchmarks.link_checker --links 2000 --hosts 8 --latency 0.02`
+"""
+import argparse
+import http.server
+import os
+import random
+import tempfile
+import threading
+import time
+from typing import List
+
+import website_analyser.parsing.fetcher
+import website_analyser.parsing.link_checker
+
+LinkChecker = website_analyser.parsing.link_checker.LinkChecker
+
+
+class ExternalSiteHandler(http.server.BaseHTTPRequestHandler):
+    """`/dead/...` pages are missing, `/nohead/...` pages refuse HEAD, the rest exist."""
+    latency: float = 0.02
+    protocol_version = "HTTP/1.1"
+
+    def do_HEAD(self) -> None:  # noqa
+        time.sleep(self.latency)
+        if self.path.startswith("/nohead/"):
+            self.send_error(405)
+        else:
+            self._send_headers()
+
+    def do_GET(self) -> None:  # noqa
+        time.sleep(self.latency)
+        body = self._send_headers()
+        if body:
+            self.wfile.write(body)
+
+    def _send_headers(self) -> bytes:
+        status = 404 if self.path.startswith("/dead/") else 200
+        body = b"<html></html>" if status == 200 else b""
+        self.send_response(status)
+        self.send_header("content-type", "text/html")
+        self.send_header("content-length", str(len(body)))
+        self.end_headers()
+        return body
+
+    def log_message(self, *args) -> None:
+        pass
+
+
+class QuietServer(http.server.ThreadingHTTPServer):
+    daemon_threads = True
+
+    def handle_error(self, request, client_address) -> None:
+        """Clients drop connections of responses they don't read, which is expected here."""
+
+
+def start_hosts(hosts: int, latency: float) -> List[QuietServer]:
+    handler = type("Handler", (ExternalSiteHandler, ), {"latency": latency})
+    servers = []
+    for _ in range(hosts):
+        server = QuietServer(("127.0.0.1", 0), handler)
+        threading.Thread(target=server.serve_forever, daemon=True).start()
+        servers.append(server)
+    return servers
+
+
+def run(name: str, checker: LinkChecker, links: List[str]) -> None:
+    start = time.perf_counter()
+    statuses = checker.check(links)
+    elapsed = time.perf_counter() - start
+    dead = sum(status != 200 for status in statuses.values())
+    print(
+        f"{name:<22} time={elapsed:7.2f}s links={len(statuses)} dead={dead} "
+        f"requests={checker.fetcher.requests_count} from cache={checker.cached_count}"
+    )
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--links", type=int, default=2000)
+    parser.add_argument("--hosts", type=int, default=8)
+    parser.add_argument("--latency", type=float, default=0.02)
+    parser.add_argument("--sequential_links", type=int, default=200)
+    args = parser.parse_args()
+
+    servers = start_hosts(args.hosts, args.latency)
+    rng = random.Random(0)
+    # every link appears twice, as outbound links repeat across pages
+    links = [
+        f"http://127.0.0.1:{rng.choice(servers).server_address[1]}/{rng.choice(['ok', 'ok', 'dead', 'nohead'])}/{index}"
+        for index in range(args.links)
+    ] * 2
+    try:
+        with tempfile.TemporaryDirectory() as directory:
+            cache_path = os.path.join(directory, "links.sqlite")
+            print(f"links={len(set(links))} hosts={args.hosts} latency={args.latency}s")
+            with website_analyser.parsing.fetcher.Fetcher() as fetcher:
+                sequential_links = links[:args.sequential_links]
+                name = f"sequential ({len(sequential_links)} links)"
+                run(name, LinkChecker(fetcher, concurrency=1), sequential_links)
+            for name in ("concurrent", "concurrent, cached"):
+                cache = website_analyser.parsing.link_checker.LinkStatusCache(cache_path)
+                with website_analyser.parsing.fetcher.Fetcher(pool_size=4) as fetcher:
+                    run(name, LinkChecker(fetcher, cache, concurrency=32, per_host_concurrency=4), links)
+                cache.close()
+    finally:
+        for server in servers:
+            server.shutdown()
+            server.server_close()
+
+
+if __name__ == "__main__":
+    main()
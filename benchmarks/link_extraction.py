@@ -0,0 +1,64 @@
+"""Compare link extractors over a corpus of saved pages.
+
+Run from the repository root: `python -m benchmarks.link_extraction --corpus=path/to/saved/pages`
+Without `--corpus` a synthetic corpus is generated.
+"""
+import argparse
+import pathlib
+import random
+import time
+from typing import List
+
+import website_analyser.parsing.links
+
+
+def synthetic_corpus(pages: int, seed: int = 0) -> List[str]:
+    rng = random.Random(seed)
+    corpus = []
+    for page_no in range(pages):
+        paragraphs = "".join(
+            f"<div class='row'><p id='p{i}'>Lorem <b>ipsum</b> dolor sit amet &amp; more text {i}</p>"
+            f"<a href='/page/{rng.randrange(10_000)}' class='link'>link</a><img src='/img/{i}.png' alt=''></div>"
+            for i in range(rng.randrange(50, 400))
+        )
+        nav = "".join(f"<li><a href='/section/{i}'>Section {i}</a></li>" for i in range(40))
+        corpus.append(
+            f"<!DOCTYPE html><html><head><title>{page_no}</title><script>var x = '<a href=no>';</script></head>"
+            f"<body><nav><ul>{nav}</ul></nav><main>{paragraphs}</main><!-- <a href='/commented'> --></body></html>"
+        )
+    return corpus
+
+
+def load_corpus(directory: str) -> List[str]:
+    return [
+        path.read_text(errors="replace")
+        for path in sorted(pathlib.Path(directory).rglob("*"))
+        if path.is_file() and path.suffix.lower() in (".html", ".htm")
+    ]
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--corpus", type=str, default=None)
+    parser.add_argument("--pages", type=int, default=200)
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    corpus = load_corpus(args.corpus) if args.corpus else synthetic_corpus(args.pages)
+    megabytes = sum(len(page) for page in corpus) / 2 ** 20
+    print(f"corpus: {len(corpus)} pages, {megabytes:.1f}MiB")
+    timings = {}
+    results = {}
+    for name, extractor in website_analyser.parsing.links.LINK_EXTRACTORS.items():
+        best = float("inf")
+        for _ in range(args.repeat):
+            start = time.perf_counter()
+            results[name] = [extractor(page) for page in corpus]
+            best = min(best, time.perf_counter() - start)
+        timings[name] = best
+        print(f"{name:<6} {best:8.3f}s {megabytes / best:8.1f}MiB/s")
+    print(f"speedup fast/bs4: {timings['bs4'] / timings['fast']:.1f}x, same links: {results['fast'] == results['bs4']}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,88 @@
+"""Compare link queries answered by scanning all links with ones answered from the LinkIndex.
+
+Run from the repository root: `python -m benchmarks.link_index --pages 100000 --queries 20`
+"""
+import argparse
+import time
+from typing import Callable, Dict, List, Tuple
+
+import website_analyser.shared.compact_website
+from benchmarks.synthetic import synthetic_graph
+
+CompactWebsite = website_analyser.shared.compact_website.CompactWebsite
+FROM_DOMAIN = website_analyser.shared.compact_website.FROM_DOMAIN
+FROM_DOMAIN_SPACE = website_analyser.shared.compact_website.FROM_DOMAIN_SPACE
+NO_VALUE = website_analyser.shared.compact_website.NO_VALUE
+
+
+def scan_dead_links(graph: CompactWebsite) -> List[Tuple[int, int]]:
+    """How Explorer used to find dead links: checking every link."""
+    is_dead = [status not in (NO_VALUE, 200) for status in graph.status_codes]
+    return [(page, linked) for page in range(graph.size) for linked in graph.successors(page) if is_dead[linked]]
+
+
+def scan_times_linked(graph: CompactWebsite) -> Dict[int, int]:
+    is_counted = graph.flag_mask(FROM_DOMAIN)
+    counts = {page: 0 for page in range(graph.size) if is_counted[page]}
+    for page in counts:
+        for linked in graph.successors(page):
+            if is_counted[linked]:
+                counts[linked] += 1
+    return counts
+
+
+def scan_links_counts(graph: CompactWebsite) -> List[List[int]]:
+    """How MetricsReporter used to count links to domain, domain space and external pages: a pass for each."""
+    is_from_domain = graph.flag_mask(FROM_DOMAIN)
+    is_from_dom_space = graph.flag_mask(FROM_DOMAIN_SPACE)
+    is_external = [not domain and not dom_space for domain, dom_space in zip(is_from_domain, is_from_dom_space)]
+    return [
+        [sum(1 for linked in graph.successors(page) if accepted[linked]) for page in range(graph.size)]
+        for accepted in (is_from_domain, is_from_dom_space, is_external)
+    ]
+
+
+def index_dead_links(graph: CompactWebsite) -> List[Tuple[int, int]]:
+    return sorted((page, linked) for linked in graph.link_index.dead_pages for page in graph.predecessors(linked))
+
+
+def index_times_linked(graph: CompactWebsite) -> Dict[int, int]:
+    times_linked = graph.link_index.in_degrees[website_analyser.shared.compact_website.DOMAIN]
+    return {page: times_linked[page] for page in range(graph.size) if graph.has_flag(page, FROM_DOMAIN)}
+
+
+def index_links_counts(graph: CompactWebsite) -> List[List[int]]:
+    return [list(graph.link_index.out_degrees[category]) for category in ("domain", "domain_space", "external")]
+
+
+def measure(function: Callable[[CompactWebsite], object], graph: CompactWebsite, queries: int) -> float:
+    start = time.perf_counter()
+    for _ in range(queries):
+        function(graph)
+    return (time.perf_counter() - start) / queries
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--pages", type=int, default=100_000)
+    parser.add_argument("--queries", type=int, default=20)
+    args = parser.parse_args()
+
+    graph = synthetic_graph(args.pages)
+    print(f"graph: {graph.size} pages, {graph.edges_count} links")
+    start = time.perf_counter()
+    graph.link_index
+    print(f"index built in {time.perf_counter() - start:.2f}s (reverse adjacency included)")
+    for name, scan, indexed in (
+            ("dead links", scan_dead_links, index_dead_links),
+            ("times linked", scan_times_linked, index_times_linked),
+            ("links counts", scan_links_counts, index_links_counts),
+    ):
+        if scan(graph) != indexed(graph):
+            raise RuntimeError(f"Indexed {name} differ from scanned ones")
+        scanned, looked_up = measure(scan, graph, args.queries), measure(indexed, graph, args.queries)
+        print(f"{name:<13} scan={scanned * 1000:9.1f}ms index={looked_up * 1000:9.1f}ms ({scanned / looked_up:.0f}x)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,89 @@
+import http.server
+import random
+import threading
+import time
+import zlib
+from typing import Dict, Iterable, List, Optional
+
+
+class SyntheticSiteHandler(http.server.BaseHTTPRequestHandler):
+    pages: int = 200
+    links_per_page: int = 8
+    latency: float = 0.02
+    seed: int = 0
+    revisions: Dict[int, int] = {}
+
+    def do_GET(self) -> None:  # noqa
+        time.sleep(self.latency)
+        if not self.path.startswith("/page/"):
+            self.send_error(404)
+            return
+        try:
+            page_no = int(self.path.rsplit("/", 1)[-1])
+        except ValueError:
+            self.send_error(404)
+            return
+        if not 0 <= page_no < self.pages:
+            self.send_error(404)
+            return
+        body = self.render_page(page_no).encode()
+        etag = f'"{zlib.crc32(body):08x}"'
+        if self.headers.get("if-none-match") == etag:
+            self.send_response(304)
+            self.send_header("etag", etag)
+            self.end_headers()
+            return
+        self.send_response(200)
+        self.send_header("content-type", "text/html; charset=utf-8")
+        self.send_header("content-length", str(len(body)))
+        self.send_header("etag", etag)
+        self.end_headers()
+        self.wfile.write(body)
+
+    def render_page(self, page_no: int) -> str:
+        host, port = self.server.server_address[:2]
+        links = "".join(
+            f'<li><a href="http://{host}:{port}/page/{linked}">{linked}</a></li>' for linked in self.links(page_no)
+        )
+        return f"<html><head><title>{page_no}</title></head><body><ul>{links}</ul></body></html>"
+
+    def links(self, page_no: int) -> List[int]:
+        rng = random.Random(self.seed * 1_000_003 + page_no + self.revisions.get(page_no, 0) * 1_000_000_007)
+        return [(page_no + 1) % self.pages] + [rng.randrange(self.pages) for _ in range(self.links_per_page - 1)]
+
+    def log_message(self, *args) -> None:
+        pass
+
+
+class LocalSite:
+    """Serves a synthetic, deterministic website on localhost in a background thread."""
+
+    def __init__(self, pages: int = 200, links_per_page: int = 8, latency: float = 0.02) -> None:
+        handler = type(
+            "Handler",
+            (SyntheticSiteHandler, ),
+            {"pages": pages, "links_per_page": links_per_page, "latency": latency, "revisions": {}},
+        )
+        self.revisions: Dict[int, int] = handler.revisions
+        self.server = http.server.ThreadingHTTPServer(("127.0.0.1", 0), handler)
+        self.server.daemon_threads = True
+        self._thread: Optional[threading.Thread] = None
+
+    def change_pages(self, page_nos: Iterable[int]) -> None:
+        """Gives the pages new links (and ETags)."""
+        for page_no in page_nos:
+            self.revisions[page_no] = self.revisions.get(page_no, 0) + 1
+
+    @property
+    def starting_url(self) -> str:
+        host, port = self.server.server_address[:2]
+        return f"http://{host}:{port}/page/0"
+
+    def __enter__(self) -> 'LocalSite':
+        self._thread = threading.Thread(target=self.server.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.server.shutdown()
+        self.server.server_close()
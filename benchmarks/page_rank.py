@@ -0,0 +1,36 @@
+"""Measure PageRank, strongly connected components and orphans detection on a synthetic website.
+
+Run from the repository root: `python -m benchmarks.page_rank --pages 100000`
+"""
+import argparse
+import time
+
+import website_analyser.analysing.explorer
+import website_analyser.analysing.paths
+import website_analyser.analysing.ranking
+from benchmarks.synthetic import synthetic_graph
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--pages", type=int, default=100_000)
+    parser.add_argument("--tolerance", type=float, default=website_analyser.analysing.ranking.TOLERANCE)
+    args = parser.parse_args()
+
+    graph = synthetic_graph(args.pages)
+    print(f"graph: {graph.size} pages, {graph.edges_count} links")
+    start = time.perf_counter()
+    page_ranks = website_analyser.analysing.ranking.PageRank(tolerance=args.tolerance).rank(graph)
+    print(f"page rank     {time.perf_counter() - start:6.2f}s, {page_ranks.iterations} iterations, "
+          f"last change {page_ranks.delta:.1e}")
+    explorer = website_analyser.analysing.explorer.Explorer(graph, website_analyser.analysing.paths.Paths(graph))
+    start = time.perf_counter()
+    components = explorer.get_components()
+    print(f"components    {time.perf_counter() - start:6.2f}s, {components}")
+    start = time.perf_counter()
+    orphans = explorer.get_orphans()
+    print(f"orphans       {time.perf_counter() - start:6.2f}s, {len(orphans)} pages")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,47 @@
+"""Measure scaling of all-sources BFS summaries with the number of worker processes.
+
+Run from the repository root: `python -m benchmarks.parallel_paths --pages=50000 --sources=2000`
+"""
+import argparse
+import os
+import time
+
+import website_analyser.analysing.paths
+from benchmarks.synthetic import synthetic_graph
+
+
+def check_small_graphs(workers: int) -> None:
+    """Workers give the same summaries as a single process, also on graphs without any links."""
+    for pages in (1, 2, 5):
+        graph = synthetic_graph(pages)
+        expected = list(website_analyser.analysing.paths.Paths(graph).get_source_summaries())
+        summaries = list(website_analyser.analysing.paths.Paths(graph, workers=workers).get_source_summaries())
+        if summaries != expected:
+            raise RuntimeError(f"Summaries of {pages} pages with {graph.edges_count} links differ")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--pages", type=int, default=50_000)
+    parser.add_argument("--sources", type=int, default=2_000, help="Number of BFS sources, all pages if 0")
+    parser.add_argument("--workers", type=int, nargs="+", default=[1, 2, 4, 8])
+    args = parser.parse_args()
+
+    check_small_graphs(max(max(args.workers), 2))
+    graph = synthetic_graph(args.pages)
+    sources = list(range(0, graph.size, max(1, graph.size // args.sources))) if args.sources else None
+    print(f"graph: {graph.size} pages, {graph.edges_count} links, {len(sources or graph.urls)} sources, "
+          f"{os.cpu_count()} cpus")
+    baseline = None
+    for workers in args.workers:
+        paths = website_analyser.analysing.paths.Paths(graph, workers=workers)
+        start = time.perf_counter()
+        summaries = list(paths.get_source_summaries(sources))
+        elapsed = time.perf_counter() - start
+        baseline = baseline or elapsed
+        print(f"workers={workers:<3} time={elapsed:8.2f}s sources/s={len(summaries) / elapsed:8.1f} "
+              f"speedup={baseline / elapsed:5.2f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,95 @@
+"""Load-test the query server with concurrent clients issuing shortest path lookups on a synthetic website.
+
+Run from the repository root: `python -m benchmarks.query_server --pages 100000 --clients 8 --requests 2000`
+"""
+import argparse
+import http.client
+import json
+import random
+import threading
+import time
+import urllib.parse
+from typing import List, Tuple
+
+import website_analyser.analysing.paths
+import website_analyser.analysing.server
+from benchmarks.synthetic import synthetic_graph
+
+
+def lookup_pairs(urls: List[str], count: int, distinct: int, seed: int = 0) -> List[Tuple[str, str]]:
+    """Lookups drawn from `distinct` pairs, the way dashboards repeat the same questions."""
+    rng = random.Random(seed)
+    pairs = [(rng.choice(urls), rng.choice(urls)) for _ in range(distinct)]
+    return [rng.choice(pairs) for _ in range(count)]
+
+
+def run_client(server_url: str, pairs: List[Tuple[str, str]], latencies: List[float]) -> None:
+    connection = http.client.HTTPConnection(urllib.parse.urlsplit(server_url).netloc)
+    for from_url, to_url in pairs:
+        start = time.perf_counter()
+        connection.request("GET", "/path?" + urllib.parse.urlencode({"from": from_url, "to": to_url}))
+        response = connection.getresponse()
+        json.loads(response.read())
+        latencies.append(time.perf_counter() - start)
+        if response.status != 200:
+            raise RuntimeError(f"Query failed with {response.status}")
+    connection.close()
+
+
+def load_test(server_url: str, pairs: List[Tuple[str, str]], clients: int) -> Tuple[float, List[float]]:
+    latencies: List[float] = []
+    threads = [
+        threading.Thread(target=run_client, args=(server_url, pairs[client::clients], latencies))
+        for client in range(clients)
+    ]
+    start = time.perf_counter()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    return time.perf_counter() - start, sorted(latencies)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--pages", type=int, default=100_000)
+    parser.add_argument("--clients", type=int, default=8)
+    parser.add_argument("--requests", type=int, default=2_000)
+    parser.add_argument("--distinct", type=int, default=500, help="Number of distinct path lookups")
+    args = parser.parse_args()
+
+    graph = synthetic_graph(args.pages)
+    pairs = lookup_pairs(graph.urls, args.requests, args.distinct)
+    print(f"graph: {graph.size} pages, {graph.edges_count} links, {args.requests} lookups, {args.clients} clients")
+
+    start = time.perf_counter()
+    queries = website_analyser.analysing.server.WebsiteQueries(graph)
+    print(f"server ready in {time.perf_counter() - start:.2f}s")
+
+    paths = website_analyser.analysing.paths.Paths(graph)
+    sample = [(graph.index_of(from_url), graph.index_of(to_url)) for from_url, to_url in pairs[:50]]
+    start = time.perf_counter()
+    for from_page, to_page in sample:
+        paths.find_shortest_paths_tree(from_page).path_to(to_page)
+    full_bfs = (time.perf_counter() - start) / len(sample)
+    start = time.perf_counter()
+    for from_page, to_page in sample:
+        paths.find_shortest_path(from_page, to_page)
+    bidirectional = (time.perf_counter() - start) / len(sample)
+    print(f"per lookup: full BFS {full_bfs * 1000:8.2f}ms, bidirectional BFS {bidirectional * 1000:8.2f}ms")
+
+    with website_analyser.analysing.server.QueryServer(queries, port=0) as server:
+        threading.Thread(target=server.serve_forever, daemon=True).start()
+        for run in ("cold cache", "warm cache"):
+            elapsed, latencies = load_test(server.url, pairs, args.clients)
+            median, p99 = latencies[len(latencies) // 2], latencies[int(len(latencies) * 0.99)]
+            print(
+                f"{run}: {len(latencies) / elapsed:8.1f} lookups/s, latency p50={median * 1000:.2f}ms "
+                f"p99={p99 * 1000:.2f}ms"
+            )
+        server.shutdown()
+    print(json.dumps(queries.stats()))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,51 @@
+"""Crawl a local synthetic site once into a response cache, then rebuild the structure from the cache only.
+
+Run from the repository root: `python -m benchmarks.response_cache --pages 1000 --latency 0.02`
+"""
+import argparse
+import os
+import tempfile
+import time
+
+import website_analyser.parsing.extract.fair_extractor
+import website_analyser.parsing.fetcher
+import website_analyser.parsing.response_cache
+from benchmarks.local_site import LocalSite
+
+
+def crawl(starting_url: str, cache_path: str, replay: bool, concurrency: int) -> None:
+    cache = website_analyser.parsing.response_cache.ResponseCache(cache_path)
+    fetcher = website_analyser.parsing.fetcher.Fetcher(cache=cache, replay=replay)
+    extractor = website_analyser.parsing.extract.fair_extractor.FairExtractor(
+        starting_url, False, False, concurrency=concurrency, fetcher=fetcher,
+    )
+    start = time.perf_counter()
+    webpages = extractor.extract_website_structure().webpages
+    elapsed = time.perf_counter() - start
+    print(
+        f"{'replay' if replay else 'record':<7} concurrency={concurrency:<3} pages={len(webpages):<6} "
+        f"time={elapsed:7.2f}s hits={cache.hits} misses={cache.misses} stored={cache.size} bytes"
+    )
+    cache.close()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--pages", type=int, default=1000)
+    parser.add_argument("--links", type=int, default=20)
+    parser.add_argument("--latency", type=float, default=0.02)
+    parser.add_argument("--concurrency", type=int, default=8)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as directory:
+        cache_path = os.path.join(directory, "responses.sqlite")
+        with LocalSite(args.pages, args.links, args.latency) as site:
+            starting_url = site.starting_url
+            crawl(starting_url, cache_path, False, args.concurrency)
+        # the site is gone, every response has to come from the cache
+        crawl(starting_url, cache_path, True, 1)
+        crawl(starting_url, cache_path, True, args.concurrency)
+
+
+if __name__ == "__main__":
+    main()
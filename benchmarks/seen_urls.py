@@ -0,0 +1,112 @@
+"""Measure allocations and peak memory of link deduplication during a crawl of a synthetic, in-process website.
+
+Run from the repository root: `python -m benchmarks.seen_urls --pages 20000 --links 20`
+"""
+import argparse
+import os
+import random
+import time
+import tracemalloc
+from typing import Any, Callable, Dict, Optional
+
+import website_analyser.parsing.crawler
+import website_analyser.parsing.fetcher
+import website_analyser.parsing.frontier
+import website_analyser.parsing.seen
+import website_analyser.parsing.sink
+
+Crawler = website_analyser.parsing.crawler.Crawler
+Frontier = website_analyser.parsing.frontier.Frontier
+
+BASE_URL = "https://bench.example.com"
+
+
+class SyntheticFetcher(website_analyser.parsing.fetcher.Fetcher):
+    """Renders pages of a random website instead of fetching them."""
+
+    def __init__(self, pages: int, links_per_page: int) -> None:
+        super().__init__()
+        self.pages = pages
+        self.links_per_page = links_per_page
+
+    def get_html(
+            self, url: str, max_size: Optional[int] = None, **kwargs: Any,
+    ) -> website_analyser.parsing.fetcher.HtmlResponse:
+        page_no = int(url.rsplit("/", 1)[-1])
+        rng = random.Random(page_no)
+        linked = [(page_no + 1) % self.pages] + [rng.randrange(self.pages) for _ in range(self.links_per_page - 1)]
+        content = "".join(f'<a href="{BASE_URL}/page/{linked_no}">x</a>' for linked_no in linked)
+        return website_analyser.parsing.fetcher.HtmlResponse(200, content, len(content))
+
+
+class WebpageFirstCrawler(Crawler):
+    """Deduplicates the way the crawler used to: builds a Webpage for every link, then intersects sets."""
+
+    def _handle_response(self, webpage, response) -> None:
+        webpage.set_response_status_code(response.status)
+        webpage.set_response_content_length(response.size)
+        if response.content:
+            linked_urls = self._extract_linked_urls(response.content, webpage, webpage.url.url)
+            linked_webpages = {self._create_webpage(url) for url in linked_urls}
+            webpage.linked_webpages.update(
+                self.frontier.discover(linked.url.url, lambda _, page=linked: page) for linked in linked_webpages
+            )
+        self._settle(webpage)
+
+
+def run(crawler_class: type, frontier: Frontier, fetcher: SyntheticFetcher, stream: bool) -> Dict[str, float]:
+    created = 0
+    crawler = crawler_class(f"{BASE_URL}/page/0", fetcher=fetcher, frontier=frontier)
+    create_webpage: Callable = crawler._create_webpage
+
+    def counting_create_webpage(url: str):
+        nonlocal created
+        created += 1
+        return create_webpage(url)
+
+    crawler._create_webpage = counting_create_webpage
+    tracemalloc.start()
+    start = time.perf_counter()
+    if stream:
+        with website_analyser.parsing.sink.JsonLinesSink(os.devnull) as sink:
+            crawler.sink = sink
+            crawler.get_webpages()
+    else:
+        crawler.get_webpages()
+    elapsed = time.perf_counter() - start
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    frontier.close()
+    return {"time": elapsed, "peak": peak / 2 ** 20, "created": created}
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--pages", type=int, default=20_000)
+    parser.add_argument("--links", type=int, default=20)
+    args = parser.parse_args()
+
+    variants = {
+        "webpage first": lambda: (WebpageFirstCrawler, Frontier(), False),
+        "url first, exact": lambda: (Crawler, Frontier(), False),
+        "streamed, exact": lambda: (Crawler, Frontier(retain_webpages=False), True),
+        "streamed, bloom": lambda: (
+            Crawler,
+            Frontier(
+                seen=website_analyser.parsing.seen.BloomSeenUrls(capacity=args.pages), retain_webpages=False,
+            ),
+            True,
+        ),
+    }
+    print(f"pages={args.pages} links={args.pages * args.links}")
+    for name, make in variants.items():
+        crawler_class, frontier, stream = make()
+        result = run(crawler_class, frontier, SyntheticFetcher(args.pages, args.links), stream)
+        print(
+            f"{name:<18} time={result['time']:7.2f}s peak={result['peak']:8.1f}MiB "
+            f"webpages created={result['created']:.0f}"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,138 @@
+"""Ingest a sitemap index of large, partly gzipped sitemaps served on localhost, the old way and with SitemapReader.
+
+Run from the repository root: `python -m benchmarks.sitemaps --sitemaps 4 --urls 50000`
+"""
+import argparse
+import functools
+import gzip
+import http.server
+import threading
+import time
+import tracemalloc
+import warnings
+from typing import Callable, Dict, Set, Tuple
+
+import bs4
+
+import website_analyser.parsing.fetcher
+import website_analyser.parsing.sitemaps
+import website_analyser.shared.canonical
+
+NAMESPACE = "http://www.sitemaps.org/schemas/sitemap/0.9"
+IMAGE_NAMESPACE = "http://www.google.com/schemas/sitemap-image/1.1"
+
+
+def build_files(base_url: str, sitemaps: int, urls: int) -> Dict[str, bytes]:
+    """Sitemap index of `sitemaps` sitemaps, the first of them an image sitemap whose image locations are not pages."""
+    files = {}
+    names = [f"/sitemap-{index}.xml" + (".gz" if index % 2 else "") for index in range(sitemaps)]
+    for index, name in enumerate(names):
+        entries = "".join(
+            f"<url><loc>{base_url}/section/{index}/page/{page_no}</loc><lastmod>2021-01-01</lastmod>"
+            + (f"<image:image><image:loc>{base_url}/image/{page_no}.jpg</image:loc></image:image>" if not index else "")
+            + "</url>"
+            for page_no in range(urls)
+        )
+        content = (
+            f'<?xml version="1.0" encoding="UTF-8"?>'
+            f'<urlset xmlns="{NAMESPACE}" xmlns:image="{IMAGE_NAMESPACE}">{entries}</urlset>'
+        ).encode()
+        files[name] = gzip.compress(content) if name.endswith(".gz") else content
+    index_entries = "".join(f"<sitemap><loc>{base_url}{name}</loc></sitemap>" for name in names)
+    files["/sitemap.xml"] = f'<sitemapindex xmlns="{NAMESPACE}">{index_entries}</sitemapindex>'.encode()
+    return files
+
+
+class SitemapHandler(http.server.BaseHTTPRequestHandler):
+    files: Dict[str, bytes] = {}
+
+    def do_GET(self) -> None:  # noqa
+        body = self.files.get(self.path)
+        if body is None:
+            self.send_error(404)
+            return
+        self.send_response(200)
+        self.send_header("content-type", "application/gzip" if self.path.endswith(".gz") else "application/xml")
+        self.send_header("content-length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args) -> None:
+        pass
+
+
+def read_with_bs4(
+        fetcher: website_analyser.parsing.fetcher.Fetcher,
+        canonicalizer: website_analyser.shared.canonical.Canonicalizer,
+        sitemap_url: str,
+) -> Set[str]:
+    """What FairExtractor used to do: one sitemap at a time, whole body in memory, html.parser, no gzip."""
+    warnings.filterwarnings("ignore", category=bs4.XMLParsedAsHTMLWarning)
+    soup = bs4.BeautifulSoup(fetcher.get(sitemap_url).text, features="html.parser")
+    urls: Set[str] = set()
+    for tag in soup.find_all(["loc"]):
+        url = canonicalizer.canonicalize(tag.text)
+        if url is not None and url.endswith(".xml"):
+            urls.update(read_with_bs4(fetcher, canonicalizer, url))
+        elif url is not None:
+            urls.add(url)
+    return urls
+
+
+def measure(read: Callable[[], Set[str]]) -> Tuple[Set[str], float, float]:
+    tracemalloc.start()
+    start = time.perf_counter()
+    urls = read()
+    elapsed = time.perf_counter() - start
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return urls, elapsed, peak / 2 ** 20
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--sitemaps", type=int, default=4)
+    parser.add_argument("--urls", type=int, default=50_000)
+    args = parser.parse_args()
+
+    server = http.server.ThreadingHTTPServer(("127.0.0.1", 0), SitemapHandler)
+    server.daemon_threads = True
+    base_url = "http://127.0.0.1:{}".format(server.server_address[1])
+    SitemapHandler.files = build_files(base_url, args.sitemaps, args.urls)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    try:
+        variants = {
+            "bs4, sequential": lambda fetcher, canonicalizer: functools.partial(
+                read_with_bs4, fetcher, canonicalizer, f"{base_url}/sitemap.xml",
+            ),
+            "SitemapReader": lambda fetcher, canonicalizer: functools.partial(
+                website_analyser.parsing.sitemaps.SitemapReader(fetcher, canonicalizer).read,
+                [f"{base_url}/sitemap.xml"],
+            ),
+        }
+        expected = {
+            f"{base_url}/section/{index}/page/{page_no}"
+            for index in range(args.sitemaps)
+            for page_no in range(args.urls)
+        }
+        print(f"sitemaps={args.sitemaps} urls per sitemap={args.urls} (every other gzipped, first with images)")
+        found: Dict[str, Set[str]] = {}
+        for name, make in variants.items():
+            with website_analyser.parsing.fetcher.Fetcher() as fetcher:
+                urls, elapsed, peak = measure(make(fetcher, website_analyser.shared.canonical.Canonicalizer()))
+                found[name] = urls
+                print(
+                    f"{name:<16} urls={len(urls):<8} time={elapsed:7.2f}s peak={peak:8.1f}MiB "
+                    f"requests={fetcher.requests_count} bytes={fetcher.bytes_count}"
+                )
+        # the old way doesn't read gzipped sitemaps, so only SitemapReader is expected to find every page
+        unexpected, missed = found["SitemapReader"] - expected, expected - found["SitemapReader"]
+        if unexpected or missed:
+            raise RuntimeError(f"SitemapReader found {len(unexpected)} unexpected and missed {len(missed)} pages")
+    finally:
+        server.shutdown()
+        server.server_close()
+
+
+if __name__ == "__main__":
+    main()
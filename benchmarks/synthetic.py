@@ -0,0 +1,45 @@
+import array
+import random
+
+import website_analyser.shared.compact_website
+
+CompactWebsite = website_analyser.shared.compact_website.CompactWebsite
+DOMAIN_FLAGS = (
+    website_analyser.shared.compact_website.IN_WEBSITE_SPACE
+    | website_analyser.shared.compact_website.ACCEPTED_PATH
+    | website_analyser.shared.compact_website.FROM_DOMAIN
+    | website_analyser.shared.compact_website.FROM_DOMAIN_SPACE
+)
+EXTERNAL_FLAGS = (
+    website_analyser.shared.compact_website.IN_WEBSITE_SPACE
+    | website_analyser.shared.compact_website.ACCEPTED_PATH
+)
+
+
+def synthetic_graph(pages: int, links_per_page: int = 10, external_share: float = 0.2, seed: int = 0) -> CompactWebsite:
+    """Web-like graph: domain pages link to a shared navigation, to popular pages and to random pages."""
+    rng = random.Random(seed)
+    domain_pages = int(pages * (1 - external_share))
+    navigation = list(range(min(20, domain_pages)))
+    urls = [f"https://example.com/page/{page:08d}" for page in range(domain_pages)]
+    urls.extend(f"https://external{page % 97}.org/{page:08d}" for page in range(domain_pages, pages))
+    order = sorted(range(pages), key=urls.__getitem__)
+    position = {page: index for index, page in enumerate(order)}
+
+    flags = array.array("B", [DOMAIN_FLAGS if page < domain_pages else EXTERNAL_FLAGS for page in order])
+    status_codes = array.array(
+        "i", [(200 if rng.random() < 0.97 else 404) if page < domain_pages else -1 for page in order]
+    )
+    content_lengths = array.array("q", [rng.randrange(2_000, 200_000) if page < domain_pages else -1 for page in order])
+    offsets = array.array("q", [0])
+    targets = array.array("I")
+    for page in order:
+        if page < domain_pages:
+            linked = set(navigation)
+            linked.update(int(domain_pages * rng.random() ** 3) for _ in range(links_per_page // 2))
+            linked.update(rng.randrange(pages) for _ in range(links_per_page // 2))
+            linked.add((page + 1) % domain_pages)
+            linked.discard(page)
+            targets.extend(sorted(position[linked_page] for linked_page in linked))
+        offsets.append(len(targets))
+    return CompactWebsite([urls[page] for page in order], flags, status_codes, content_lengths, offsets, targets)
@@ -0,0 +1,68 @@
+"""Compare Url construction over a crawl-like stream of links with parsing every link from scratch.
+
+Run from the repository root: `python -m benchmarks.url_parsing --pages 2000 --links 60`
+"""
+import argparse
+import random
+import time
+from typing import Callable, List
+
+import tld
+
+import website_analyser.shared.url_utils
+
+Url = website_analyser.shared.url_utils.Url
+
+
+def link_stream(pages: int, links_per_page: int, navigation_share: float = 0.7, seed: int = 0) -> List[str]:
+    """Links of every page: most point to the same navigation and footer pages, the rest to random pages."""
+    rng = random.Random(seed)
+    hosts = ["https://www.example.com", "https://blog.example.com", "https://docs.example.org"]
+    navigation = [f"{rng.choice(hosts)}/section/{index}" for index in range(40)]
+    links = []
+    for _ in range(pages):
+        for _ in range(links_per_page):
+            if rng.random() < navigation_share:
+                links.append(rng.choice(navigation))
+            else:
+                links.append(f"{rng.choice(hosts)}/page/{rng.randrange(pages * 10)}")
+    return links
+
+
+def parse_uncached(url: str) -> None:
+    """What constructing a Url used to cost: a full tld parse of the URL."""
+    tld_suffix, tld_, tld_prefix = tld.parse_tld(url)
+    if tld_ and tld_suffix:
+        domain = ".".join(filter(None, [tld_prefix, tld_, tld_suffix]))
+        url.split(domain, maxsplit=1)
+
+
+def measure(function: Callable[[str], object], links: List[str]) -> float:
+    start = time.perf_counter()
+    for link in links:
+        function(link)
+    return time.perf_counter() - start
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--pages", type=int, default=2000)
+    parser.add_argument("--links", type=int, default=60)
+    args = parser.parse_args()
+
+    links = link_stream(args.pages, args.links)
+    print(f"links={len(links)} unique={len(set(links))}")
+    uncached = measure(parse_uncached, links)
+    website_analyser.shared.url_utils._intern_url.cache_clear()
+    website_analyser.shared.url_utils._split_host.cache_clear()
+    interned = measure(Url, links)
+    info = website_analyser.shared.url_utils._intern_url.cache_info()
+    print(f"tld.parse_tld per link {uncached:7.2f}s")
+    print(
+        f"interned Url           {interned:7.2f}s ({uncached / interned:.1f}x), "
+        f"url cache hits {info.hits}/{len(links)}"
+    )
+
+
+if __name__ == "__main__":
+    main()
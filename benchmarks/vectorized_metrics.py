@@ -0,0 +1,75 @@
+"""Compare link and size metrics and most linked pages computed in Python and with NumPy, on a 1M links graph.
+
+Path metrics are left out, both engines search paths the same way.
+
+Run from the repository root: `python -m benchmarks.vectorized_metrics --pages 41000 --top 10`
+"""
+import argparse
+import time
+from typing import Callable, Dict
+
+import website_analyser.analysing.explorer
+import website_analyser.analysing.metrics
+import website_analyser.analysing.paths
+import website_analyser.analysing.vectorized
+from benchmarks.synthetic import synthetic_graph
+
+ENGINES = {
+    "python": website_analyser.analysing.metrics.MetricsReporter,
+    "numpy": website_analyser.analysing.vectorized.VectorizedMetricsReporter,
+}
+
+
+def link_and_size_metrics(reporter_class: type, pages: int) -> Dict[str, object]:
+    # a new graph for every run, so neither engine reuses what the other built
+    paths = website_analyser.analysing.paths.Paths(synthetic_graph(pages))
+    reporter = reporter_class(paths.graph, paths)
+    start = time.perf_counter()
+    reporter._add_links_metrics()
+    reporter._add_size_metrics()
+    reporter.metrics["time"] = time.perf_counter() - start
+    return reporter.metrics
+
+
+def measure(function: Callable[[], object], repeats: int = 5) -> float:
+    start = time.perf_counter()
+    for _ in range(repeats):
+        function()
+    return (time.perf_counter() - start) / repeats
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--pages", type=int, default=41_000)
+    parser.add_argument("--top", type=int, default=10)
+    args = parser.parse_args()
+
+    graph = synthetic_graph(args.pages)
+    print(f"graph: {graph.size} pages, {graph.edges_count} links")
+    results = {name: link_and_size_metrics(reporter_class, args.pages) for name, reporter_class in ENGINES.items()}
+    times = {name: metrics.pop("time") for name, metrics in results.items()}
+    if results["python"] != results["numpy"]:
+        raise RuntimeError("Engines computed different metrics")
+    print(f"link and size metrics: python={times['python']:.3f}s numpy={times['numpy']:.3f}s "
+          f"({times['python'] / times['numpy']:.1f}x)")
+
+    start = time.perf_counter()
+    website_analyser.analysing.vectorized.GraphArrays.of(graph)
+    print(f"graph arrays built in {time.perf_counter() - start:.3f}s")
+
+    paths = website_analyser.analysing.paths.Paths(graph)
+    times_linked = website_analyser.analysing.explorer.Explorer(graph, paths).get_times_linked()
+    format_most_linked = website_analyser.analysing.explorer.Explorer.format_most_linked
+    select_most_linked = website_analyser.analysing.vectorized.select_extremes
+    for name, kwargs in (("top", {"top": args.top}), ("bot", {"bot": args.top})):
+        sorted_report = format_most_linked(times_linked, **kwargs)
+        if format_most_linked(select_most_linked(times_linked, **kwargs), **kwargs) != sorted_report:
+            raise RuntimeError(f"Selected {name} pages differ from sorted ones")
+        sorting = measure(lambda: format_most_linked(times_linked, **kwargs))
+        partitioning = measure(lambda: format_most_linked(select_most_linked(times_linked, **kwargs), **kwargs))
+        print(f"most linked --{name}={args.top}: sort={sorting * 1000:.1f}ms argpartition={partitioning * 1000:.1f}ms "
+              f"({sorting / partitioning:.1f}x)")
+
+
+if __name__ == "__main__":
+    main()
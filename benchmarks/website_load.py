@@ -0,0 +1,58 @@
+"""Measure Website.load time on synthetic snapshots.
+
+Run from the repository root: `python -m benchmarks.website_load --pages 10000 100000`
+"""
+import argparse
+import json
+import os
+import tempfile
+import time
+from typing import Any, Dict, Iterator
+
+import website_analyser.shared.compact_website
+import website_analyser.shared.website
+from benchmarks.synthetic import synthetic_graph
+
+CompactWebsite = website_analyser.shared.compact_website.CompactWebsite
+
+
+def iter_records(graph: CompactWebsite) -> Iterator[Dict[str, Any]]:
+    for page, url in enumerate(graph.urls):
+        yield {
+            "url_obj": url,
+            "is_from_domain_space": graph.has_flag(page, website_analyser.shared.compact_website.FROM_DOMAIN_SPACE),
+            "is_from_domain": graph.has_flag(page, website_analyser.shared.compact_website.FROM_DOMAIN),
+            "is_in_website_space": graph.has_flag(page, website_analyser.shared.compact_website.IN_WEBSITE_SPACE),
+            "is_accepted_path": graph.has_flag(page, website_analyser.shared.compact_website.ACCEPTED_PATH),
+            "response_status_code": graph.status_code(page),
+            "response_content_length": graph.content_length(page),
+            "linked_webpages": [graph.urls[linked] for linked in graph.successors(page)],
+        }
+
+
+def write_snapshot(graph: CompactWebsite, file_path: str) -> None:
+    with open(file_path, "w") as f_h:
+        json.dump(list(iter_records(graph)), f_h)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--pages", type=int, nargs="+", default=[10_000, 100_000])
+    parser.add_argument("--links", type=int, default=10)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as directory:
+        for pages in args.pages:
+            file_path = os.path.join(directory, f"website_{pages}.json")
+            graph = synthetic_graph(pages, links_per_page=args.links)
+            write_snapshot(graph, file_path)
+            start = time.perf_counter()
+            website = website_analyser.shared.website.Website.load(file_path)
+            elapsed = time.perf_counter() - start
+            links = sum(len(page.linked_webpages) for page in website.webpages)
+            megabytes = os.path.getsize(file_path) / 2 ** 20
+            print(f"pages={pages:<8} links={links:<9} file={megabytes:7.1f}MiB load={elapsed:7.2f}s")
+
+
+if __name__ == "__main__":
+    main()
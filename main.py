@@ -1,46 +1,165 @@
+import hashlib
 import logging
-from typing import Optional, Callable, Union, Dict
+from typing import Any, Optional, Callable, Union, Dict
 
 import fire
 
+import website_analyser.analysing.cache
+import website_analyser.analysing.diff
 import website_analyser.analysing.explorer
 import website_analyser.analysing.metrics
 import website_analyser.analysing.paths
+import website_analyser.analysing.ranking
+import website_analyser.analysing.server
+import website_analyser.analysing.vectorized
 import website_analyser.parsing.extract.fair_extractor
+import website_analyser.parsing.fetcher
+import website_analyser.parsing.frontier
+import website_analyser.parsing.link_checker
+import website_analyser.parsing.response_cache
+import website_analyser.parsing.seen
+import website_analyser.parsing.sink
+import website_analyser.shared.binary_snapshot
+import website_analyser.shared.canonical
+import website_analyser.shared.compact_website
 import website_analyser.shared.url_utils
 import website_analyser.shared.website
 
+AnyWebsite = Union[website_analyser.shared.website.Website, website_analyser.shared.compact_website.CompactWebsite]
+# reporter class and version of results of every metrics engine
+METRICS_ENGINES = {
+    "numpy": (
+        website_analyser.analysing.vectorized.VectorizedMetricsReporter, website_analyser.analysing.vectorized.VERSION,
+    ),
+    "python": (website_analyser.analysing.metrics.MetricsReporter, website_analyser.analysing.metrics.VERSION),
+}
+
 
 class AnalyseCLI:
-    def __init__(self, get_website_method: Callable[[str], website_analyser.shared.website.Website]):
+    def __init__(
+            self,
+            get_website_method: Callable[[str], AnyWebsite],
+            workers: int = 1,
+            cache: Optional[website_analyser.analysing.cache.AnalysisCache] = None,
+            cache_variant: str = "",
+            metrics_engine: str = "numpy",
+    ):
+        if metrics_engine not in METRICS_ENGINES:
+            raise ValueError(f"Unknown metrics engine {metrics_engine}, use one of {', '.join(METRICS_ENGINES)}")
         self._get_website = get_website_method
+        self.workers = workers
+        self._cache = cache
+        self._cache_variant = cache_variant
+        self._metrics_engine = metrics_engine
 
     def metrics(self, path_or_url: str) -> str:
-        website = self._get_website(path_or_url)
-        paths = self._get_paths(website)
-        metrics = website_analyser.analysing.metrics.MetricsReporter(website, paths)
-        metrics.add_metrics()
-        return metrics.report
+        _, version = METRICS_ENGINES[self._metrics_engine]
+        metrics = self._get_result(path_or_url, f"metrics_{self._metrics_engine}", version, self._compute_metrics)
+        return website_analyser.analysing.metrics.MetricsReporter.format_metrics(metrics)
 
     def dead_links(self, path_or_url: str) -> str:
-        website = self._get_website(path_or_url)
-        paths = self._get_paths(website)
-        explorer = website_analyser.analysing.explorer.Explorer(website, paths)
-        return explorer.report_dead_links()
+        dead_links = self._get_result(
+            path_or_url,
+            "dead_links",
+            website_analyser.analysing.explorer.VERSION,
+            lambda website, paths: website_analyser.analysing.explorer.Explorer(website, paths).get_dead_links(),
+        )
+        return website_analyser.analysing.explorer.Explorer.format_dead_links(dead_links)
 
     def most_linked(self, path_or_url: str, top: Optional[int] = 10, bot: Optional[int] = None) -> str:
         if bot is not None:
             top = None
-        website = self._get_website(path_or_url)
-        paths = self._get_paths(website)
-        explorer = website_analyser.analysing.explorer.Explorer(website, paths)
-        return explorer.report_most_linked(top, bot)
+        times_linked = self._get_result(
+            path_or_url,
+            "times_linked",
+            website_analyser.analysing.explorer.VERSION,
+            lambda website, paths: website_analyser.analysing.explorer.Explorer(website, paths).get_times_linked(),
+        )
+        if self._metrics_engine == "numpy":
+            times_linked = website_analyser.analysing.vectorized.select_extremes(times_linked, top, bot)
+        return website_analyser.analysing.explorer.Explorer.format_most_linked(times_linked, top, bot)
 
-    @staticmethod
-    def _get_paths(website: website_analyser.shared.website.Website) -> website_analyser.analysing.paths.Paths:
-        paths = website_analyser.analysing.paths.Paths(website)
-        paths.find_all_shortest_paths()
-        return paths
+    def distances(self, path_or_url: str) -> str:
+        eccentricities = self._get_result(
+            path_or_url,
+            "eccentricities",
+            website_analyser.analysing.explorer.VERSION,
+            lambda website, paths: website_analyser.analysing.explorer.Explorer(website, paths).get_eccentricities(),
+        )
+        return website_analyser.analysing.explorer.Explorer.format_eccentricities(eccentricities)
+
+    def page_rank(
+            self,
+            path_or_url: str,
+            top: Optional[int] = 10,
+            bot: Optional[int] = None,
+            damping: float = website_analyser.analysing.ranking.DAMPING,
+            tolerance: float = website_analyser.analysing.ranking.TOLERANCE,
+            max_iterations: int = website_analyser.analysing.ranking.MAX_ITERATIONS,
+    ) -> str:
+        if bot is not None:
+            top = None
+        page_ranks = self._get_result(
+            path_or_url,
+            f"page_rank:{damping}:{tolerance}:{max_iterations}",
+            website_analyser.analysing.ranking.VERSION,
+            lambda website, paths: website_analyser.analysing.explorer.Explorer(website, paths).get_page_ranks(
+                damping, tolerance, max_iterations,
+            ),
+        )
+        page_ranks = website_analyser.analysing.vectorized.select_extremes(page_ranks, top, bot)
+        return website_analyser.analysing.explorer.Explorer.format_page_ranks(page_ranks)
+
+    def components(self, path_or_url: str) -> str:
+        components = self._get_result(
+            path_or_url,
+            "components",
+            website_analyser.analysing.explorer.VERSION,
+            lambda website, paths: website_analyser.analysing.explorer.Explorer(website, paths).get_components(),
+        )
+        return website_analyser.analysing.metrics.MetricsReporter.format_metrics(components)
+
+    def orphans(self, path_or_url: str) -> str:
+        orphans = self._get_result(
+            path_or_url,
+            "orphans",
+            website_analyser.analysing.explorer.VERSION,
+            lambda website, paths: website_analyser.analysing.explorer.Explorer(website, paths).get_orphans(),
+        )
+        return website_analyser.analysing.explorer.Explorer.format_orphans(orphans)
+
+    def diff(self, previous_path_or_url: str, path_or_url: str) -> str:
+        previous = self._get_website(previous_path_or_url)
+        return website_analyser.analysing.diff.WebsiteDiff.between(previous, self._get_website(path_or_url)).report()
+
+    def _get_paths(self, website: AnyWebsite) -> website_analyser.analysing.paths.Paths:
+        return website_analyser.analysing.paths.Paths(website, workers=self.workers)
+
+    def _get_result(
+            self,
+            path_or_url: str,
+            name: str,
+            version: int,
+            compute: Callable[[AnyWebsite, website_analyser.analysing.paths.Paths], Any],
+    ) -> Any:
+        """Result of `compute` for the structure, from the analysis cache if the stored structure didn't change."""
+        def compute_from_structure() -> Any:
+            website = self._get_website(path_or_url)
+            return compute(website, self._get_paths(website))
+
+        if self._cache is None or website_analyser.shared.url_utils.is_uri(path_or_url):
+            return compute_from_structure()
+        return self._cache.get_or_compute(
+            path_or_url, f"{name}:{self._cache_variant}", version, compute_from_structure,
+        )
+
+    def _compute_metrics(
+            self, website: AnyWebsite, paths: website_analyser.analysing.paths.Paths,
+    ) -> Dict[str, Any]:
+        reporter_class, _ = METRICS_ENGINES[self._metrics_engine]
+        metrics = reporter_class(website, paths)
+        metrics.add_metrics()
+        return metrics.metrics
 
 
 class TextUI:
@@ -49,10 +168,12 @@ class TextUI:
         0. Exit
         """
 
-    def __init__(self, website: website_analyser.shared.website.Website) -> None:
+    def __init__(
+            self, website: AnyWebsite, canonicalizer: Optional[website_analyser.shared.canonical.Canonicalizer] = None,
+    ) -> None:
         self.website = website
         self.paths = website_analyser.analysing.paths.Paths(website)
-        self.paths.find_all_shortest_paths()
+        self.canonicalizer = canonicalizer or website_analyser.shared.canonical.Canonicalizer()
 
     def run(self):
         while True:
@@ -82,21 +203,24 @@ class TextUI:
         exit()
 
     def query_shortest_path(self) -> None:
-        url_from: str = website_analyser.shared.url_utils.create_clean_url(input("From URL: "))
-        url_to: str = website_analyser.shared.url_utils.create_clean_url(input("To URL: "))
-        if url_from not in self.website.urls:
+        url_from: str = self._clean_url(input("From URL: "))
+        url_to: str = self._clean_url(input("To URL: "))
+        if url_from not in self.paths.graph:
             print(f"Didn't find {url_from} in website")
             return
-        if url_to not in self.website.urls:
-            print(f"Didn't find {url_from} in website")
+        if url_to not in self.paths.graph:
+            print(f"Didn't find {url_to} in website")
             return
-        website_from = self.website.url_to_webpage[url_from]
-        website_to = self.website.url_to_webpage[url_to]
-        shortest_path = self.paths.webpages_shortest_paths.get(website_from, {}).get(website_to)
+        shortest_path = self.paths.find_shortest_path(
+            self.paths.graph.index_of(url_from), self.paths.graph.index_of(url_to)
+        )
         if shortest_path is None:
             print(f"No path found")
             return
-        print("\n".join([page.url.url for page in shortest_path]))
+        print("\n".join(self.paths.path_urls(shortest_path)))
+
+    def _clean_url(self, url: str) -> str:
+        return self.canonicalizer.canonicalize(url) or website_analyser.shared.url_utils.create_clean_url(url)
 
     MENU_ITEM_TO_METHOD: Dict[int, Callable[['TextUI'], None]] = {
         0: exit_ui,
@@ -110,37 +234,207 @@ class RunCLI:
             self,
             sub_domains: bool = False,
             only_sitemaps: bool = False,
+            concurrency: int = 1,
+            per_host_concurrency: Optional[int] = None,
+            pool_size: int = 10,
+            timeout: Optional[float] = 30.0,
+            retries: int = 2,
+            max_page_size: Optional[int] = 10 * 2 ** 20,
+            link_extractor: str = "fast",
+            checkpoint: Optional[str] = None,
+            resume: bool = False,
+            checkpoint_interval: int = 1000,
+            seen_index: str = "exact",
+            seen_capacity: int = 10 ** 6,
+            strip_tracking: bool = False,
+            rel_canonical: bool = True,
+            max_crawl_delay: float = 30.0,
+            previous: Optional[str] = None,
+            cache: Optional[str] = None,
+            cache_size: Optional[int] = 2 ** 30,
+            replay: bool = False,
+            check_links: bool = False,
+            link_cache: Optional[str] = None,
+            link_cache_ttl: float = website_analyser.parsing.link_checker.TTL,
+            analysis_cache: Optional[str] = None,
+            analysis_cache_size: Optional[int] = website_analyser.analysing.cache.MAX_SIZE,
+            metrics_engine: str = "numpy",
+            workers: int = 1,
             logging_level: Union[str, int] = "WARNING",
     ):
         self.sub_domains = sub_domains
         self.only_sitemaps = only_sitemaps
-        self.analyse = AnalyseCLI(self._get_website)
+        self.concurrency = concurrency
+        self.per_host_concurrency = per_host_concurrency
+        self.pool_size = pool_size
+        self.timeout = timeout
+        self.retries = retries
+        self.max_page_size = max_page_size
+        self.link_extractor = link_extractor
+        self.checkpoint = checkpoint
+        self.resume = resume
+        self.checkpoint_interval = checkpoint_interval
+        self.seen_index = seen_index
+        self.seen_capacity = seen_capacity
+        self.max_crawl_delay = max_crawl_delay
+        self.previous = previous
+        self._previous_website: Optional[website_analyser.shared.website.Website] = None
+        self.cache = cache
+        self.cache_size = cache_size
+        self.replay = replay
+        self.check_links = check_links
+        self.link_cache = link_cache
+        self.link_cache_ttl = link_cache_ttl
+        self.canonicalizer = website_analyser.shared.canonical.Canonicalizer(
+            website_analyser.shared.canonical.CanonicalizationRules(
+                strip_tracking_parameters=strip_tracking, follow_rel_canonical=rel_canonical,
+            )
+        )
+        results_cache = None
+        if analysis_cache is not None:
+            results_cache = website_analyser.analysing.cache.AnalysisCache(analysis_cache, analysis_cache_size)
+        self.analyse = AnalyseCLI(
+            self._get_website,
+            workers,
+            results_cache,
+            # structures loaded from JSON are canonicalized, so their results depend on the rules
+            hashlib.sha256(repr(self.canonicalizer.rules).encode()).hexdigest()[:16],
+            metrics_engine,
+        )
         self._set_up_logging(logging_level)
 
-    def parse_structure(self, url: str, output: Optional[str] = None) -> Optional[str]:
+    def parse_structure(self, url: str, output: Optional[str] = None, diff: Optional[str] = None) -> Optional[str]:
+        """With `--previous`, `diff` is the path to write changes since the previous structure to."""
+        if diff is not None and self.previous is None:
+            raise ValueError("--diff requires --previous structure to compare with")
+        if output is not None and website_analyser.parsing.sink.is_json_lines_path(output):
+            with website_analyser.parsing.sink.JsonLinesSink(output, "a" if self.resume else "w") as sink:
+                self._get_website_structure_from_url(url, sink)
+            if diff is not None:
+                self._save_diff(self._get_website(output), diff)
+            return None
         website_structure = self._get_website_structure_from_url(url)
+        if diff is not None:
+            self._save_diff(website_structure, diff)
         if output is None:
             return website_structure.to_json()
+        elif website_analyser.shared.binary_snapshot.is_snapshot_path(output):
+            website_analyser.shared.binary_snapshot.save(
+                website_analyser.shared.compact_website.CompactWebsite.from_website(website_structure), output,
+            )
         else:
             website_structure.save(output)
-            return None
+        return None
 
     def explore(self, path_or_url: str) -> None:
         """Simple text based UI"""
-        TextUI(self._get_website(path_or_url)).run()
+        TextUI(self._get_website(path_or_url), self.canonicalizer).run()
+
+    def serve(
+            self,
+            path_or_url: str,
+            host: str = website_analyser.analysing.server.HOST,
+            port: int = website_analyser.analysing.server.PORT,
+            cached_paths: int = website_analyser.analysing.server.CACHED_PATHS,
+    ) -> None:
+        """HTTP server answering JSON queries about the structure, kept in memory until interrupted"""
+        queries = website_analyser.analysing.server.WebsiteQueries(
+            self._get_website(path_or_url), self.canonicalizer, cached_paths,
+        )
+        with website_analyser.analysing.server.QueryServer(queries, host, port) as server:
+            print(f"Serving queries on {server.url}, stop with Ctrl+C", flush=True)
+            try:
+                server.serve_forever()
+            except KeyboardInterrupt:
+                pass
 
-    def _get_website(self, path_or_url: str) -> website_analyser.shared.website.Website:
+    def _get_website(self, path_or_url: str) -> AnyWebsite:
         if website_analyser.shared.url_utils.is_uri(path_or_url):
             return self._get_website_structure_from_url(path_or_url)
-        return website_analyser.shared.website.Website.load(path_or_url)
+        if website_analyser.shared.binary_snapshot.is_snapshot_path(path_or_url):
+            return website_analyser.shared.binary_snapshot.load(path_or_url)
+        if website_analyser.parsing.sink.is_json_lines_path(path_or_url):
+            return website_analyser.shared.website.Website.load_json_lines(path_or_url, self.canonicalizer)
+        return website_analyser.shared.website.Website.load(path_or_url, self.canonicalizer)
 
-    def _get_website_structure_from_url(self, url: str) -> website_analyser.shared.website.Website:
+    def _get_website_structure_from_url(
+            self, url: str, sink: Optional[website_analyser.parsing.sink.JsonLinesSink] = None,
+    ) -> website_analyser.shared.website.Website:
+        response_cache = None
+        if self.cache is not None:
+            response_cache = website_analyser.parsing.response_cache.ResponseCache(self.cache, self.cache_size)
+        link_status_cache = None
+        if self.link_cache is not None:
+            link_status_cache = website_analyser.parsing.link_checker.LinkStatusCache(
+                self.link_cache, self.link_cache_ttl,
+            )
+        checkpoint = None
+        if self.checkpoint is not None:
+            checkpoint = website_analyser.parsing.frontier.CrawlCheckpoint(self.checkpoint, url, self.resume)
+        frontier = website_analyser.parsing.frontier.Frontier(
+            checkpoint, self.checkpoint_interval, self._get_seen_urls(), retain_webpages=sink is None,
+        )
+        fetcher = website_analyser.parsing.fetcher.Fetcher(
+            pool_size=max(self.pool_size, self.concurrency),
+            timeout=self.timeout,
+            retries=self.retries,
+            cache=response_cache,
+            replay=self.replay,
+            max_cached_body_size=self.max_page_size,
+        )
+        link_checker = None
+        if self.check_links:
+            link_checker = website_analyser.parsing.link_checker.LinkChecker(
+                fetcher, link_status_cache, per_host_concurrency=self.per_host_concurrency,
+            )
         extractor = website_analyser.parsing.extract.fair_extractor.FairExtractor(
             starting_url=url,
             propagate_to_sub_domains=self.sub_domains,
             restrict_only_to_sitemaps=self.only_sitemaps,
+            concurrency=self.concurrency,
+            per_host_concurrency=self.per_host_concurrency,
+            fetcher=fetcher,
+            max_page_size=self.max_page_size,
+            link_extractor=self.link_extractor,
+            sink=sink,
+            frontier=frontier,
+            canonicalizer=self.canonicalizer,
+            max_crawl_delay=self.max_crawl_delay,
+            previous=self._get_previous_website(),
+            link_checker=link_checker,
         )
-        return extractor.extract_website_structure()
+        try:
+            return extractor.extract_website_structure()
+        finally:
+            frontier.close()
+            if checkpoint is not None:
+                checkpoint.close()
+            if response_cache is not None:
+                response_cache.close()
+            if link_status_cache is not None:
+                link_status_cache.close()
+
+    def _get_previous_website(self) -> Optional[website_analyser.shared.website.Website]:
+        if self.previous is None or self._previous_website is not None:
+            return self._previous_website
+        previous = self._get_website(self.previous)
+        if isinstance(previous, website_analyser.shared.compact_website.CompactWebsite):
+            previous = previous.to_website()
+        self._previous_website = previous
+        return previous
+
+    def _save_diff(self, website: AnyWebsite, file_path: str) -> None:
+        diff = website_analyser.analysing.diff.WebsiteDiff.between(self._get_previous_website(), website)
+        logging.getLogger(self.__class__.__name__).info(f"Changes since previous structure: {diff.summary()}")
+        with open(file_path, "w") as f_h:
+            f_h.write(diff.report())
+
+    def _get_seen_urls(self) -> website_analyser.parsing.seen.SeenUrlsBase:
+        if self.seen_index == "exact":
+            return website_analyser.parsing.seen.ExactSeenUrls()
+        if self.seen_index == "bloom":
+            return website_analyser.parsing.seen.BloomSeenUrls(capacity=self.seen_capacity)
+        raise ValueError(f"Unknown seen index {self.seen_index}, use one of exact, bloom")
 
     @staticmethod
     def _set_up_logging(level: Union[str, int]) -> None:
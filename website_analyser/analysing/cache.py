@@ -0,0 +1,104 @@
+import hashlib
+import json
+import os
+import sqlite3
+from typing import Any, Callable, Optional
+
+from website_analyser.mixins.logger_mixin import LoggerMixin
+
+MAX_SIZE = 256 * 2 ** 20
+CHUNK_SIZE = 2 ** 20
+
+
+class AnalysisCache(LoggerMixin):
+    """Analysis results of stored structures in SQLite, keyed by SHA-256 of the structure file and the result name.
+
+    A result computed by another version of its algorithm is recomputed, results of structure files that changed since
+    are dropped. Files are hashed again only when their size or modification time change. When stored results exceed
+    `max_size` bytes, least recently used ones are evicted. Results have to be JSON serializable.
+    """
+
+    def __init__(self, file_path: str, max_size: Optional[int] = MAX_SIZE) -> None:
+        self.max_size = max_size
+        self.hits = 0
+        self.misses = 0
+        self._connection = sqlite3.connect(file_path)
+        with self._connection:
+            self._connection.execute(
+                "CREATE TABLE IF NOT EXISTS sources (path TEXT PRIMARY KEY, size INTEGER, mtime INTEGER, hash TEXT)"
+            )
+            self._connection.execute(
+                "CREATE TABLE IF NOT EXISTS results ("
+                "hash TEXT, name TEXT, version INTEGER, value TEXT, accessed INTEGER, PRIMARY KEY (hash, name))"
+            )
+        self._clock = self._connection.execute("SELECT COALESCE(MAX(accessed), 0) FROM results").fetchone()[0]
+
+    def get_or_compute(self, source_path: str, name: str, version: int, compute: Callable[[], Any]) -> Any:
+        content_hash = self.content_hash(source_path)
+        self._clock += 1
+        with self._connection:
+            row = self._connection.execute(
+                "SELECT version, value FROM results WHERE hash = ? AND name = ?", (content_hash, name),
+            ).fetchone()
+            # every analysis module bumps the version of its results whenever they change, so cached ones are recomputed
+            if row is not None and row[0] == version:
+                self.hits += 1
+                self._connection.execute(
+                    "UPDATE results SET accessed = ? WHERE hash = ? AND name = ?", (self._clock, content_hash, name),
+                )
+                self.logger.debug(f"Using cached {name} of {source_path}")
+                return json.loads(row[1])
+        self.misses += 1
+        value = compute()
+        with self._connection:
+            self._connection.execute(
+                "INSERT OR REPLACE INTO results VALUES (?, ?, ?, ?, ?)",
+                (content_hash, name, version, json.dumps(value), self._clock),
+            )
+            if self.max_size is not None:
+                self._evict()
+        return value
+
+    def content_hash(self, source_path: str) -> str:
+        path = os.path.abspath(source_path)
+        stat = os.stat(path)
+        row = self._connection.execute("SELECT size, mtime, hash FROM sources WHERE path = ?", (path, )).fetchone()
+        if row is not None and row[:2] == (stat.st_size, stat.st_mtime_ns):
+            return row[2]
+        self.logger.debug(f"Hashing {path}")
+        digest = hashlib.sha256()
+        with open(path, "rb") as f_h:
+            for chunk in iter(lambda: f_h.read(CHUNK_SIZE), b""):
+                digest.update(chunk)
+        content_hash = digest.hexdigest()
+        with self._connection:
+            self._connection.execute(
+                "INSERT OR REPLACE INTO sources VALUES (?, ?, ?, ?)",
+                (path, stat.st_size, stat.st_mtime_ns, content_hash),
+            )
+            if row is not None and row[2] != content_hash:
+                self._drop_unreferenced(row[2])
+        return content_hash
+
+    def close(self) -> None:
+        self.logger.debug(f"{self.hits} hits, {self.misses} misses")
+        self._connection.close()
+
+    def _drop_unreferenced(self, content_hash: str) -> None:
+        """Results of a file content, no longer stored at any known path."""
+        if self._connection.execute("SELECT 1 FROM sources WHERE hash = ?", (content_hash, )).fetchone() is None:
+            deleted = self._connection.execute("DELETE FROM results WHERE hash = ?", (content_hash, )).rowcount
+            self.logger.debug(f"Dropped {deleted} results of a changed structure")
+
+    def _evict(self) -> None:
+        size = self._connection.execute("SELECT COALESCE(SUM(LENGTH(value)), 0) FROM results").fetchone()[0]
+        rows = self._connection.execute("SELECT hash, name, LENGTH(value) FROM results ORDER BY accessed")
+        evicted = []
+        for content_hash, name, value_size in rows:
+            if size <= self.max_size:
+                break
+            evicted.append((content_hash, name))
+            size -= value_size
+        self._connection.executemany("DELETE FROM results WHERE hash = ? AND name = ?", evicted)
+        if evicted:
+            self.logger.debug(f"Evicted {len(evicted)} results")
@@ -0,0 +1,108 @@
+import array
+import collections
+from typing import List, Optional, Sequence, Tuple
+
+import website_analyser.shared.compact_website
+
+CompactWebsite = website_analyser.shared.compact_website.CompactWebsite
+
+UNVISITED = -1
+ORPHAN = "orphan"
+UNREACHABLE = "unreachable"
+
+
+def strongly_connected_components(graph: CompactWebsite) -> Tuple[Sequence[int], int]:
+    """Iterative Tarjan. Returns component of every page and components count.
+
+    Components are numbered in reverse topological order: a link between two components always points to the one with
+    the lower number.
+    """
+    offsets, targets = graph.offsets, graph.targets
+    order = array.array("i", [UNVISITED]) * graph.size
+    low_link = array.array("i", [0]) * graph.size
+    component = array.array("i", [UNVISITED]) * graph.size
+    on_stack = bytearray(graph.size)
+    stack: List[int] = []
+    counter = 0
+    components_count = 0
+    for root in range(graph.size):
+        if order[root] != UNVISITED:
+            continue
+        order[root] = low_link[root] = counter
+        counter += 1
+        stack.append(root)
+        on_stack[root] = True
+        work: List[Tuple[int, int]] = [(root, offsets[root])]
+        while work:
+            page, edge = work[-1]
+            if edge < offsets[page + 1]:
+                work[-1] = (page, edge + 1)
+                linked = targets[edge]
+                if order[linked] == UNVISITED:
+                    order[linked] = low_link[linked] = counter
+                    counter += 1
+                    stack.append(linked)
+                    on_stack[linked] = True
+                    work.append((linked, offsets[linked]))
+                elif on_stack[linked] and order[linked] < low_link[page]:
+                    low_link[page] = order[linked]
+                continue
+            work.pop()
+            if work and low_link[page] < low_link[work[-1][0]]:
+                low_link[work[-1][0]] = low_link[page]
+            if low_link[page] == order[page]:
+                while True:
+                    member = stack.pop()
+                    on_stack[member] = False
+                    component[member] = components_count
+                    if member == page:
+                        break
+                components_count += 1
+    return component, components_count
+
+
+def component_sizes(component: Sequence[int], components_count: int) -> List[int]:
+    sizes = [0] * components_count
+    for page_component in component:
+        sizes[page_component] += 1
+    return sizes
+
+
+def main_component(component: Sequence[int], accept_webpages: Sequence[bool]) -> Optional[int]:
+    """Component with most accepted pages. Of equally large ones, the one with the highest number: none of the others
+    links to it.
+    """
+    counts = collections.Counter(component[page] for page in range(len(component)) if accept_webpages[page])
+    if not counts:
+        return None
+    return max(counts, key=lambda page_component: (counts[page_component], page_component))
+
+
+def find_orphans(
+        graph: CompactWebsite, accept_webpages: Sequence[bool], component: Optional[Sequence[int]] = None,
+) -> List[Tuple[int, str]]:
+    """Accepted pages no other page links to (orphans) and pages not reachable from the main component.
+
+    Pages of the main component reach each other, so pages reachable from any of them are reachable from all.
+    """
+    if component is None:
+        component, _ = strongly_connected_components(graph)
+    main = main_component(component, accept_webpages)
+    if main is None:
+        return []
+    is_reached = bytearray(graph.size)
+    start = next(page for page in range(graph.size) if component[page] == main)
+    is_reached[start] = True
+    queue = [start]
+    for page in queue:
+        for linked in graph.successors(page):
+            if not is_reached[linked]:
+                is_reached[linked] = True
+                queue.append(linked)
+    orphans = []
+    for page in range(graph.size):
+        if not accept_webpages[page] or is_reached[page]:
+            continue
+        is_linked = any(linking != page for linking in graph.predecessors(page))
+        orphans.append((page, UNREACHABLE if is_linked else ORPHAN))
+    return orphans
@@ -0,0 +1,181 @@
+import array
+import dataclasses
+import heapq
+from typing import List, Optional, Sequence, Tuple
+
+import website_analyser.analysing.components
+import website_analyser.shared.compact_website
+from website_analyser.mixins.logger_mixin import LoggerMixin
+
+CompactWebsite = website_analyser.shared.compact_website.CompactWebsite
+
+UNREACHED = -1
+NONE = -1  # bound of a page that reaches (or is reached from) no accepted page
+
+
+@dataclasses.dataclass
+class LongestShortestPath:
+    from_page: int
+    to_page: int
+    distance: int
+    searches: int
+
+
+class LongestShortestPathFinder(LoggerMixin):
+    """Exact longest shortest path between accepted pages, without a BFS from every page.
+
+    Every page keeps an upper bound of its eccentricity (the farthest accepted page it reaches) and of its
+    in-eccentricity (the farthest accepted page it is reached from). Initial bounds come from the condensation of
+    strongly connected components. A BFS from `v` gives exact value for `v` and, by triangle inequality, tightens
+    bounds of pages in the component of `v`. The longest path equals the maximal eccentricity and the maximal
+    in-eccentricity, so pages are searched forward and backward in order of their bounds until the best path found is
+    not shorter than any remaining bound on either side.
+    """
+
+    def __init__(self, graph: CompactWebsite, accepted: Sequence[bool]) -> None:
+        self.graph = graph
+        self.accepted = accepted
+        self.component, components_count = website_analyser.analysing.components.strongly_connected_components(graph)
+        self.out_bounds, self.in_bounds = self._get_condensation_bounds(components_count)
+        self.is_out_exact = bytearray(graph.size)
+        self.is_in_exact = bytearray(graph.size)
+        self.searches = 0
+        self._best: Optional[Tuple[int, int, int]] = None
+
+    def find(self) -> Optional[LongestShortestPath]:
+        accepted_pages = [page for page in range(self.graph.size) if self.accepted[page]]
+        if not accepted_pages:
+            return None
+        self._best = (0, accepted_pages[0], accepted_pages[0])
+        hub = max(accepted_pages, key=self._degree)
+        hub_distances, hub_order = self._search_forward(hub)
+        self._search_backward(hub)
+        self._tighten(hub, hub_distances, hub_order, self.in_bounds)
+
+        out_heap = [(-self.out_bounds[page], page) for page in accepted_pages if not self.is_out_exact[page]]
+        in_heap = [(-self.in_bounds[page], page) for page in accepted_pages if not self.is_in_exact[page]]
+        heapq.heapify(out_heap)
+        heapq.heapify(in_heap)
+        forward = True
+        while True:
+            out_bound, out_page = self._top(out_heap, self.out_bounds, self.is_out_exact)
+            in_bound, in_page = self._top(in_heap, self.in_bounds, self.is_in_exact)
+            if out_bound <= self._best[0] or in_bound <= self._best[0]:
+                break
+            if forward:
+                self._search_forward(out_page)
+            else:
+                self._search_backward(in_page)
+            forward = not forward
+
+        distance, from_page, to_page = self._best
+        self.logger.debug(f"Found longest shortest path of length {distance} after {self.searches} searches")
+        return LongestShortestPath(from_page, to_page, distance, self.searches)
+
+    def _search_forward(self, page: int) -> Tuple[Sequence[int], List[int]]:
+        distances, order = self._search(page, self.graph.offsets, self.graph.targets)
+        farthest = self._farthest_accepted(order)
+        eccentricity = distances[farthest] if farthest is not None else NONE
+        self.out_bounds[page] = eccentricity
+        self.is_out_exact[page] = True
+        if farthest is not None and self.accepted[page]:
+            self._update_best(eccentricity, page, farthest)
+        self._tighten(page, distances, order, self.in_bounds)
+        return distances, order
+
+    def _search_backward(self, page: int) -> Tuple[Sequence[int], List[int]]:
+        distances, order = self._search(page, *self.graph.reverse_adjacency)
+        farthest = self._farthest_accepted(order)
+        eccentricity = distances[farthest] if farthest is not None else NONE
+        self.in_bounds[page] = eccentricity
+        self.is_in_exact[page] = True
+        if farthest is not None and self.accepted[page]:
+            self._update_best(eccentricity, farthest, page)
+        self._tighten(page, distances, order, self.out_bounds)
+        return distances, order
+
+    def _tighten(self, page: int, distances: Sequence[int], order: List[int], bounds: array.array) -> None:
+        """For `other` in the component of `page`, reachable in `distance`: bound(other) <= distance + bound(page)."""
+        page_component, page_bound = self.component[page], bounds[page]
+        for other in order:
+            if self.component[other] == page_component:
+                bound = distances[other] + page_bound if page_bound != NONE else NONE
+                if bound < bounds[other]:
+                    bounds[other] = bound
+
+    def _search(self, page: int, offsets: Sequence[int], targets: Sequence[int]) -> Tuple[Sequence[int], List[int]]:
+        self.searches += 1
+        distances = array.array("i", [UNREACHED]) * self.graph.size
+        distances[page] = 0
+        order = [page]
+        for current in order:
+            distance = distances[current] + 1
+            for linked in targets[offsets[current]:offsets[current + 1]]:
+                if distances[linked] == UNREACHED:
+                    distances[linked] = distance
+                    order.append(linked)
+        return distances, order
+
+    def _degree(self, page: int) -> int:
+        return len(self.graph.successors(page)) + len(self.graph.predecessors(page))
+
+    def _farthest_accepted(self, order: List[int]) -> Optional[int]:
+        return next((page for page in reversed(order) if self.accepted[page]), None)
+
+    def _update_best(self, distance: int, from_page: int, to_page: int) -> None:
+        if self._best is None or distance > self._best[0]:
+            self._best = (distance, from_page, to_page)
+
+    @staticmethod
+    def _top(heap: List[Tuple[int, int]], bounds: Sequence[int], is_exact: bytearray) -> Tuple[int, int]:
+        while heap:
+            negated_bound, page = heap[0]
+            if is_exact[page]:
+                heapq.heappop(heap)
+            elif -negated_bound != bounds[page]:
+                heapq.heapreplace(heap, (-bounds[page], page))
+            else:
+                return bounds[page], page
+        return NONE, UNREACHED
+
+    def _get_condensation_bounds(self, components_count: int) -> Tuple[array.array, array.array]:
+        """A shortest path crosses a component at most once, spending at most `size - 1` links inside of it."""
+        sizes = website_analyser.analysing.components.component_sizes(self.component, components_count)
+        has_accepted = bytearray(components_count)
+        members: List[List[int]] = [[] for _ in range(components_count)]
+        for page, page_component in enumerate(self.component):
+            members[page_component].append(page)
+            if self.accepted[page]:
+                has_accepted[page_component] = True
+        reverse_offsets, reverse_sources = self.graph.reverse_adjacency
+
+        out_component_bounds = [NONE] * components_count
+        for component in range(components_count):
+            leaving = max((
+                out_component_bounds[self.component[linked]]
+                for page in members[component]
+                for linked in self.graph.successors(page)
+                if self.component[linked] != component
+            ), default=NONE)
+            out_component_bounds[component] = self._combine(sizes[component], has_accepted[component], leaving)
+
+        in_component_bounds = [NONE] * components_count
+        for component in reversed(range(components_count)):
+            entering = max((
+                in_component_bounds[self.component[linking]]
+                for page in members[component]
+                for linking in reverse_sources[reverse_offsets[page]:reverse_offsets[page + 1]]
+                if self.component[linking] != component
+            ), default=NONE)
+            in_component_bounds[component] = self._combine(sizes[component], has_accepted[component], entering)
+
+        return (
+            array.array("i", [out_component_bounds[page_component] for page_component in self.component]),
+            array.array("i", [in_component_bounds[page_component] for page_component in self.component]),
+        )
+
+    @staticmethod
+    def _combine(size: int, has_accepted: bool, neighbour_bound: int) -> int:
+        inside = size - 1 if has_accepted else NONE
+        outside = size + neighbour_bound if neighbour_bound != NONE else NONE
+        return max(inside, outside)
@@ -0,0 +1,68 @@
+import dataclasses
+from typing import List, Optional, Set, Tuple, Union
+
+import website_analyser.shared.compact_website
+import website_analyser.shared.website
+
+Website = website_analyser.shared.website.Website
+CompactWebsite = website_analyser.shared.compact_website.CompactWebsite
+
+Link = Tuple[str, str]
+
+
+@dataclasses.dataclass
+class WebsiteDiff:
+    """Structural changes between two crawls of a website."""
+    added_pages: List[str]
+    removed_pages: List[str]
+    added_links: List[Link]
+    removed_links: List[Link]
+    status_changes: List[Tuple[str, Optional[int], Optional[int]]]
+
+    @property
+    def is_empty(self) -> bool:
+        return not (
+            self.added_pages or self.removed_pages or self.added_links or self.removed_links or self.status_changes
+        )
+
+    @staticmethod
+    def between(
+            previous: Union[Website, CompactWebsite], current: Union[Website, CompactWebsite],
+    ) -> 'WebsiteDiff':
+        previous_graph, current_graph = CompactWebsite.of(previous), CompactWebsite.of(current)
+        previous_urls, current_urls = set(previous_graph.urls), set(current_graph.urls)
+        status_changes = []
+        for url in sorted(previous_urls & current_urls):
+            previous_status = previous_graph.status_code(previous_graph.index_of(url))
+            current_status = current_graph.status_code(current_graph.index_of(url))
+            if previous_status != current_status:
+                status_changes.append((url, previous_status, current_status))
+        previous_links, current_links = _links(previous_graph), _links(current_graph)
+        return WebsiteDiff(
+            added_pages=sorted(current_urls - previous_urls),
+            removed_pages=sorted(previous_urls - current_urls),
+            added_links=sorted(current_links - previous_links),
+            removed_links=sorted(previous_links - current_links),
+            status_changes=status_changes,
+        )
+
+    def report(self) -> str:
+        lines = [f"+ {url}" for url in self.added_pages]
+        lines.extend(f"- {url}" for url in self.removed_pages)
+        lines.extend(f"+ {url}\t{linked_url}" for url, linked_url in self.added_links)
+        lines.extend(f"- {url}\t{linked_url}" for url, linked_url in self.removed_links)
+        lines.extend(f"~ {url}\t{previous}\t{current}" for url, previous, current in self.status_changes)
+        return "\n".join(lines)
+
+    def summary(self) -> str:
+        return (
+            f"pages: +{len(self.added_pages)} -{len(self.removed_pages)}, "
+            f"links: +{len(self.added_links)} -{len(self.removed_links)}, "
+            f"status changes: {len(self.status_changes)}"
+        )
+
+
+def _links(graph: CompactWebsite) -> Set[Link]:
+    return {
+        (graph.urls[page], graph.urls[linked]) for page in range(graph.size) for linked in graph.successors(page)
+    }
@@ -1,35 +1,106 @@
-from typing import Collection, Dict, Optional, Set
+import collections
+from typing import Any, Dict, List, Optional, Sequence, Tuple, Union
 
+import website_analyser.analysing.components
 import website_analyser.analysing.paths
+import website_analyser.analysing.ranking
+import website_analyser.shared.compact_website
 import website_analyser.shared.webpage
 import website_analyser.shared.website
 
 Webpage = website_analyser.shared.webpage.Webpage
 Website = website_analyser.shared.website.Website
+CompactWebsite = website_analyser.shared.compact_website.CompactWebsite
 Paths = website_analyser.analysing.paths.Paths
 PagesPath = website_analyser.analysing.paths.PagesPath
+FROM_DOMAIN = website_analyser.shared.compact_website.FROM_DOMAIN
+DOMAIN = website_analyser.shared.compact_website.DOMAIN
+VERSION = 1
 
 
 class Explorer:
 
-    def __init__(self, website: Website, paths: Paths):
+    def __init__(self, website: Union[Website, CompactWebsite], paths: Paths):
         self.website = website
         self.paths = paths
+        self.graph = paths.graph
 
     def report_dead_links(self) -> str:
-        dead_links = {
-            page.url.url: linked.url.url
-            for page, linked_pages in self._find_dead_links().items()
-            for linked in linked_pages
+        return self.format_dead_links(self.get_dead_links())
+
+    def report_most_linked(self, top: Optional[int] = None, bot: Optional[int] = None) -> str:
+        return self.format_most_linked(self.get_times_linked(), top, bot)
+
+    def report_eccentricities(self) -> str:
+        return self.format_eccentricities(self.get_eccentricities())
+
+    def get_dead_links(self) -> List[Tuple[str, str]]:
+        return [(self.graph.urls[page], self.graph.urls[linked]) for page, linked in self._find_dead_links()]
+
+    def get_times_linked(self) -> Dict[str, int]:
+        return {self.graph.urls[page]: count for page, count in self._get_times_linked_count().items()}
+
+    def get_eccentricities(self) -> List[Tuple[str, int, int]]:
+        """Domain pages with their eccentricity and number of reachable domain pages, most eccentric first."""
+        is_from_domain = self.graph.flag_mask(FROM_DOMAIN)
+        domain_pages = [page for page in range(self.graph.size) if is_from_domain[page]]
+        summaries = sorted(
+            self.paths.get_source_summaries(domain_pages, is_from_domain),
+            key=lambda summary: (-summary.eccentricity, summary.source),
+        )
+        return [
+            (self.graph.urls[summary.source], summary.eccentricity, summary.reachable_count) for summary in summaries
+        ]
+
+    def get_page_ranks(
+            self,
+            damping: float = website_analyser.analysing.ranking.DAMPING,
+            tolerance: float = website_analyser.analysing.ranking.TOLERANCE,
+            max_iterations: int = website_analyser.analysing.ranking.MAX_ITERATIONS,
+    ) -> Dict[str, float]:
+        """PageRank of domain pages, computed over all pages."""
+        page_rank = website_analyser.analysing.ranking.PageRank(damping, tolerance, max_iterations)
+        ranks = page_rank.rank(self.graph).ranks
+        return {
+            self.graph.urls[page]: float(ranks[page])
+            for page in range(self.graph.size) if self.graph.has_flag(page, FROM_DOMAIN)
+        }
+
+    def get_components(self) -> Dict[str, Any]:
+        """Numbers of strongly connected components of domain pages and of domain pages outside the main one."""
+        component, _ = website_analyser.analysing.components.strongly_connected_components(self.graph)
+        is_from_domain = self.graph.flag_mask(FROM_DOMAIN)
+        sizes = collections.Counter(component[page] for page in range(self.graph.size) if is_from_domain[page])
+        reasons = collections.Counter(
+            reason for _, reason in website_analyser.analysing.components.find_orphans(
+                self.graph, is_from_domain, component,
+            )
+        )
+        return {
+            "domain_components": len(sizes),
+            "main_component_size": max(sizes.values(), default=0),
+            "single_page_components": sum(1 for size in sizes.values() if size == 1),
+            "orphans": reasons[website_analyser.analysing.components.ORPHAN],
+            "unreachable_from_main_component": reasons[website_analyser.analysing.components.UNREACHABLE],
         }
-        linked_in_max_url = max([len(url) for url in dead_links.keys()]) + 4
+
+    def get_orphans(self) -> List[Tuple[str, str]]:
+        """Domain pages not linked by others (`orphan`) or not reachable from the main component (`unreachable`)."""
+        orphans = website_analyser.analysing.components.find_orphans(self.graph, self.graph.flag_mask(FROM_DOMAIN))
+        return [(self.graph.urls[page], reason) for page, reason in orphans]
+
+    @staticmethod
+    def format_dead_links(dead_links: Sequence[Tuple[str, str]]) -> str:
+        if not dead_links:
+            return ""
+        linked_in_max_url = max([len(url) for url, _ in dead_links]) + 4
         single_line_template = f"{{url:<{linked_in_max_url}}}\t{{linked_url}}"
         return "\n".join(
-            [single_line_template.format(url=url, linked_url=linked_url) for url, linked_url in dead_links.items()]
+            [single_line_template.format(url=url, linked_url=linked_url) for url, linked_url in dead_links]
         )
 
-    def report_most_linked(self, top: Optional[int] = None, bot: Optional[int] = None) -> str:
-        times_linked = self._get_times_linked_count()
+    @staticmethod
+    def format_most_linked(times_linked: Dict[str, int], top: Optional[int] = None, bot: Optional[int] = None) -> str:
         if top:
             no = top
             reverse = True
@@ -38,28 +109,49 @@ class Explorer:
             reverse = False
         else:
             raise
-        relevant_webpages = sorted(times_linked, key=lambda x: times_linked[x], reverse=reverse)[:no]
-        url_field_len = max([len(page.url.url) for page in relevant_webpages]) + 4
+        relevant_urls = sorted(times_linked, key=lambda x: times_linked[x], reverse=reverse)[:no]
+        url_field_len = max([len(url) for url in relevant_urls]) + 4
         single_line_template = f"{{url:<{url_field_len}}}\t{{times_linked}}"
         return "\n".join([
-            single_line_template.format(url=page.url.url, times_linked=times_linked[page]) for page in relevant_webpages
+            single_line_template.format(url=url, times_linked=times_linked[url]) for url in relevant_urls
         ])
 
-    def _find_dead_links(self) -> Dict[Webpage, Set[Webpage]]:
-        dead_webpages = {
-            page for page in self.website.webpages
-            if page.response_status_code is not None and page.response_status_code != 200
-        }
-        return {page: page.linked_webpages.intersection(dead_webpages) for page in self.website.webpages}
+    @staticmethod
+    def format_eccentricities(eccentricities: Sequence[Tuple[str, int, int]]) -> str:
+        if not eccentricities:
+            return ""
+        url_field_len = max([len(url) for url, _, _ in eccentricities]) + 4
+        single_line_template = f"{{url:<{url_field_len}}}\t{{eccentricity}}\t{{reachable}}"
+        return "\n".join([
+            single_line_template.format(url=url, eccentricity=eccentricity, reachable=reachable)
+            for url, eccentricity, reachable in eccentricities
+        ])
 
-    def _get_times_linked_count(self, only_domain: bool = True) -> Dict[Webpage, int]:
-        if only_domain:
-            pages = {page for page in self.website.webpages if page.is_from_domain}
-        else:
-            pages = self.website.webpages
-        counts: Dict[Webpage, int] = {page: 0 for page in pages}
-        for page in pages:
-            for linked in page.linked_webpages:
-                if linked in pages:
-                    counts[linked] += 1
-        return counts
+    @staticmethod
+    def format_page_ranks(page_ranks: Dict[str, float]) -> str:
+        if not page_ranks:
+            return ""
+        url_field_len = max([len(url) for url in page_ranks]) + 4
+        single_line_template = f"{{url:<{url_field_len}}}\t{{rank:.3e}}"
+        return "\n".join([single_line_template.format(url=url, rank=rank) for url, rank in page_ranks.items()])
+
+    @staticmethod
+    def format_orphans(orphans: Sequence[Tuple[str, str]]) -> str:
+        if not orphans:
+            return ""
+        url_field_len = max([len(url) for url, _ in orphans]) + 4
+        single_line_template = f"{{url:<{url_field_len}}}\t{{reason}}"
+        return "\n".join([single_line_template.format(url=url, reason=reason) for url, reason in orphans])
+
+    def _find_dead_links(self) -> List[Tuple[int, int]]:
+        return sorted(
+            (page, linked) for linked in self.graph.link_index.dead_pages for page in self.graph.predecessors(linked)
+        )
+
+    def _get_times_linked_count(self, only_domain: bool = True) -> Dict[int, int]:
+        """Number of links into every page from domain pages, or from any page."""
+        if not only_domain:
+            offsets, _ = self.graph.reverse_adjacency
+            return {page: offsets[page + 1] - offsets[page] for page in range(self.graph.size)}
+        times_linked = self.graph.link_index.in_degrees[DOMAIN]
+        return {page: times_linked[page] for page in range(self.graph.size) if self.graph.has_flag(page, FROM_DOMAIN)}
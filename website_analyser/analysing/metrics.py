@@ -1,29 +1,43 @@
-from typing import Collection, Dict, Any
+from typing import Dict, Any, Sequence, Union
 
 import website_analyser.analysing.paths
+import website_analyser.shared.compact_website
 import website_analyser.shared.webpage
 import website_analyser.shared.website
 from website_analyser.mixins.logger_mixin import LoggerMixin
 
 Webpage = website_analyser.shared.webpage.Webpage
 Website = website_analyser.shared.website.Website
+CompactWebsite = website_analyser.shared.compact_website.CompactWebsite
 Paths = website_analyser.analysing.paths.Paths
 PagesPath = website_analyser.analysing.paths.PagesPath
+FROM_DOMAIN = website_analyser.shared.compact_website.FROM_DOMAIN
+FROM_DOMAIN_SPACE = website_analyser.shared.compact_website.FROM_DOMAIN_SPACE
+NO_VALUE = website_analyser.shared.compact_website.NO_VALUE
+DOMAIN = website_analyser.shared.compact_website.DOMAIN
+DOMAIN_SPACE = website_analyser.shared.compact_website.DOMAIN_SPACE
+EXTERNAL = website_analyser.shared.compact_website.EXTERNAL
+VERSION = 1
 
 
 class MetricsReporter(LoggerMixin):
 
-    def __init__(self, website: Website, paths: Paths) -> None:
+    def __init__(self, website: Union[Website, CompactWebsite], paths: Paths) -> None:
         self.website = website
         self.paths = paths
+        self.graph = paths.graph
         self.metrics: Dict[str, Any] = {}
 
     @property
     def report(self) -> str:
-        metric_name_len = max([len(name) for name in self.metrics.keys()]) + 4
+        return self.format_metrics(self.metrics)
+
+    @staticmethod
+    def format_metrics(metrics: Dict[str, Any]) -> str:
+        metric_name_len = max([len(name) for name in metrics.keys()]) + 4
         single_metric_template = f"{{metric:<{metric_name_len}}}\t{{value}}"
         return "\n".join(
-            [single_metric_template.format(metric=metric, value=value) for metric, value in self.metrics.items()]
+            [single_metric_template.format(metric=metric, value=value) for metric, value in metrics.items()]
         )
 
     def add_metrics(self) -> None:
@@ -32,52 +46,36 @@ class MetricsReporter(LoggerMixin):
         self._add_size_metrics()
 
     def _add_path_metrics(self) -> None:
-        longest_domain_path = self.get_longest_path({page for page in self.website.webpages if page.is_from_domain})
-        longest_dom_space_path = self.get_longest_path(
-            {page for page in self.website.webpages if page.is_from_domain_space}
+        longest_domain_path = self.get_longest_path(self.graph.flag_mask(FROM_DOMAIN))
+        longest_dom_space_path = self.get_longest_path(self.graph.flag_mask(FROM_DOMAIN_SPACE))
+        domain_from, domain_to = self.graph.urls[longest_domain_path[0]], self.graph.urls[longest_domain_path[-1]]
+        dom_space_from, dom_space_to = (
+            self.graph.urls[longest_dom_space_path[0]], self.graph.urls[longest_dom_space_path[-1]]
         )
-        self._add_metric("longest_domain_path", f"{longest_domain_path[0].url} -> -.. -> {longest_domain_path[-1].url}")
+        self._add_metric("longest_domain_path", f"{domain_from} -> -.. -> {domain_to}")
         self._add_metric("longest_domain_path_length", len(longest_domain_path))
-        self._add_metric(
-            "longest_domain_space_path",
-            f"{longest_dom_space_path[0].url} -> ... -> {longest_dom_space_path[-1].url}",
-        )
+        self._add_metric("longest_domain_space_path", f"{dom_space_from} -> ... -> {dom_space_to}")
         self._add_metric("longest_domain_space_path_length", len(longest_dom_space_path))
 
     def _add_links_metrics(self) -> None:
-        links_to_domain = self.get_links_count({page for page in self.website.webpages if page.is_from_domain})
-        links_to_dom_space = self.get_links_count({page for page in self.website.webpages if page.is_from_domain_space})
-        links_to_external = self.get_links_count(
-            {page for page in self.website.webpages if not page.is_from_domain and not page.is_from_domain_space}
-        )
-
-        self._add_metric("average_internal_links", sum(links_to_domain.values())/len(links_to_domain))
-        self._add_metric("average_sub_domains_links", sum(links_to_dom_space.values()) / len(links_to_dom_space))
-        self._add_metric("average_external_links", sum(links_to_external.values()) / len(links_to_external))
+        self._add_metric("average_internal_links", self.get_average_links(DOMAIN))
+        self._add_metric("average_sub_domains_links", self.get_average_links(DOMAIN_SPACE))
+        self._add_metric("average_external_links", self.get_average_links(EXTERNAL))
 
     def _add_size_metrics(self) -> None:
-        sizes = [
-            page.response_content_length
-            for page in self.website.webpages
-            if page.response_content_length is not None
-        ]
-        self._add_metric("average_size", sum(sizes) / len(self.website.webpages))
+        sizes = [size for size in self.graph.content_lengths if size != NO_VALUE]
+        self._add_metric("average_size", sum(sizes) / self.graph.size)
 
     def _add_metric(self, metric_name: str, metric_value: Any) -> None:
         self.logger.debug(f"Adding metric: {metric_name}")
         self.metrics[metric_name] = metric_value
 
-    def get_longest_path(self, accept_webpages: Collection[Webpage]) -> PagesPath:
-        paths_flat = [
-            path
-            for from_web, to_web_paths in self.paths.webpages_shortest_paths.items()
-            for to_web, path in to_web_paths.items()
-            if from_web in accept_webpages and to_web in accept_webpages
-        ]
-        return max(paths_flat, key=lambda x: len(x))
+    def get_longest_path(self, accept_webpages: Sequence[bool]) -> PagesPath:
+        longest = self.paths.find_longest_shortest_path(accept_webpages)
+        if longest is None:
+            raise ValueError("No webpages to find the longest path between")
+        return longest
 
-    def get_links_count(self, accept_coming_into: Collection[Webpage]) -> Dict[Webpage, int]:
-        webpage_to_links_no: Dict[Webpage, int] = {}
-        for page in self.website.webpages:
-            webpage_to_links_no[page] = len(page.linked_webpages.intersection(accept_coming_into))
-        return webpage_to_links_no
+    def get_average_links(self, category: str) -> float:
+        """Average number of links per page to pages of the category."""
+        return sum(self.graph.link_index.out_degrees[category]) / self.graph.size
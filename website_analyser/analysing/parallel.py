@@ -0,0 +1,138 @@
+import array
+import concurrent.futures
+import dataclasses
+import multiprocessing.shared_memory
+from typing import Dict, Iterator, List, Optional, Sequence, Tuple
+
+import website_analyser.shared.compact_website
+from website_analyser.mixins.logger_mixin import LoggerMixin
+
+CompactWebsite = website_analyser.shared.compact_website.CompactWebsite
+
+UNREACHED = -1
+
+
+@dataclasses.dataclass
+class SourceSummary:
+    """Aggregates of a BFS from `source`, counted over accepted target pages only."""
+    source: int
+    eccentricity: int
+    farthest_page: int
+    reachable_count: int
+    distance_histogram: Tuple[int, ...]
+
+
+def summarize_source(
+        source: int,
+        offsets: Sequence[int],
+        targets: Sequence[int],
+        accepted: Sequence[int],
+) -> SourceSummary:
+    size = len(offsets) - 1
+    distances = array.array("i", [UNREACHED]) * size
+    distances[source] = 0
+    visit_order = [source]
+    for current in visit_order:
+        distance = distances[current] + 1
+        for linked in targets[offsets[current]:offsets[current + 1]]:
+            if distances[linked] == UNREACHED:
+                distances[linked] = distance
+                visit_order.append(linked)
+    histogram: List[int] = []
+    farthest_page = source
+    for page in visit_order:
+        if accepted[page]:
+            distance = distances[page]
+            while len(histogram) <= distance:
+                histogram.append(0)
+            histogram[distance] += 1
+            farthest_page = page
+    return SourceSummary(
+        source=source,
+        eccentricity=distances[farthest_page],
+        farthest_page=farthest_page,
+        reachable_count=sum(histogram),
+        distance_histogram=tuple(histogram),
+    )
+
+
+class SharedAdjacency:
+    """CSR adjacency and accepted-targets mask copied once to shared memory, for read only use by worker processes."""
+
+    def __init__(self, graph: CompactWebsite, accepted: Sequence[bool]) -> None:
+        self._blocks: Dict[str, multiprocessing.shared_memory.SharedMemory] = {}
+        self._share("offsets", array.array("q", graph.offsets))
+        self._share("targets", array.array("I", graph.targets))
+        self._share("accepted", array.array("B", accepted))
+
+    @property
+    def names(self) -> Dict[str, Tuple[str, str]]:
+        return {name: (block.name, _TYPECODES[name]) for name, block in self._blocks.items()}
+
+    def _share(self, name: str, values: array.array) -> None:
+        raw = values.tobytes()
+        # empty blocks can't be created, a block of one item still casts to an array of the right type
+        block = multiprocessing.shared_memory.SharedMemory(create=True, size=max(len(raw), values.itemsize))
+        block.buf[:len(raw)] = raw
+        self._blocks[name] = block
+
+    def __enter__(self) -> 'SharedAdjacency':
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        for block in self._blocks.values():
+            block.close()
+            block.unlink()
+        self._blocks.clear()
+
+
+_TYPECODES = {"offsets": "q", "targets": "I", "accepted": "B"}
+_worker_blocks: List[multiprocessing.shared_memory.SharedMemory] = []
+_worker_arrays: Dict[str, Sequence[int]] = {}
+
+
+def _attach(names: Dict[str, Tuple[str, str]], sizes: Dict[str, int]) -> None:
+    for name, (block_name, typecode) in names.items():
+        block = multiprocessing.shared_memory.SharedMemory(name=block_name)
+        _worker_blocks.append(block)
+        # blocks may be longer than requested (rounded up to pages on some platforms), only the shared items are cast
+        _worker_arrays[name] = block.buf[:sizes[name] * array.array(typecode).itemsize].cast(typecode)
+
+
+def _summarize_chunk(sources: List[int]) -> List[SourceSummary]:
+    offsets, targets, accepted = _worker_arrays["offsets"], _worker_arrays["targets"], _worker_arrays["accepted"]
+    return [summarize_source(source, offsets, targets, accepted) for source in sources]
+
+
+class SourcesSummarizer(LoggerMixin):
+    """Runs BFS from every given source, sharding sources across `workers` processes."""
+
+    def __init__(self, graph: CompactWebsite, workers: int = 1, chunks_per_worker: int = 8) -> None:
+        self.graph = graph
+        self.workers = workers
+        self.chunks_per_worker = chunks_per_worker
+
+    def summarize(
+            self,
+            sources: Optional[Sequence[int]] = None,
+            accepted: Optional[Sequence[bool]] = None,
+    ) -> Iterator[SourceSummary]:
+        sources = range(self.graph.size) if sources is None else sources
+        accepted = [True] * self.graph.size if accepted is None else accepted
+        if self.workers <= 1:
+            for source in sources:
+                yield summarize_source(source, self.graph.offsets, self.graph.targets, accepted)
+            return
+        yield from self._summarize_in_processes(list(sources), accepted)
+
+    def _summarize_in_processes(self, sources: List[int], accepted: Sequence[bool]) -> Iterator[SourceSummary]:
+        chunk_size = max(1, len(sources) // (self.workers * self.chunks_per_worker))
+        chunks = [sources[start:start + chunk_size] for start in range(0, len(sources), chunk_size)]
+        sizes = {"offsets": len(self.graph.offsets), "targets": len(self.graph.targets), "accepted": self.graph.size}
+        self.logger.debug(f"Summarizing {len(sources)} sources in {len(chunks)} chunks on {self.workers} workers")
+        with SharedAdjacency(self.graph, accepted) as shared:
+            with concurrent.futures.ProcessPoolExecutor(
+                    max_workers=self.workers, initializer=_attach, initargs=(shared.names, sizes),
+            ) as executor:
+                for summaries in executor.map(_summarize_chunk, chunks):
+                    yield from summaries
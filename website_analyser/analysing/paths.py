@@ -1,47 +1,145 @@
-from typing import Dict, List, Set, Tuple
+import array
+import collections
+import dataclasses
+from typing import Callable, Dict, Iterator, List, Optional, Sequence, Set, Tuple, Union
 
+import website_analyser.analysing.diameter
+import website_analyser.analysing.parallel
+import website_analyser.shared.compact_website
 import website_analyser.shared.webpage
 import website_analyser.shared.website
 from website_analyser.mixins.logger_mixin import LoggerMixin
 
 Webpage = website_analyser.shared.webpage.Webpage
 Website = website_analyser.shared.website.Website
-PagesPath = Tuple[Webpage, ...]
+CompactWebsite = website_analyser.shared.compact_website.CompactWebsite
+SourceSummary = website_analyser.analysing.parallel.SourceSummary
+PagesPath = Tuple[int, ...]
+
+UNREACHED = -1
+
+
+@dataclasses.dataclass
+class ShortestPathsTree:
+    """Result of a BFS from `source`. Pages are listed in `visit_order` by non-decreasing distance."""
+    source: int
+    distances: Sequence[int]
+    predecessors: Sequence[int]
+    visit_order: List[int]
+
+    def is_reachable(self, page: int) -> bool:
+        return self.distances[page] != UNREACHED
+
+    def path_to(self, page: int) -> Optional[PagesPath]:
+        if not self.is_reachable(page):
+            return None
+        path = [page]
+        while page != self.source:
+            page = self.predecessors[page]
+            path.append(page)
+        return tuple(reversed(path))
 
 
 class Paths(LoggerMixin):
 
-    def __init__(self, website: Website) -> None:
+    def __init__(self, website: Union[Website, CompactWebsite], cached_sources: int = 16, workers: int = 1) -> None:
         self.website = website
-        self.webpages_shortest_paths: Dict[Webpage, Dict[Webpage, PagesPath]] = {
-            page: {} for page in self.website.webpages
-        }
-
-    def find_all_shortest_paths(self) -> None:
-        for from_webpage in self.website.webpages:
-            self._find_shortest(from_webpage)
-
-    def _find_shortest(self, from_page: Webpage) -> None:
-        self.logger.debug(f"Finding all shortest paths from {from_page}")
-        shortest_paths = self._get_shortest_paths(from_page)
-        for path in shortest_paths:
-            to_page = path[-1]
-            self.webpages_shortest_paths[from_page][to_page] = path
-
-    def _get_shortest_paths(self, from_page: Webpage) -> List[PagesPath]:
-        visited: Set[Webpage] = set()
-        shortest_paths: List[PagesPath] = []
-        paths_to_process: List[PagesPath] = [(from_page,)]
-        while paths_to_process:
-            path = paths_to_process.pop(0)
-            current_page: Webpage = path[-1]
-            if current_page not in visited:
-                visited.add(current_page)
-                shortest_paths.append(path)
-                paths_to_process.extend(
-                    [path + (linked, ) for linked in current_page.linked_webpages if linked not in visited]  # noqa
-                )
-        return shortest_paths
+        self.graph = CompactWebsite.of(website)
+        self.cached_sources = cached_sources
+        self.workers = workers
+        self._trees: Dict[int, ShortestPathsTree] = collections.OrderedDict()
+
+    def get_shortest_path(self, from_page: int, to_page: int) -> Optional[PagesPath]:
+        return self.get_shortest_paths_tree(from_page).path_to(to_page)
+
+    def get_shortest_paths_tree(self, from_page: int) -> ShortestPathsTree:
+        tree = self._trees.pop(from_page, None)
+        if tree is None:
+            tree = self.find_shortest_paths_tree(from_page)
+        self._trees[from_page] = tree
+        while len(self._trees) > self.cached_sources:
+            self._trees.pop(next(iter(self._trees)))
+        return tree
+
+    def find_shortest_paths_tree(self, from_page: int) -> ShortestPathsTree:
+        self.logger.debug(f"Finding all shortest paths from {self.graph.urls[from_page]}")
+        offsets, targets = self.graph.offsets, self.graph.targets
+        distances = array.array("i", [UNREACHED]) * self.graph.size
+        predecessors = array.array("i", [UNREACHED]) * self.graph.size
+        distances[from_page] = 0
+        visit_order = [from_page]
+        for current in visit_order:
+            distance = distances[current] + 1
+            for linked in targets[offsets[current]:offsets[current + 1]]:
+                if distances[linked] == UNREACHED:
+                    distances[linked] = distance
+                    predecessors[linked] = current
+                    visit_order.append(linked)
+        return ShortestPathsTree(from_page, distances, predecessors, visit_order)
+
+    def find_shortest_path(self, from_page: int, to_page: int) -> Optional[PagesPath]:
+        """Bidirectional BFS, expanding the smaller frontier. Visits only pages closer than the meeting point.
+
+        Searches stay disjoint until they meet, so the first page found by both lies on a shortest path.
+        """
+        if from_page == to_page:
+            return (from_page, )
+        forward: Dict[int, int] = {from_page: UNREACHED}
+        backward: Dict[int, int] = {to_page: UNREACHED}
+        forward_frontier, backward_frontier = [from_page], [to_page]
+        while forward_frontier and backward_frontier:
+            if len(forward_frontier) <= len(backward_frontier):
+                forward_frontier, meeting = _expand(forward_frontier, forward, backward, self.graph.successors)
+            else:
+                backward_frontier, meeting = _expand(backward_frontier, backward, forward, self.graph.predecessors)
+            if meeting is not None:
+                return tuple(reversed(_follow(forward, meeting))) + tuple(_follow(backward, meeting)[1:])
+        return None
+
+    def find_longest_shortest_path(self, accept_webpages: Sequence[bool]) -> Optional[PagesPath]:
+        finder = website_analyser.analysing.diameter.LongestShortestPathFinder(self.graph, accept_webpages)
+        longest = finder.find()
+        if longest is None:
+            return None
+        return self.get_shortest_path(longest.from_page, longest.to_page)
+
+    def get_source_summaries(
+            self,
+            from_pages: Optional[Sequence[int]] = None,
+            accept_to_pages: Optional[Sequence[bool]] = None,
+    ) -> Iterator[SourceSummary]:
+        summarizer = website_analyser.analysing.parallel.SourcesSummarizer(self.graph, self.workers)
+        return summarizer.summarize(from_pages, accept_to_pages)
+
+    def path_urls(self, path: PagesPath) -> List[str]:
+        return [self.graph.urls[page] for page in path]
+
+
+def _expand(
+        frontier: List[int],
+        parents: Dict[int, int],
+        other_parents: Dict[int, int],
+        neighbours: Callable[[int], Sequence[int]],
+) -> Tuple[List[int], Optional[int]]:
+    """Next BFS level of one side of a bidirectional search and the first page already reached by the other side."""
+    next_frontier = []
+    for current in frontier:
+        for neighbour in neighbours(current):
+            if neighbour in parents:
+                continue
+            parents[neighbour] = current
+            if neighbour in other_parents:
+                return next_frontier, neighbour
+            next_frontier.append(neighbour)
+    return next_frontier, None
+
+
+def _follow(parents: Dict[int, int], page: int) -> List[int]:
+    chain = [page]
+    while parents[page] != UNREACHED:
+        page = parents[page]
+        chain.append(page)
+    return chain
 
 
 def construct_shortest_paths(webpages: Set[Webpage]) -> Dict[Webpage, Dict[Webpage, List[Webpage]]]:
@@ -0,0 +1,70 @@
+import dataclasses
+
+import numpy
+
+import website_analyser.analysing.vectorized
+import website_analyser.shared.compact_website
+from website_analyser.mixins.logger_mixin import LoggerMixin
+
+CompactWebsite = website_analyser.shared.compact_website.CompactWebsite
+GraphArrays = website_analyser.analysing.vectorized.GraphArrays
+
+VERSION = 1
+DAMPING = 0.85
+TOLERANCE = 1e-6
+MAX_ITERATIONS = 100
+
+
+@dataclasses.dataclass
+class PageRanks:
+    ranks: numpy.ndarray
+    iterations: int
+    # total change of ranks in the last iteration
+    delta: float
+    has_converged: bool
+
+
+class PageRank(LoggerMixin):
+    """PageRank by power iteration over the link arrays, a sparse matrix-vector product per iteration.
+
+    Rank of pages without links is spread over all pages. Iterates until ranks change by less than `tolerance` in
+    total (L1 norm) or `max_iterations` are made.
+    """
+
+    def __init__(
+            self,
+            damping: float = DAMPING,
+            tolerance: float = TOLERANCE,
+            max_iterations: int = MAX_ITERATIONS,
+    ) -> None:
+        if not 0 <= damping < 1:
+            raise ValueError(f"Damping has to be in [0, 1), got {damping}")
+        self.damping = damping
+        self.tolerance = tolerance
+        self.max_iterations = max_iterations
+
+    def rank(self, graph: CompactWebsite) -> PageRanks:
+        arrays = GraphArrays.of(graph)
+        size = arrays.size
+        if not size:
+            return PageRanks(numpy.zeros(0), 0, 0.0, True)
+        out_degrees = numpy.bincount(arrays.sources, minlength=size)
+        is_dangling = out_degrees == 0
+        # every link passes the same share of its source's rank
+        link_weights = 1 / out_degrees[arrays.sources]
+        ranks = numpy.full(size, 1 / size)
+        delta = float("inf")
+        iterations = 0
+        while iterations < self.max_iterations and delta >= self.tolerance:
+            passed = numpy.bincount(arrays.targets, weights=ranks[arrays.sources] * link_weights, minlength=size)
+            spread = ranks[is_dangling].sum() / size
+            new_ranks = self.damping * (passed + spread) + (1 - self.damping) / size
+            delta = float(numpy.abs(new_ranks - ranks).sum())
+            ranks = new_ranks
+            iterations += 1
+        has_converged = delta < self.tolerance
+        if has_converged:
+            self.logger.debug(f"PageRank converged in {iterations} iterations")
+        else:
+            self.logger.warning(f"PageRank didn't converge in {iterations} iterations, last change {delta:.2e}")
+        return PageRanks(ranks, iterations, delta, has_converged)
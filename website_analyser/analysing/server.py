@@ -0,0 +1,194 @@
+import functools
+import http.server
+import json
+import threading
+import urllib.parse
+from typing import Any, Callable, Dict, List, Optional, Tuple, Union
+
+import website_analyser.analysing.explorer
+import website_analyser.analysing.paths
+import website_analyser.shared.canonical
+import website_analyser.shared.compact_website
+import website_analyser.shared.url_utils
+import website_analyser.shared.website
+from website_analyser.mixins.logger_mixin import LoggerMixin
+
+Website = website_analyser.shared.website.Website
+CompactWebsite = website_analyser.shared.compact_website.CompactWebsite
+Canonicalizer = website_analyser.shared.canonical.Canonicalizer
+
+HOST = "127.0.0.1"
+PORT = 8000
+CACHED_PATHS = 100_000
+DEFAULT_TOP = 10
+
+
+class QueryError(Exception):
+
+    def __init__(self, status: int, message: str) -> None:
+        super().__init__(message)
+        self.status = status
+
+
+class WebsiteQueries(LoggerMixin):
+    """Answers to queries about a website kept in memory. Safe to use from many threads.
+
+    Shortest paths are searched on demand and the most recent `cached_paths` are kept. Dead links and link counts are
+    computed on the first query for them.
+    """
+
+    def __init__(
+            self,
+            website: Union[Website, CompactWebsite],
+            canonicalizer: Optional[Canonicalizer] = None,
+            cached_paths: int = CACHED_PATHS,
+    ) -> None:
+        self.paths = website_analyser.analysing.paths.Paths(website)
+        self.graph = self.paths.graph
+        self.canonicalizer = canonicalizer or Canonicalizer()
+        self.explorer = website_analyser.analysing.explorer.Explorer(website, self.paths)
+        # built now (with the reverse adjacency), so that threads don't race to build it on their first queries
+        self.graph.link_index
+        self._find_shortest_path = functools.lru_cache(maxsize=cached_paths)(self.paths.find_shortest_path)
+        self._lock = threading.Lock()
+        self._dead_links: Optional[List[Tuple[str, str]]] = None
+        self._most_linked: Optional[List[Tuple[str, int]]] = None
+        self._least_linked: Optional[List[Tuple[str, int]]] = None
+
+    def shortest_path(self, from_url: str, to_url: str) -> Dict[str, Any]:
+        path = self._find_shortest_path(self._index_of(from_url), self._index_of(to_url))
+        return {"path": None if path is None else self.paths.path_urls(path)}
+
+    def links(self, url: str) -> Dict[str, Any]:
+        page = self._index_of(url)
+        return {
+            "url": self.graph.urls[page],
+            "status_code": self.graph.status_code(page),
+            "linked": [self.graph.urls[linked] for linked in self.graph.successors(page)],
+            "linked_by": [self.graph.urls[linking] for linking in self.graph.predecessors(page)],
+        }
+
+    def dead_links(self) -> Dict[str, Any]:
+        with self._lock:
+            if self._dead_links is None:
+                self._dead_links = self.explorer.get_dead_links()
+        return {"dead_links": [{"url": url, "linked_url": linked_url} for url, linked_url in self._dead_links]}
+
+    def most_linked(self, top: Optional[int] = None, bot: Optional[int] = None) -> Dict[str, Any]:
+        """Domain pages with most links to them, or with least of them if `bot` is given."""
+        with self._lock:
+            if self._most_linked is None:
+                # sorted the way the text report is, pages linked equally often stay in URL order
+                times_linked = list(self.explorer.get_times_linked().items())
+                self._most_linked = sorted(times_linked, key=lambda item: item[1], reverse=True)
+                self._least_linked = sorted(times_linked, key=lambda item: item[1])
+        if bot is not None:
+            selected = self._least_linked[:bot]
+        else:
+            selected = self._most_linked[:DEFAULT_TOP if top is None else top]
+        return {"most_linked": [{"url": url, "times_linked": count} for url, count in selected]}
+
+    def stats(self) -> Dict[str, Any]:
+        info = self._find_shortest_path.cache_info()
+        return {
+            "pages": self.graph.size,
+            "links": self.graph.edges_count,
+            "cached_paths": info.currsize,
+            "path_cache_hits": info.hits,
+            "path_cache_misses": info.misses,
+        }
+
+    def _index_of(self, url: str) -> int:
+        clean_url = self.canonicalizer.canonicalize(url) or website_analyser.shared.url_utils.create_clean_url(url)
+        if clean_url not in self.graph:
+            raise QueryError(404, f"Didn't find {clean_url} in website")
+        return self.graph.index_of(clean_url)
+
+
+class QueryRequestHandler(http.server.BaseHTTPRequestHandler):
+    """JSON answers to `GET /path?from=&to=`, `/links?url=`, `/dead_links`, `/most_linked?top=|bot=` and `/stats`."""
+    protocol_version = "HTTP/1.1"
+    # headers and body are written separately, which on a kept-alive connection would wait for a delayed ACK
+    disable_nagle_algorithm = True
+    server: 'QueryServer'
+
+    def do_GET(self) -> None:
+        parts = urllib.parse.urlsplit(self.path)
+        parameters = dict(urllib.parse.parse_qsl(parts.query))
+        endpoint = ENDPOINTS.get(parts.path)
+        try:
+            if endpoint is None:
+                raise QueryError(404, f"Unknown endpoint {parts.path}, use one of {', '.join(ENDPOINTS)}")
+            self._send(200, endpoint(self.server.queries, parameters))
+        except QueryError as exc:
+            self._send(exc.status, {"error": str(exc)})
+
+    def log_message(self, format: str, *args: Any) -> None:
+        self.server.logger.debug(f"{self.address_string()} {format % args}")
+
+    def _send(self, status: int, answer: Dict[str, Any]) -> None:
+        body = json.dumps(answer).encode()
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+
+class QueryServer(http.server.ThreadingHTTPServer, LoggerMixin):
+    """Serves queries about one website, every connection in its own thread."""
+    daemon_threads = True
+
+    def __init__(self, queries: WebsiteQueries, host: str = HOST, port: int = PORT) -> None:
+        super().__init__((host, port), QueryRequestHandler)
+        self.queries = queries
+
+    @property
+    def url(self) -> str:
+        host, port = self.server_address[:2]
+        return f"http://{host}:{port}"
+
+
+def _required(parameters: Dict[str, str], name: str) -> str:
+    value = parameters.get(name)
+    if not value:
+        raise QueryError(400, f"Missing parameter {name}")
+    return value
+
+
+def _optional_int(parameters: Dict[str, str], name: str) -> Optional[int]:
+    if name not in parameters:
+        return None
+    try:
+        return int(parameters[name])
+    except ValueError:
+        raise QueryError(400, f"Parameter {name} has to be an int")
+
+
+def _path(queries: WebsiteQueries, parameters: Dict[str, str]) -> Dict[str, Any]:
+    return queries.shortest_path(_required(parameters, "from"), _required(parameters, "to"))
+
+
+def _links(queries: WebsiteQueries, parameters: Dict[str, str]) -> Dict[str, Any]:
+    return queries.links(_required(parameters, "url"))
+
+
+def _dead_links(queries: WebsiteQueries, parameters: Dict[str, str]) -> Dict[str, Any]:
+    return queries.dead_links()
+
+
+def _most_linked(queries: WebsiteQueries, parameters: Dict[str, str]) -> Dict[str, Any]:
+    return queries.most_linked(_optional_int(parameters, "top"), _optional_int(parameters, "bot"))
+
+
+def _stats(queries: WebsiteQueries, parameters: Dict[str, str]) -> Dict[str, Any]:
+    return queries.stats()
+
+
+ENDPOINTS: Dict[str, Callable[[WebsiteQueries, Dict[str, str]], Dict[str, Any]]] = {
+    "/path": _path,
+    "/links": _links,
+    "/dead_links": _dead_links,
+    "/most_linked": _most_linked,
+    "/stats": _stats,
+}
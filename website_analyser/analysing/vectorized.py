@@ -0,0 +1,142 @@
+import dataclasses
+from typing import Dict, List, Optional, Union
+
+import numpy
+
+import website_analyser.analysing.metrics
+import website_analyser.analysing.paths
+import website_analyser.shared.compact_website
+import website_analyser.shared.website
+
+Website = website_analyser.shared.website.Website
+Paths = website_analyser.analysing.paths.Paths
+CompactWebsite = website_analyser.shared.compact_website.CompactWebsite
+FROM_DOMAIN = website_analyser.shared.compact_website.FROM_DOMAIN
+FROM_DOMAIN_SPACE = website_analyser.shared.compact_website.FROM_DOMAIN_SPACE
+NO_VALUE = website_analyser.shared.compact_website.NO_VALUE
+VERSION = 1
+SIZE_PERCENTILES = (50, 90, 99)
+
+
+@dataclasses.dataclass
+class GraphArrays:
+    """Website graph as NumPy arrays: category masks and values of pages, sources and targets of links."""
+    is_domain: numpy.ndarray
+    is_domain_space: numpy.ndarray
+    is_external: numpy.ndarray
+    content_lengths: numpy.ndarray
+    status_codes: numpy.ndarray
+    sources: numpy.ndarray
+    targets: numpy.ndarray
+
+    @property
+    def size(self) -> int:
+        return len(self.status_codes)
+
+    @staticmethod
+    def of(graph: CompactWebsite) -> 'GraphArrays':
+        flags = numpy.asarray(graph.flags, dtype=numpy.uint8)
+        offsets = numpy.asarray(graph.offsets, dtype=numpy.int64)
+        return GraphArrays(
+            is_domain=(flags & FROM_DOMAIN) != 0,
+            is_domain_space=(flags & FROM_DOMAIN_SPACE) != 0,
+            is_external=(flags & (FROM_DOMAIN | FROM_DOMAIN_SPACE)) == 0,
+            content_lengths=numpy.asarray(graph.content_lengths, dtype=numpy.int64),
+            status_codes=numpy.asarray(graph.status_codes, dtype=numpy.int64),
+            sources=numpy.repeat(numpy.arange(graph.size, dtype=numpy.int64), numpy.diff(offsets)),
+            targets=numpy.asarray(graph.targets, dtype=numpy.int64),
+        )
+
+
+class VectorizedMetricsReporter(website_analyser.analysing.metrics.MetricsReporter):
+    """Computes link and size metrics with NumPy reductions over the graph arrays, adding degree distributions, size
+    percentiles and a status codes histogram. Paths are searched as by MetricsReporter.
+    """
+
+    def __init__(self, website: Union[Website, CompactWebsite], paths: Paths) -> None:
+        super().__init__(website, paths)
+        self.arrays = GraphArrays.of(self.graph)
+
+    def add_metrics(self) -> None:
+        super().add_metrics()
+        self._add_distribution_metrics()
+
+    def _add_links_metrics(self) -> None:
+        targets = self.arrays.targets
+        for metric_name, is_linked_counted in (
+                ("average_internal_links", self.arrays.is_domain),
+                ("average_sub_domains_links", self.arrays.is_domain_space),
+                ("average_external_links", self.arrays.is_external),
+        ):
+            self._add_metric(metric_name, int(numpy.count_nonzero(is_linked_counted[targets])) / self.arrays.size)
+
+    def _add_size_metrics(self) -> None:
+        sizes = self.arrays.content_lengths
+        self._add_metric("average_size", int(sizes[sizes != NO_VALUE].sum()) / self.arrays.size)
+
+    def _add_distribution_metrics(self) -> None:
+        out_degrees = numpy.bincount(self.arrays.sources, minlength=self.arrays.size)
+        in_degrees = numpy.bincount(self.arrays.targets, minlength=self.arrays.size)
+        self._add_metric("out_degree_distribution", degree_histogram(out_degrees))
+        self._add_metric("in_degree_distribution", degree_histogram(in_degrees))
+        sizes = self.arrays.content_lengths[self.arrays.content_lengths != NO_VALUE]
+        if len(sizes):
+            percentiles = numpy.percentile(sizes, SIZE_PERCENTILES, method="lower")
+            self._add_metric("size_percentiles", {
+                f"p{percentile}": int(value) for percentile, value in zip(SIZE_PERCENTILES, percentiles)
+            })
+        status_codes, counts = numpy.unique(self.arrays.status_codes, return_counts=True)
+        self._add_metric("status_codes", {
+            "unknown" if status_code == NO_VALUE else str(status_code): int(count)
+            for status_code, count in zip(status_codes.tolist(), counts)
+        })
+
+
+def degree_histogram(degrees: numpy.ndarray) -> Dict[str, int]:
+    """Numbers of pages with degree 0, 1, 2-3, 4-7 and so on, up to the highest degree."""
+    if not len(degrees):
+        return {}
+    buckets = numpy.zeros(len(degrees), dtype=numpy.int64)
+    has_links = degrees > 0
+    buckets[has_links] = numpy.floor(numpy.log2(degrees[has_links])).astype(numpy.int64) + 1
+    histogram = {}
+    for bucket, count in enumerate(numpy.bincount(buckets)):
+        if bucket == 0:
+            histogram["0"] = int(count)
+            continue
+        low, high = 2 ** (bucket - 1), 2 ** bucket - 1
+        histogram[str(low) if low == high else f"{low}-{high}"] = int(count)
+    return histogram
+
+
+def select_extreme(values: numpy.ndarray, count: int, largest: bool = True) -> numpy.ndarray:
+    """Indices of `count` largest (or smallest) values, ordered as a stable sort would order them.
+
+    Values are partitioned around the `count`-th one, so only the values not worse than it are sorted.
+    """
+    keys = -values if largest else values
+    if count <= 0:
+        return numpy.zeros(0, dtype=numpy.int64)
+    if count >= len(keys):
+        return numpy.argsort(keys, kind="stable")
+    threshold = keys[numpy.argpartition(keys, count - 1)[count - 1]]
+    candidates = numpy.flatnonzero(keys <= threshold)
+    return candidates[numpy.argsort(keys[candidates], kind="stable")][:count]
+
+
+def select_extremes(
+        values: Dict[str, Union[int, float]], top: Optional[int] = None, bot: Optional[int] = None,
+) -> Dict[str, Union[int, float]]:
+    """`top` URLs with the largest values or `bot` with the smallest, in the order a stable sort of `values` gives.
+
+    It's the subset of link counts which Explorer.format_most_linked shows.
+    """
+    urls: List[str] = list(values)
+    array = numpy.fromiter(values.values(), dtype=numpy.float64, count=len(urls))
+    if top:
+        selected = select_extreme(array, top, largest=True)
+    elif bot:
+        selected = select_extreme(array, bot, largest=False)
+    else:
+        raise ValueError("Either top or bot count of pages has to be given")
+    return {urls[index]: values[urls[index]] for index in selected}
@@ -0,0 +1,116 @@
+import collections
+import concurrent.futures
+import time
+from typing import Callable, Deque, Dict, Generic, Iterator, Optional, Tuple, TypeVar
+
+from website_analyser.mixins.logger_mixin import LoggerMixin
+
+Item = TypeVar("Item")
+Result = TypeVar("Result")
+
+
+class HostRateLimiter:
+    """Keeps at least `delay(host)` seconds between the starts of consecutive requests to a host."""
+
+    def __init__(self, delay: Callable[[str], float]) -> None:
+        self.delay = delay
+        self._next_start: Dict[str, float] = {}
+
+    def wait_time(self, host: str) -> float:
+        return max(0.0, self._next_start.get(host, 0.0) - time.monotonic())
+
+    def record(self, host: str) -> None:
+        delay = self.delay(host)
+        if delay > 0:
+            self._next_start[host] = time.monotonic() + delay
+
+    def wait(self, host: str) -> None:
+        wait_time = self.wait_time(host)
+        if wait_time > 0:
+            time.sleep(wait_time)
+        self.record(host)
+
+
+class HostLimitedPool(LoggerMixin, Generic[Item, Result]):
+    """Runs up to `max_in_flight` calls at once, at most `max_per_host` for one host. Items are queued per host.
+
+    With a rate limiter, items of a host are also not started sooner than its delay allows.
+    """
+
+    def __init__(
+            self,
+            function: Callable[[Item], Result],
+            max_in_flight: int,
+            max_per_host: Optional[int] = None,
+            rate_limiter: Optional[HostRateLimiter] = None,
+    ) -> None:
+        if max_in_flight < 1:
+            raise ValueError(f"max_in_flight has to be positive, got {max_in_flight}")
+        self.function = function
+        self.max_in_flight = max_in_flight
+        self.max_per_host = max_per_host or max_in_flight
+        self.rate_limiter = rate_limiter
+        self._queues: Dict[str, Deque[Item]] = collections.OrderedDict()
+        self._host_in_flight: Dict[str, int] = collections.Counter()
+        self._in_flight: Dict[concurrent.futures.Future, Tuple[str, Item]] = {}
+        self._executor: Optional[concurrent.futures.ThreadPoolExecutor] = None
+
+    def __enter__(self) -> 'HostLimitedPool[Item, Result]':
+        self._executor = concurrent.futures.ThreadPoolExecutor(max_workers=self.max_in_flight)
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        if self._executor is not None:
+            self._executor.shutdown(wait=True, cancel_futures=True)
+            self._executor = None
+
+    @property
+    def pending(self) -> int:
+        return sum(len(queue) for queue in self._queues.values()) + len(self._in_flight)
+
+    def submit(self, host: str, item: Item) -> None:
+        self._queues.setdefault(host, collections.deque()).append(item)
+
+    def completed(self) -> Iterator[Tuple[Item, Result]]:
+        while self.pending:
+            self._dispatch()
+            if not self._in_flight:
+                time.sleep(self._time_to_next_start() or 0)
+                continue
+            done, _ = concurrent.futures.wait(
+                self._in_flight, timeout=self._time_to_next_start(), return_when=concurrent.futures.FIRST_COMPLETED,
+            )
+            for future in done:
+                host, item = self._in_flight.pop(future)
+                self._host_in_flight[host] -= 1
+                yield item, future.result()
+
+    def _dispatch(self) -> None:
+        if self._executor is None:
+            raise RuntimeError("HostLimitedPool has to be used as a context manager")
+        for host in list(self._queues.keys()):
+            queue = self._queues[host]
+            while queue and self._has_capacity(host) and self._may_start(host):
+                item = queue.popleft()
+                self._in_flight[self._executor.submit(self.function, item)] = (host, item)
+                self._host_in_flight[host] += 1
+                if self.rate_limiter is not None:
+                    self.rate_limiter.record(host)
+            if not queue:
+                del self._queues[host]
+            if len(self._in_flight) >= self.max_in_flight:
+                return
+
+    def _has_capacity(self, host: str) -> bool:
+        return len(self._in_flight) < self.max_in_flight and self._host_in_flight[host] < self.max_per_host
+
+    def _may_start(self, host: str) -> bool:
+        return self.rate_limiter is None or self.rate_limiter.wait_time(host) <= 0
+
+    def _time_to_next_start(self) -> Optional[float]:
+        """Time until a queued host may start, None (wait for a completion) when no queued host is delayed."""
+        if self.rate_limiter is None:
+            return None
+        wait_times = [self.rate_limiter.wait_time(host) for host in self._queues]
+        delayed = [wait_time for wait_time in wait_times if wait_time > 0]
+        return min(delayed) if delayed and len(delayed) == len(wait_times) else None
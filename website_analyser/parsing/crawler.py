@@ -1,18 +1,26 @@
 import dataclasses
-import re
 import urllib.parse
-from typing import List, Iterable, Optional, Collection, Set, Tuple
+from typing import Dict, List, Optional, Collection, Set
 
-import bs4
 import requests
 import urllib3.exceptions
 
+import website_analyser.parsing.concurrency
+import website_analyser.parsing.fetcher
+import website_analyser.parsing.frontier
+import website_analyser.parsing.link_checker
+import website_analyser.parsing.links
+import website_analyser.parsing.robots
+import website_analyser.parsing.sink
+import website_analyser.shared.canonical
 import website_analyser.shared.url_utils
 import website_analyser.shared.webpage
+import website_analyser.shared.website
 from website_analyser.mixins.logger_mixin import LoggerMixin
 
 Url = website_analyser.shared.url_utils.Url
 Webpage = website_analyser.shared.webpage.Webpage
+HtmlResponse = website_analyser.parsing.fetcher.HtmlResponse
 
 
 @dataclasses.dataclass
@@ -27,71 +35,180 @@ class Crawler(LoggerMixin):
             self,
             starting_url: str,
             propagate_crawl_to_sub_domains: bool = False,
-            disallowed_url_patterns: Optional[Iterable[str]] = None,
+            robots: Optional[website_analyser.parsing.robots.RobotsCache] = None,
             crawl_only_pages: Optional[Collection[str]] = None,
+            concurrency: int = 1,
+            per_host_concurrency: Optional[int] = None,
+            fetcher: Optional[website_analyser.parsing.fetcher.Fetcher] = None,
+            max_content_size: Optional[int] = None,
+            link_extractor: str = "fast",
+            sink: Optional[website_analyser.parsing.sink.JsonLinesSink] = None,
+            frontier: Optional[website_analyser.parsing.frontier.Frontier] = None,
+            canonicalizer: Optional[website_analyser.shared.canonical.Canonicalizer] = None,
+            previous: Optional[website_analyser.shared.website.Website] = None,
+            link_checker: Optional[website_analyser.parsing.link_checker.LinkChecker] = None,
+            link_check_batch_size: int = 1000,
     ) -> None:
-        self.starting_url: Url = Url(starting_url)
+        self.canonicalizer = canonicalizer or website_analyser.shared.canonical.Canonicalizer()
+        self.starting_url: Url = Url(self.canonicalizer.canonicalize(starting_url) or starting_url)
         self.propagate_to_sub_domains = propagate_crawl_to_sub_domains
         self.crawl_only_pages = crawl_only_pages
-        self.resource_path_exclude_pattern: Optional[re.Pattern] = self._create_exclude_pattern(disallowed_url_patterns)
-
-    @staticmethod
-    def _create_exclude_pattern(exclusion_patterns: Optional[Iterable[str]]) -> Optional[re.Pattern]:
-        if exclusion_patterns is not None and exclusion_patterns:
-            return re.compile("|".join(re.escape(pat) for pat in exclusion_patterns))
-        return None
+        self.concurrency = concurrency
+        self.per_host_concurrency = per_host_concurrency
+        self.fetcher = fetcher or website_analyser.parsing.fetcher.Fetcher(pool_size=max(concurrency, 1))
+        self.max_content_size = max_content_size
+        if link_extractor not in website_analyser.parsing.links.LINK_EXTRACTORS:
+            raise ValueError(
+                f"Unknown link extractor {link_extractor}, "
+                f"use one of {', '.join(website_analyser.parsing.links.LINK_EXTRACTORS)}"
+            )
+        self.link_extractor = link_extractor
+        self.sink = sink
+        self.frontier = frontier if frontier is not None else website_analyser.parsing.frontier.Frontier()
+        self.robots = robots
+        self.rate_limiter = website_analyser.parsing.concurrency.HostRateLimiter(self._crawl_delay)
+        self.previous = previous
+        self.not_modified_count = 0
+        self.link_checker = link_checker
+        self.link_check_batch_size = link_check_batch_size
+        self._unchecked: List[Webpage] = []
 
     @property
-    def is_excluding_paths(self) -> bool:
-        return self.resource_path_exclude_pattern is not None
+    def is_following_robots(self) -> bool:
+        return self.robots is not None
 
     @property
     def is_restricting_search(self) -> bool:
         return bool(self.crawl_only_pages)
 
+    @property
+    def is_concurrent(self) -> bool:
+        return self.concurrency > 1
+
     def get_webpages(self) -> Set[Webpage]:
-        starting_webpage = self._create_webpage(self.starting_url.url)
-        webpages: Set[Webpage] = {starting_webpage}
-        crawl_tasks: List[Webpage] = [starting_webpage]
-        while crawl_tasks:
-            webpage = crawl_tasks.pop(0)
+        self.frontier.restore()
+        if not self.frontier.seen_count:
+            self.frontier.discover(self.starting_url.url, self._create_webpage)
+        try:
+            if self.is_concurrent:
+                self._crawl_concurrently()
+            else:
+                self._crawl_sequentially()
+            self._check_links()
+        finally:
+            self.frontier.save_checkpoint()
+        return self.frontier.webpages
+
+    def _crawl_sequentially(self) -> None:
+        while self.frontier:
+            webpage = self.frontier.pop()
             if self.should_crawl(webpage):
                 self.logger.info(f"Crawling {webpage}")
-                content, status, size = self._get_content_status_size(webpage)
-                webpage.set_response_status_code(status)
-                webpage.set_response_content_length(size)
-                if content:
-                    linked_webpages = self._extract_linked_webpages(content, webpage)
-                    already_exists = linked_webpages & webpages
-                    to_add = linked_webpages - already_exists
-                    webpage.linked_webpages.update(already_exists | to_add)
-                    webpages.update(to_add)
-                    crawl_tasks.extend(to_add)
-        return webpages
-
-    def _create_webpage(self, url: str, parent_webpage: Optional[Webpage] = None) -> Webpage:
-        parent_url_base = parent_webpage.url.url_base if parent_webpage else None
-        parent_url_resource = parent_webpage.url.resource_path if parent_webpage else None
-        url_obj = Url(website_analyser.shared.url_utils.create_clean_url(url, parent_url_base, parent_url_resource))
-        if (
-                self.is_excluding_paths
-                and url_obj.resource_path is not None
-                and self.resource_path_exclude_pattern.search(url_obj.resource_path)  # noqa
-        ):
-            is_url_accepted = False
-        else:
-            is_url_accepted = True
+                self.rate_limiter.wait(self._get_host(webpage))
+                self._handle_response(webpage, self._get_response(webpage))
+            else:
+                self._settle_not_crawled(webpage)
+
+    def _crawl_concurrently(self) -> None:
+        pool = website_analyser.parsing.concurrency.HostLimitedPool(
+            self._get_response, self.concurrency, self.per_host_concurrency, self.rate_limiter,
+        )
+        with pool:
+            self._submit_crawl_tasks(pool)
+            for webpage, response in pool.completed():
+                self._handle_response(webpage, response)
+                self._submit_crawl_tasks(pool)
+
+    def _submit_crawl_tasks(
+            self, pool: website_analyser.parsing.concurrency.HostLimitedPool[Webpage, HtmlResponse],
+    ) -> None:
+        while self.frontier:
+            webpage = self.frontier.pop()
+            if self.should_crawl(webpage):
+                self.logger.info(f"Crawling {webpage}")
+                pool.submit(self._get_host(webpage), webpage)
+            else:
+                self._settle_not_crawled(webpage)
+
+    def _handle_response(self, webpage: Webpage, response: HtmlResponse) -> None:
+        previous_webpage = self._get_previous_webpage(webpage)
+        if response.status == 304 and previous_webpage is not None:
+            self._reuse_previous_webpage(webpage, previous_webpage, response)
+            return
+        webpage.set_response_status_code(response.status)
+        webpage.set_response_content_length(response.size)
+        webpage.set_validators(response.etag, response.last_modified)
+        if response.content:
+            linked_urls = self._extract_linked_urls(response.content, webpage, response.url or webpage.url.url)
+            webpage.linked_webpages.update(self.frontier.discover(url, self._create_webpage) for url in linked_urls)
+        self._settle(webpage)
+
+    def _reuse_previous_webpage(self, webpage: Webpage, previous_webpage: Webpage, response: HtmlResponse) -> None:
+        """Not modified since the previous crawl, so its links are taken from there instead of the page."""
+        self.not_modified_count += 1
+        webpage.set_response_status_code(previous_webpage.response_status_code)
+        webpage.set_response_content_length(previous_webpage.response_content_length)
+        webpage.set_validators(
+            response.etag or previous_webpage.etag, response.last_modified or previous_webpage.last_modified,
+        )
+        webpage.linked_webpages.update(
+            self.frontier.discover(linked.url.url, self._create_webpage) for linked in previous_webpage.linked_webpages
+        )
+        self.logger.debug(f"{webpage} not modified, reused {len(previous_webpage.linked_webpages)} links")
+        self._settle(webpage)
+
+    def _get_previous_webpage(self, webpage: Webpage) -> Optional[Webpage]:
+        if self.previous is None:
+            return None
+        return self.previous.url_to_webpage.get(webpage.url.url)
+
+    def _settle_not_crawled(self, webpage: Webpage) -> None:
+        """With a link checker, pages are settled in batches, once their links are checked."""
+        if self.link_checker is None or not self.link_checker.should_check(webpage):
+            self._settle(webpage)
+            return
+        self._unchecked.append(webpage)
+        if len(self._unchecked) >= self.link_check_batch_size:
+            self._check_links()
+
+    def _check_links(self) -> None:
+        if not self._unchecked:
+            return
+        self.link_checker.check_webpages(self._unchecked)
+        for webpage in self._unchecked:
+            self._settle(webpage)
+        self._unchecked = []
+
+    def _settle(self, webpage: Webpage) -> None:
+        """Called once per webpage, when nothing about it changes anymore."""
+        if self.sink is not None:
+            self.sink.write(webpage)
+        self.frontier.settle(webpage)
+
+    def _create_webpage(self, clean_url: str) -> Webpage:
+        url_obj = Url(clean_url)
+        is_from_domain = url_obj.domain == self.starting_url.domain
+        is_from_domain_space = url_obj.shares_domain_space(self.starting_url)
+        # robots.txt of a host is fetched only once a page of it could be crawled, every host follows its own rules
+        is_crawled_host = is_from_domain or is_from_domain_space and self.propagate_to_sub_domains
+        is_accepted_path = self.robots.is_allowed(clean_url) if self.is_following_robots and is_crawled_host else True
         webpage = Webpage(
             url=url_obj,
             is_in_website_space=url_obj.url in self.crawl_only_pages if self.is_restricting_search else True,
-            is_from_domain=url_obj.domain == self.starting_url.domain,
-            is_from_domain_space=url_obj.shares_domain_space(self.starting_url),
-            is_accepted_path=is_url_accepted,
+            is_from_domain=is_from_domain,
+            is_from_domain_space=is_from_domain_space,
+            is_accepted_path=is_accepted_path,
         )
         self.logger.debug(f"Created {webpage}")
         return webpage
 
-    # TODO: sub-domains can have a different excluding pattern for urls...
+    def _crawl_delay(self, host: str) -> float:
+        return self.robots.crawl_delay(host) if self.is_following_robots else 0.0
+
+    @staticmethod
+    def _get_host(webpage: Webpage) -> str:
+        return website_analyser.parsing.robots.get_origin(webpage.url.url)
+
     def should_crawl(self, webpage: Webpage) -> bool:
         if webpage.is_in_website_space and webpage.is_accepted_path:
             if webpage.is_from_domain:
@@ -100,36 +217,39 @@ class Crawler(LoggerMixin):
                 return True
         return False
 
-    def _extract_linked_webpages(self, content: str, from_webpage: Webpage) -> Set[Webpage]:
-        links = Crawler._extract_raw_links(content)
-        links = Crawler._filter_links(links)
-        self.logger.debug(f"Gathered {len(links)} for {from_webpage}")
-        return {self._create_webpage(link, from_webpage) for link in links}
-
-    @staticmethod
-    def _get_content_status_size(webpage: Webpage) -> Tuple[Optional[str], int, Optional[int]]:
-        content: Optional[str] = None
-        status: int = 404  # TODO: Find a more reliable way of marking failure to parse url_obj
-        size: Optional[int] = None
+    def _extract_linked_urls(self, content: str, from_webpage: Webpage, page_url: str) -> List[str]:
+        """Canonical URLs of links, resolved against the (possibly redirected) URL of the page or its `<base href>`."""
+        links, base_href, canonical_href = website_analyser.parsing.links.LINK_EXTRACTORS[self.link_extractor](content)
+        base_url = urllib.parse.urljoin(page_url, base_href) if base_href else page_url
+        if canonical_href is not None:
+            canonical_url = self.canonicalizer.canonicalize(canonical_href, base_url)
+            if canonical_url is not None:
+                self.canonicalizer.add_alias(from_webpage.url.url, canonical_url)
+        # same document references are not links to other pages
+        canonical_urls = (self.canonicalizer.canonicalize(link, base_url) for link in links if not link.startswith("#"))
+        urls = [url for url in canonical_urls if url is not None]
+        self.logger.debug(f"Gathered {len(urls)} for {from_webpage}")
+        return urls
+
+    def _get_response(self, webpage: Webpage) -> HtmlResponse:
         try:
-            response = requests.get(webpage.url.url)
-            # TODO: This is `hacky` way. This function should be thoroughly rewritten and logic split to concerns
-            if "html" in response.headers.get("content-type", "html").lower():
-                if response.status_code == 200:
-                    content = response.text
-                status = response.status_code
-                size = response.headers.get("content-length")
-                size = int(size) if size else None
+            return self.fetcher.get_html(
+                webpage.url.url, max_size=self.max_content_size, headers=self._get_conditional_headers(webpage),
+            )
         except urllib3.exceptions.LocationParseError:
             pass
-        return content, status, size
-
-    @staticmethod
-    def _extract_raw_links(content: str) -> List[str]:
-        soup = bs4.BeautifulSoup(content, features="html.parser")
-        return [link_tag["href"] for link_tag in soup.find_all("a", href=True)]
-
-    # TODO: Possibly add more rules
-    @staticmethod
-    def _filter_links(links: List[str]) -> List[str]:
-        return [link for link in links if link == urllib.parse.quote(link, safe="/:")]
+        except requests.exceptions.RequestException as exc:
+            self.logger.warning(f"Failed to fetch {webpage}: {exc}")
+        # TODO: Find a more reliable way of marking failure to parse url_obj
+        return HtmlResponse(status=404)
+
+    def _get_conditional_headers(self, webpage: Webpage) -> Dict[str, str]:
+        previous_webpage = self._get_previous_webpage(webpage)
+        headers: Dict[str, str] = {}
+        if previous_webpage is None or previous_webpage.response_status_code != 200:
+            return headers
+        if previous_webpage.etag is not None:
+            headers["If-None-Match"] = previous_webpage.etag
+        if previous_webpage.last_modified is not None:
+            headers["If-Modified-Since"] = previous_webpage.last_modified
+        return headers
@@ -1,10 +1,14 @@
-from typing import List, Optional
-
-import bs4
-import requests
+from typing import Optional, Set
 
 import website_analyser.parsing.crawler
+import website_analyser.parsing.fetcher
+import website_analyser.parsing.frontier
+import website_analyser.parsing.link_checker
+import website_analyser.parsing.robots
+import website_analyser.parsing.sitemaps
+import website_analyser.parsing.sink
 import website_analyser.parsing.extract.base
+import website_analyser.shared.canonical
 import website_analyser.shared.url_utils
 import website_analyser.shared.webpage
 import website_analyser.shared.website
@@ -18,71 +22,94 @@ class FairExtractor(LoggerMixin, website_analyser.parsing.extract.base.Extractor
             starting_url: str,
             propagate_to_sub_domains: bool,
             restrict_only_to_sitemaps: bool,
+            concurrency: int = 1,
+            per_host_concurrency: Optional[int] = None,
+            fetcher: Optional[website_analyser.parsing.fetcher.Fetcher] = None,
+            max_page_size: Optional[int] = None,
+            link_extractor: str = "fast",
+            sink: Optional[website_analyser.parsing.sink.JsonLinesSink] = None,
+            frontier: Optional[website_analyser.parsing.frontier.Frontier] = None,
+            canonicalizer: Optional[website_analyser.shared.canonical.Canonicalizer] = None,
+            max_crawl_delay: float = 30.0,
+            previous: Optional[website_analyser.shared.website.Website] = None,
+            link_checker: Optional[website_analyser.parsing.link_checker.LinkChecker] = None,
     ) -> None:
-        self.starting_url = website_analyser.shared.url_utils.Url(starting_url)
+        self.canonicalizer = canonicalizer or website_analyser.shared.canonical.Canonicalizer()
+        self.starting_url = website_analyser.shared.url_utils.Url(
+            self.canonicalizer.canonicalize(starting_url) or starting_url
+        )
         self.propagate_to_sub_domains = propagate_to_sub_domains
         self.restrict_only_to_sitemaps = restrict_only_to_sitemaps
-        self.robots_txt_url = f"{self.starting_url.url_base}/robots.txt"
+        self.concurrency = concurrency
+        self.per_host_concurrency = per_host_concurrency
+        self.fetcher = fetcher or website_analyser.parsing.fetcher.Fetcher(pool_size=max(concurrency, 1))
+        self.max_page_size = max_page_size
+        self.link_extractor = link_extractor
+        self.sink = sink
+        self.frontier = frontier
+        self.previous = previous
+        self.link_checker = link_checker
+        self.robots = website_analyser.parsing.robots.RobotsCache(self.fetcher, max_crawl_delay=max_crawl_delay)
 
     def extract_website_structure(self) -> website_analyser.shared.website.Website:
-        robots_txt_content = self.get_robots_txt()
-        self.logger.debug("Received robots.txt" if robots_txt_content is not None else "No robots.txt")
-        crawler = self._get_crawler(robots_txt_content)
+        robots_rules = self.robots.rules_for(self.starting_url.url)
+        sitemaps_urls = self.get_sitemaps_urls(robots_rules)
+        crawler = self._get_crawler(sitemaps_urls)
         webpages = crawler.get_webpages()
-        if robots_txt_content is not None:
-            site_map_webpages = {
-                website_analyser.shared.webpage.Webpage(
-                    website_analyser.shared.url_utils.Url(url), True, True, True, True,
-                )
-                for url in self.get_sitemaps_urls(robots_txt_content)
-            }
-            webpages.update(site_map_webpages)
+        site_map_webpages = {
+            website_analyser.shared.webpage.Webpage(
+                website_analyser.shared.url_utils.Url(url), True, True, True, True,
+            )
+            for url in sitemaps_urls
+        }
+        for webpage in site_map_webpages:
+            if webpage.url.url not in crawler.frontier:
+                webpages.add(webpage)
+                if self.sink is not None:
+                    self.sink.write(webpage)
 
+        self.logger.info(f"Made {self.fetcher.requests_count} requests, received {self.fetcher.bytes_count} bytes")
+        if self.fetcher.cache is not None:
+            self.logger.info(f"Response cache: {self.fetcher.cache.hits} hits, {self.fetcher.cache.misses} misses")
+        if self.previous is not None:
+            self.logger.info(f"{crawler.not_modified_count} pages not modified since the previous crawl")
+        if self.link_checker is not None:
+            self.logger.info(
+                f"Checked {self.link_checker.checked_count} links, {self.link_checker.cached_count} known from cache"
+            )
+        self.logger.info(
+            f"Rewrote {self.canonicalizer.rewrites_count} URL occurrences to their canonical spelling, "
+            f"{len(self.canonicalizer.aliases)} pages are aliases of their rel=canonical"
+        )
         return website_analyser.shared.website.Website(webpages)
 
-    def _get_crawler(self, robots_txt_content: Optional[str]) -> website_analyser.parsing.crawler.Crawler:
+    def _get_crawler(self, sitemaps_urls: Set[str]) -> website_analyser.parsing.crawler.Crawler:
         allowed_pages = None
-        disallowed_patterns = None
-        if robots_txt_content is not None:
-            if self.restrict_only_to_sitemaps:
-                allowed_pages = self.get_sitemaps_urls(robots_txt_content)
-                self.logger.debug(f"Found {len(allowed_pages)} sized sitemap space")
-            disallowed_patterns = self.find_lines_values(robots_txt_content, "Disallow")
-            self.logger.debug(f"Found {len(disallowed_patterns)} unreachable directories")
+        if self.restrict_only_to_sitemaps:
+            allowed_pages = sitemaps_urls
+            self.logger.debug(f"Found {len(allowed_pages)} sized sitemap space")
         return website_analyser.parsing.crawler.Crawler(
             starting_url=self.starting_url.url,
             propagate_crawl_to_sub_domains=self.propagate_to_sub_domains,
-            disallowed_url_patterns=disallowed_patterns,
+            robots=self.robots,
             crawl_only_pages=allowed_pages,
+            concurrency=self.concurrency,
+            per_host_concurrency=self.per_host_concurrency,
+            fetcher=self.fetcher,
+            max_content_size=self.max_page_size,
+            link_extractor=self.link_extractor,
+            sink=self.sink,
+            frontier=self.frontier,
+            canonicalizer=self.canonicalizer,
+            previous=self.previous,
+            link_checker=self.link_checker,
         )
 
-    def get_robots_txt(self) -> Optional[str]:
-        response = requests.get(self.robots_txt_url)
-        if response.status_code == 200:
-            robots_txt: str = response.text
-            return robots_txt
-        return None
-
-    def get_sitemaps_urls(self, robots_txt_content: str) -> List[str]:
-        urls: List[str] = []
-        site_maps = self.find_lines_values(robots_txt_content, "Sitemap")
-        for s_map in site_maps:
-            urls.extend(self.find_pages_in_sitemap(s_map))
-        return urls
-
-    @staticmethod
-    def find_pages_in_sitemap(site_map_url: str) -> List[str]:
-        response = requests.get(site_map_url)
-        if response.status_code == 200:
-            soup = bs4.BeautifulSoup(response.text, features="html.parser")
-            return [website_analyser.shared.url_utils.create_clean_url(tag.text) for tag in soup.find_all(["loc"])]
-        return []
-
-    @staticmethod
-    def find_lines_values(robots_txt_content: str, line_key: str) -> List[str]:
-        line_key = line_key + ":"
-        values: List[str] = []
-        for line in robots_txt_content.split("\n"):
-            if line.startswith(line_key):
-                values.append(line.replace(line_key, "").strip())
-        return values
+    def get_sitemaps_urls(self, robots_rules: website_analyser.parsing.robots.RobotsRules) -> Set[str]:
+        reader = website_analyser.parsing.sitemaps.SitemapReader(
+            self.fetcher,
+            self.canonicalizer,
+            max(self.concurrency, website_analyser.parsing.sitemaps.CONCURRENCY),
+            self.per_host_concurrency,
+        )
+        return reader.read(robots_rules.sitemaps)
@@ -0,0 +1,185 @@
+import contextlib
+import dataclasses
+import threading
+import urllib.parse
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+import requests
+import requests.adapters
+import urllib3.util.retry
+
+import website_analyser.parsing.response_cache
+from website_analyser.mixins.logger_mixin import LoggerMixin
+
+USER_AGENT = "website-analyser"  # sent with every request and the name robots.txt groups are selected for
+
+
+@dataclasses.dataclass
+class HtmlResponse:
+    status: int
+    content: Optional[str] = None
+    size: Optional[int] = None
+    is_html: bool = True
+    is_truncated: bool = False
+    url: Optional[str] = None  # after redirects
+    etag: Optional[str] = None
+    last_modified: Optional[str] = None
+
+
+class Fetcher(LoggerMixin):
+    """Single entry point for HTTP traffic. Keeps one pooled keep-alive session per host and counts traffic.
+
+    With a response cache, GET requests are answered from it when possible; when replaying, only from it. Bodies longer
+    than `max_cached_body_size` bytes are not stored in the cache.
+    """
+
+    RETRY_STATUSES = (429, 500, 502, 503, 504)
+    CHUNK_SIZE = 64 * 1024
+
+    def __init__(
+            self,
+            pool_size: int = 10,
+            timeout: Optional[float] = 30.0,
+            retries: int = 2,
+            backoff_factor: float = 0.5,
+            cache: Optional[website_analyser.parsing.response_cache.ResponseCache] = None,
+            replay: bool = False,
+            max_cached_body_size: Optional[int] = None,
+    ) -> None:
+        if replay and cache is None:
+            raise ValueError("Replaying requires a response cache")
+        self.pool_size = pool_size
+        self.timeout = timeout
+        self.retries = retries
+        self.backoff_factor = backoff_factor
+        self.cache = cache
+        self.replay = replay
+        self.max_cached_body_size = max_cached_body_size
+        self.requests_count = 0
+        self.bytes_count = 0
+        self._sessions: Dict[str, requests.Session] = {}
+        self._lock = threading.Lock()
+
+    def get(self, url: str, **kwargs: Any) -> requests.Response:
+        kwargs.setdefault("timeout", self.timeout)
+        response = self._get_session(url).get(url, **kwargs)
+        self._count(len(response.content))
+        return response
+
+    def head(self, url: str, **kwargs: Any) -> requests.Response:
+        kwargs.setdefault("timeout", self.timeout)
+        kwargs.setdefault("allow_redirects", True)
+        response = self._get_session(url).head(url, **kwargs)
+        self._count(0)
+        return response
+
+    @contextlib.contextmanager
+    def stream(self, url: str, **kwargs: Any) -> Iterator[requests.Response]:
+        """Response with the body left unread, counted by the bytes received from the wire once it is closed."""
+        kwargs.setdefault("timeout", self.timeout)
+        with self._get_session(url).get(url, stream=True, **kwargs) as response:
+            try:
+                yield response
+            finally:
+                self._count(response.raw.tell())
+
+    def get_html(self, url: str, max_size: Optional[int] = None, **kwargs: Any) -> HtmlResponse:
+        """Reads headers first and downloads the body only for successful HTML responses, up to `max_size` bytes."""
+        kwargs.setdefault("timeout", self.timeout)
+        with self._get_session(url).get(url, stream=True, **kwargs) as response:
+            header_size = self._get_header_size(response)
+            validators = {
+                "etag": response.headers.get("etag"), "last_modified": response.headers.get("last-modified"),
+            }
+            if "html" not in response.headers.get("content-type", "html").lower():
+                self.logger.debug(f"Skipping body of non-HTML {url}")
+                self._count(0)
+                return HtmlResponse(status=response.status_code, is_html=False, url=response.url)
+            if response.status_code != 200:
+                self._count(0)
+                return HtmlResponse(status=response.status_code, size=header_size, url=response.url, **validators)
+            body, is_truncated = self._read_body(response, max_size)
+        self._count(len(body))
+        if is_truncated:
+            self.logger.warning(f"Body of {url} exceeds {max_size} bytes, truncated")
+        # without a declared length, the bytes read are the best known size, if only a lower bound for truncated bodies
+        size = header_size if header_size is not None else len(body)
+        content = body.decode(response.encoding or "utf-8", errors="replace")
+        return HtmlResponse(
+            status=response.status_code,
+            content=content,
+            size=size,
+            is_truncated=is_truncated,
+            url=response.url,
+            **validators,
+        )
+
+    def _read_body(self, response: requests.Response, max_size: Optional[int]) -> Tuple[bytes, bool]:
+        chunks: List[bytes] = []
+        read = 0
+        for chunk in response.iter_content(chunk_size=self.CHUNK_SIZE):
+            chunks.append(chunk)
+            read += len(chunk)
+            if max_size is not None and read > max_size:
+                return b"".join(chunks)[:max_size], True
+        return b"".join(chunks), False
+
+    @staticmethod
+    def _get_header_size(response: requests.Response) -> Optional[int]:
+        size = response.headers.get("content-length")
+        return int(size) if size and size.isdigit() else None
+
+    def close(self) -> None:
+        with self._lock:
+            for session in self._sessions.values():
+                session.close()
+            self._sessions.clear()
+
+    def __enter__(self) -> 'Fetcher':
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
+
+    def _get_session(self, url: str) -> requests.Session:
+        split_url = urllib.parse.urlsplit(url)
+        host_key = f"{split_url.scheme}://{split_url.netloc}"
+        with self._lock:
+            session = self._sessions.get(host_key)
+            if session is None:
+                self.logger.debug(f"Opening session for {host_key}")
+                session = self._create_session()
+                self._sessions[host_key] = session
+            return session
+
+    def _create_session(self) -> requests.Session:
+        retry = urllib3.util.retry.Retry(
+            total=self.retries,
+            backoff_factor=self.backoff_factor,
+            status_forcelist=self.RETRY_STATUSES,
+            allowed_methods=frozenset({"GET", "HEAD"}),
+            raise_on_status=False,
+        )
+        if self.cache is not None:
+            adapter = website_analyser.parsing.response_cache.CachingAdapter(
+                self.cache,
+                self.replay,
+                self.max_cached_body_size,
+                pool_connections=1,
+                pool_maxsize=self.pool_size,
+                max_retries=retry,
+            )
+        else:
+            adapter = requests.adapters.HTTPAdapter(pool_connections=1, pool_maxsize=self.pool_size, max_retries=retry)
+        session = requests.Session()
+        session.headers["User-Agent"] = USER_AGENT
+        # proxies, certificates and .netrc from the environment don't apply offline and are costly to look up
+        session.trust_env = not self.replay
+        session.mount("http://", adapter)
+        session.mount("https://", adapter)
+        return session
+
+    def _count(self, received_bytes: int) -> None:
+        with self._lock:
+            self.requests_count += 1
+            self.bytes_count += received_bytes
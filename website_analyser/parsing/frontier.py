@@ -0,0 +1,180 @@
+import collections
+import json
+import os
+import sqlite3
+from typing import Callable, Deque, Dict, Iterable, Iterator, List, Optional, Set, Tuple
+
+import website_analyser.parsing.seen
+import website_analyser.shared.url_utils
+import website_analyser.shared.webpage
+import website_analyser.shared.website
+from website_analyser.mixins.logger_mixin import LoggerMixin
+
+Webpage = website_analyser.shared.webpage.Webpage
+Website = website_analyser.shared.website.Website
+
+
+class CrawlCheckpoint(LoggerMixin):
+    """SQLite file with every webpage seen by a crawl.
+
+    Settled webpages are stored with their response and links. Webpages still waiting in the frontier (or being fetched)
+    are stored with their position in the queue, so they are fetched again, in the same order, after resuming.
+    """
+    SCHEMA = """
+        CREATE TABLE IF NOT EXISTS meta (key TEXT PRIMARY KEY, value TEXT NOT NULL);
+        CREATE TABLE IF NOT EXISTS webpages (url TEXT PRIMARY KEY, record TEXT NOT NULL, queue_position INTEGER);
+        CREATE INDEX IF NOT EXISTS webpages_queue ON webpages (queue_position) WHERE queue_position IS NOT NULL;
+    """
+
+    def __init__(self, file_path: str, starting_url: str, resume: bool = False) -> None:
+        self.file_path = file_path
+        self.starting_url = starting_url
+        if not resume and os.path.exists(file_path):
+            os.remove(file_path)
+        self._connection = sqlite3.connect(file_path)
+        self._connection.executescript(self.SCHEMA)
+        self._check_starting_url()
+
+    def _check_starting_url(self) -> None:
+        row = self._connection.execute("SELECT value FROM meta WHERE key = 'starting_url'").fetchone()
+        if row is None:
+            with self._connection:
+                self._connection.execute("INSERT INTO meta VALUES ('starting_url', ?)", (self.starting_url, ))
+        elif row[0] != self.starting_url:
+            raise ValueError(f"Checkpoint {self.file_path} was made for a crawl starting at {row[0]}")
+
+    def save(self, webpages: Iterable[Webpage], queue_positions: Dict[str, int]) -> None:
+        rows = [
+            (page.url.url, json.dumps(Website.webpage_to_dict(page)), queue_positions.get(page.url.url))
+            for page in webpages
+        ]
+        with self._connection:
+            self._connection.executemany("INSERT OR REPLACE INTO webpages VALUES (?, ?, ?)", rows)
+        self.logger.debug(f"Checkpointed {len(rows)} webpages to {self.file_path}")
+
+    def load(self, only_unsettled: bool = False) -> Tuple[Dict[str, Webpage], List[str]]:
+        """Returns seen (or only unsettled) webpages, linked with each other, and URLs of unsettled ones in order."""
+        query = "SELECT record FROM webpages" + (" WHERE queue_position IS NOT NULL" if only_unsettled else "")
+        records = (json.loads(record) for record, in self._connection.execute(query))
+        url_to_webpage = Website.from_records(records).url_to_webpage
+        queued = self._connection.execute(
+            "SELECT url FROM webpages WHERE queue_position IS NOT NULL ORDER BY queue_position"
+        )
+        return url_to_webpage, [url for url, in queued]
+
+    def iter_urls(self) -> Iterator[str]:
+        for url, in self._connection.execute("SELECT url FROM webpages"):
+            yield url
+
+    def close(self) -> None:
+        self._connection.close()
+
+
+class Frontier(LoggerMixin):
+    """FIFO queue of webpages to crawl and index of all URLs seen so far, checkpointed every few settled pages.
+
+    Unless `retain_webpages` is off, every discovered webpage is kept, so links always point at the same instance. With
+    it off only unsettled webpages are kept, settled ones are released (and their links dropped) once written to a sink
+    and a checkpoint, which bounds memory of crawls that stream their results.
+    """
+
+    def __init__(
+            self,
+            checkpoint: Optional[CrawlCheckpoint] = None,
+            checkpoint_interval: int = 1000,
+            seen: Optional[website_analyser.parsing.seen.SeenUrlsBase] = None,
+            retain_webpages: bool = True,
+    ) -> None:
+        self.checkpoint = checkpoint
+        self.checkpoint_interval = checkpoint_interval
+        self.seen = seen if seen is not None else website_analyser.parsing.seen.ExactSeenUrls()
+        self.retain_webpages = retain_webpages
+        self._queue: Deque[Webpage] = collections.deque()
+        self._webpages: Dict[str, Webpage] = {}
+        self._unsettled: Dict[str, int] = {}
+        self._changed: Dict[str, Webpage] = {}
+        self._next_position = 0
+        self._settled_since_checkpoint = 0
+
+    @property
+    def webpages(self) -> Set[Webpage]:
+        return set(self._webpages.values())
+
+    @property
+    def seen_count(self) -> int:
+        return len(self.seen)
+
+    def __len__(self) -> int:
+        return len(self._queue)
+
+    def __contains__(self, url: str) -> bool:
+        return url in self._webpages or url in self.seen
+
+    def discover(self, url: str, create_webpage: Callable[[str], Webpage]) -> Webpage:
+        """Queues webpage of a clean URL not seen before. The webpage is created only for URLs not seen before."""
+        known = self._webpages.get(url)
+        if known is not None:
+            return known
+        if not self.seen.add(url):
+            return self._link_target(url)
+        webpage = create_webpage(url)
+        self._webpages[url] = webpage
+        self._enqueue(webpage)
+        return webpage
+
+    def pop(self) -> Webpage:
+        return self._queue.popleft()
+
+    def settle(self, webpage: Webpage) -> None:
+        """Marks webpage as done, its response and links won't change anymore."""
+        self._unsettled.pop(webpage.url.url, None)
+        if self.checkpoint is not None:
+            self._changed[webpage.url.url] = webpage
+        if not self.retain_webpages:
+            self._webpages.pop(webpage.url.url, None)
+            if self.checkpoint is None:
+                self._release(webpage)
+        self._settled_since_checkpoint += 1
+        if self._settled_since_checkpoint >= self.checkpoint_interval:
+            self.save_checkpoint()
+
+    def save_checkpoint(self) -> None:
+        if self.checkpoint is not None and self._changed:
+            self.checkpoint.save(self._changed.values(), self._unsettled)
+        if not self.retain_webpages:
+            for url, webpage in self._changed.items():
+                if url not in self._unsettled:
+                    self._release(webpage)
+        self._changed.clear()
+        self._settled_since_checkpoint = 0
+
+    def restore(self) -> None:
+        if self.checkpoint is None:
+            return
+        self._webpages, queued = self.checkpoint.load(only_unsettled=not self.retain_webpages)
+        for url in self.checkpoint.iter_urls():
+            self.seen.add(url)
+        for url in queued:
+            self._enqueue(self._webpages[url])
+        if self.seen_count:
+            self.logger.info(f"Resumed crawl with {self.seen_count} seen and {len(self._queue)} queued webpages")
+
+    def close(self) -> None:
+        self.seen.close()
+
+    @staticmethod
+    def _link_target(url: str) -> Webpage:
+        """Stands for an already released webpage in links to it, which are written out by their URL only."""
+        return Webpage(website_analyser.shared.url_utils.Url(url), False, False, False, False)
+
+    @staticmethod
+    def _release(webpage: Webpage) -> None:
+        """Settled webpages are already written out, dropping their links lets them be freed right away."""
+        webpage.linked_webpages.clear()
+
+    def _enqueue(self, webpage: Webpage) -> None:
+        self._queue.append(webpage)
+        self._unsettled[webpage.url.url] = self._next_position
+        if self.checkpoint is not None:
+            self._changed[webpage.url.url] = webpage
+        self._next_position += 1
@@ -0,0 +1,133 @@
+import sqlite3
+import time
+import urllib.parse
+from typing import Dict, Iterable, Optional, Set
+
+import requests
+
+import website_analyser.parsing.concurrency
+import website_analyser.parsing.fetcher
+import website_analyser.shared.webpage
+from website_analyser.mixins.logger_mixin import LoggerMixin
+
+Webpage = website_analyser.shared.webpage.Webpage
+
+CONCURRENCY = 16
+PER_HOST_CONCURRENCY = 2
+TIMEOUT = 10.0
+TTL = 7 * 24 * 60 * 60.0
+FAILED_STATUS = 404  # same as the crawler records for pages it failed to fetch
+# answers that say little about the link, checked again next time, as are links that failed to be checked
+UNCACHED_STATUSES = (429, 500, 502, 503, 504)
+GONE_STATUSES = (404, 410)  # conclusive even for HEAD
+
+
+class LinkStatusCache(LoggerMixin):
+    """Statuses of checked links kept in SQLite for `ttl` seconds, so they are not checked again on every run."""
+
+    def __init__(self, file_path: str, ttl: float = TTL) -> None:
+        self.ttl = ttl
+        self._connection = sqlite3.connect(file_path)
+        self._connection.execute(
+            "CREATE TABLE IF NOT EXISTS link_status (url TEXT PRIMARY KEY, status INTEGER, checked_at REAL)"
+        )
+
+    def get(self, url: str) -> Optional[int]:
+        row = self._connection.execute(
+            "SELECT status FROM link_status WHERE url = ? AND checked_at > ?", (url, time.time() - self.ttl),
+        ).fetchone()
+        return row[0] if row is not None else None
+
+    def put(self, statuses: Dict[str, Optional[int]]) -> None:
+        checked_at = time.time()
+        with self._connection:
+            self._connection.executemany(
+                "INSERT OR REPLACE INTO link_status VALUES (?, ?, ?)",
+                (
+                    (url, status, checked_at)
+                    for url, status in statuses.items()
+                    if status is not None and status not in UNCACHED_STATUSES
+                ),
+            )
+
+    def close(self) -> None:
+        self._connection.close()
+
+
+class LinkChecker(LoggerMixin):
+    """Finds response statuses of links without crawling them: HEAD requests, GET (body unread) if HEAD is refused.
+
+    Every URL is checked once, a few hosts at a time and at most `per_host_concurrency` requests per host. Statuses
+    found in the cache are not checked again.
+    """
+
+    def __init__(
+            self,
+            fetcher: website_analyser.parsing.fetcher.Fetcher,
+            cache: Optional[LinkStatusCache] = None,
+            concurrency: int = CONCURRENCY,
+            per_host_concurrency: Optional[int] = None,
+            timeout: float = TIMEOUT,
+    ) -> None:
+        self.fetcher = fetcher
+        self.cache = cache
+        self.concurrency = concurrency
+        self.per_host_concurrency = per_host_concurrency or PER_HOST_CONCURRENCY
+        self.timeout = timeout
+        self.checked_count = 0
+        self.cached_count = 0
+
+    @staticmethod
+    def should_check(webpage: Webpage) -> bool:
+        """Not fetched pages, except those robots.txt disallows."""
+        return webpage.response_status_code is None and webpage.is_accepted_path
+
+    def check_webpages(self, webpages: Iterable[Webpage]) -> None:
+        webpages = [webpage for webpage in webpages if self.should_check(webpage)]
+        statuses = self.check({webpage.url.url for webpage in webpages})
+        for webpage in webpages:
+            webpage.set_response_status_code(statuses.get(webpage.url.url))
+
+    def check(self, urls: Iterable[str]) -> Dict[str, int]:
+        statuses: Dict[str, int] = {}
+        unchecked: Set[str] = set()
+        for url in set(urls):
+            status = self.cache.get(url) if self.cache is not None else None
+            if status is not None:
+                statuses[url] = status
+            else:
+                unchecked.add(url)
+        self.cached_count += len(statuses)
+        if self.fetcher.replay:
+            self.logger.debug(f"Replaying, {len(unchecked)} links not in cache are left unchecked")
+            return statuses
+        checked: Dict[str, Optional[int]] = {}
+        pool = website_analyser.parsing.concurrency.HostLimitedPool(
+            self.check_link, self.concurrency, self.per_host_concurrency,
+        )
+        with pool:
+            for url in unchecked:
+                pool.submit(urllib.parse.urlsplit(url).netloc, url)
+            for url, status in pool.completed():
+                checked[url] = status
+        self.checked_count += len(checked)
+        if self.cache is not None:
+            self.cache.put(checked)
+        self.logger.debug(f"Checked {len(checked)} links, {len(statuses)} found in cache")
+        statuses.update((url, FAILED_STATUS if status is None else status) for url, status in checked.items())
+        return statuses
+
+    def check_link(self, url: str) -> Optional[int]:
+        """Status of the link, None if it could not be checked."""
+        try:
+            status = self.fetcher.head(url, timeout=self.timeout).status_code
+            if status < 400 or status in GONE_STATUSES:
+                return status
+            # plenty of servers refuse or mishandle HEAD, only GET is conclusive
+            with self.fetcher.stream(url, timeout=self.timeout) as response:
+                return response.status_code
+        except requests.exceptions.RequestException as exc:
+            self.logger.debug(f"Failed to check {url}: {exc}")
+        except ValueError as exc:  # invalid URLs, e.g. with a bad port
+            self.logger.debug(f"Invalid link {url}: {exc}")
+        return None
@@ -0,0 +1,61 @@
+import html.parser
+from typing import Callable, Dict, List, Optional, Tuple
+
+import bs4
+
+# `<a href>` values, first `<base href>` and first `<link rel=canonical href>`
+RawLinks = Tuple[List[str], Optional[str], Optional[str]]
+
+
+class _LinkParser(html.parser.HTMLParser):
+
+    def __init__(self) -> None:
+        super().__init__(convert_charrefs=True)
+        self.links: List[str] = []
+        self.base_href: Optional[str] = None
+        self.canonical_href: Optional[str] = None
+
+    def handle_starttag(self, tag: str, attrs: List[Tuple[str, Optional[str]]]) -> None:
+        if tag == "a":
+            for name, value in attrs:
+                if name == "href":
+                    self.links.append(value or "")
+                    return
+        elif tag == "base" and self.base_href is None:
+            for name, value in attrs:
+                if name == "href" and value:
+                    self.base_href = value
+                    return
+        elif tag == "link" and self.canonical_href is None:
+            attributes = dict(attrs)
+            if _is_canonical(attributes.get("rel")) and attributes.get("href"):
+                self.canonical_href = attributes["href"]
+
+
+def extract_links(content: str) -> RawLinks:
+    """Streams over the markup without building a tree."""
+    parser = _LinkParser()
+    parser.feed(content)
+    parser.close()
+    return parser.links, parser.base_href, parser.canonical_href
+
+
+def extract_links_bs4(content: str) -> RawLinks:
+    soup = bs4.BeautifulSoup(content, features="html.parser")
+    base_tag = soup.find("base", href=True)
+    canonical_tag = soup.find("link", rel=_is_canonical, href=True)
+    return (
+        [link_tag["href"] for link_tag in soup.find_all("a", href=True)],
+        base_tag["href"] if base_tag else None,
+        canonical_tag["href"] if canonical_tag else None,
+    )
+
+
+def _is_canonical(rel: Optional[str]) -> bool:
+    return rel is not None and "canonical" in rel.lower().split()
+
+
+LINK_EXTRACTORS: Dict[str, Callable[[str], RawLinks]] = {
+    "fast": extract_links,
+    "bs4": extract_links_bs4,
+}
@@ -0,0 +1,216 @@
+import dataclasses
+import hashlib
+import io
+import json
+import sqlite3
+import threading
+import zlib
+from typing import Any, Dict, List, Optional
+
+import requests
+import requests.adapters
+import urllib3.response
+
+from website_analyser.mixins.logger_mixin import LoggerMixin
+
+# bodies of other responses are never read by the crawler, only their headers are kept
+CACHED_BODY_TYPES = ("text/", "html", "xml", "json", "gzip")
+# transient answers, and 304 which only makes sense for the request that asked for it
+UNCACHED_STATUSES = (304, 429, 500, 502, 503, 504)
+NOT_CACHED_STATUS = 504  # what HTTP caches answer to `only-if-cached` requests they can't satisfy
+EVICTION_BATCH = 256
+
+
+@dataclasses.dataclass
+class CachedResponse:
+    status: int
+    reason: Optional[str]
+    headers: Dict[str, str]
+    body: bytes
+
+
+class ResponseCache(LoggerMixin):
+    """Responses to GET requests stored in SQLite, bodies compressed and addressed by their SHA-256 digest.
+
+    Identical bodies served under many URLs are stored once. When compressed bodies exceed `max_size` bytes, least
+    recently used responses are evicted. Safe to share between threads.
+    """
+
+    def __init__(self, file_path: str, max_size: Optional[int] = None) -> None:
+        self.file_path = file_path
+        self.max_size = max_size
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+        self._connection = sqlite3.connect(file_path, check_same_thread=False)
+        self._connection.execute("PRAGMA journal_mode=WAL")
+        self._connection.execute("PRAGMA synchronous=NORMAL")
+        with self._connection:
+            self._connection.execute("CREATE TABLE IF NOT EXISTS bodies (digest TEXT PRIMARY KEY, body BLOB NOT NULL)")
+            self._connection.execute(
+                "CREATE TABLE IF NOT EXISTS responses ("
+                "url TEXT PRIMARY KEY, status INTEGER, reason TEXT, headers TEXT, digest TEXT, accessed INTEGER)"
+            )
+            self._connection.execute("CREATE INDEX IF NOT EXISTS responses_accessed ON responses (accessed)")
+            self._connection.execute("CREATE INDEX IF NOT EXISTS responses_digest ON responses (digest)")
+        self.size = self._connection.execute("SELECT COALESCE(SUM(LENGTH(body)), 0) FROM bodies").fetchone()[0]
+        self._clock = self._connection.execute("SELECT COALESCE(MAX(accessed), 0) FROM responses").fetchone()[0]
+
+    def __len__(self) -> int:
+        with self._lock:
+            return self._connection.execute("SELECT COUNT(*) FROM responses").fetchone()[0]
+
+    def get(self, url: str) -> Optional[CachedResponse]:
+        with self._lock:
+            row = self._connection.execute(
+                "SELECT status, reason, headers, body FROM responses LEFT JOIN bodies USING (digest) WHERE url = ?",
+                (url, ),
+            ).fetchone()
+            if row is None:
+                self.misses += 1
+                return None
+            self.hits += 1
+            self._connection.execute("UPDATE responses SET accessed = ? WHERE url = ?", (self._tick(), url))
+        status, reason, headers, body = row
+        return CachedResponse(status, reason, json.loads(headers), zlib.decompress(body) if body is not None else b"")
+
+    def put(self, url: str, response: CachedResponse, is_body_stored: bool = True) -> None:
+        digest = hashlib.sha256(response.body).hexdigest() if is_body_stored else None
+        with self._lock, self._connection:
+            if digest is not None:
+                body = zlib.compress(response.body)
+                cursor = self._connection.execute(
+                    "INSERT OR IGNORE INTO bodies VALUES (?, ?)", (digest, sqlite3.Binary(body)),
+                )
+                self.size += len(body) * cursor.rowcount
+            self._connection.execute(
+                "INSERT OR REPLACE INTO responses VALUES (?, ?, ?, ?, ?, ?)",
+                (url, response.status, response.reason, json.dumps(response.headers), digest, self._tick()),
+            )
+            if self.max_size is not None and self.size > self.max_size:
+                self._evict()
+
+    def close(self) -> None:
+        self.logger.debug(f"{self.hits} hits, {self.misses} misses, {self.size} bytes of bodies stored")
+        with self._lock:
+            self._connection.commit()
+            self._connection.close()
+
+    def _tick(self) -> int:
+        self._clock += 1
+        return self._clock
+
+    def _evict(self) -> None:
+        evicted = 0
+        while self.size > self.max_size:
+            rows = self._connection.execute(
+                "SELECT url, digest FROM responses ORDER BY accessed LIMIT ?", (EVICTION_BATCH, ),
+            ).fetchall()
+            if not rows:
+                break
+            for url, digest in rows:
+                if self.size <= self.max_size:
+                    break
+                self._connection.execute("DELETE FROM responses WHERE url = ?", (url, ))
+                evicted += 1
+                if digest is not None and not self._connection.execute(
+                        "SELECT 1 FROM responses WHERE digest = ?", (digest, ),
+                ).fetchone():
+                    self.size -= self._connection.execute(
+                        "SELECT LENGTH(body) FROM bodies WHERE digest = ?", (digest, ),
+                    ).fetchone()[0]
+                    self._connection.execute("DELETE FROM bodies WHERE digest = ?", (digest, ))
+        self.logger.debug(f"Evicted {evicted} responses, {self.size} bytes of bodies left")
+
+
+class _PeekedBody(io.RawIOBase):
+    """Raw body of a response whose first bytes were already read, followed by the rest of it from the wire."""
+
+    def __init__(self, head: bytes, response: requests.Response) -> None:
+        super().__init__()
+        self._head = io.BytesIO(head)
+        self._response = response
+
+    def readable(self) -> bool:
+        return True
+
+    def readinto(self, buffer: Any) -> int:
+        data = self._head.read(len(buffer)) or self._response.raw.read(len(buffer), decode_content=False)
+        buffer[:len(data)] = data
+        return len(data)
+
+    def close(self) -> None:
+        if not self.closed:
+            self._response.close()
+        super().close()
+
+
+class CachingAdapter(requests.adapters.HTTPAdapter):
+    """Serves GET requests from a ResponseCache, storing responses fetched on a miss.
+
+    Bodies longer than `max_body_size` bytes are not stored: at most that many bytes are read ahead and the response is
+    passed on streaming, so readers keep their own size limits. In replay mode nothing goes to the network and misses
+    are answered with 504 Gateway Timeout.
+    """
+
+    def __init__(
+            self, cache: ResponseCache, replay: bool = False, max_body_size: Optional[int] = None, **kwargs: Any,
+    ) -> None:
+        super().__init__(**kwargs)
+        self.cache = cache
+        self.replay = replay
+        self.max_body_size = max_body_size
+
+    def send(self, request: requests.PreparedRequest, stream: bool = False, **kwargs: Any) -> requests.Response:
+        if request.method != "GET":
+            if self.replay:
+                return self._build(request, CachedResponse(NOT_CACHED_STATUS, "Not Cached", {}, b""))
+            return super().send(request, stream=stream, **kwargs)
+        cached = self.cache.get(request.url)
+        if cached is not None:
+            return self._build(request, cached)
+        if self.replay:
+            return self._build(request, CachedResponse(NOT_CACHED_STATUS, "Not Cached", {}, b""))
+        response = super().send(request, stream=True, **kwargs)
+        if response.status_code in UNCACHED_STATUSES:
+            return response
+        headers = {key: value for key, value in response.headers.items() if key.lower() != "transfer-encoding"}
+        content_type = response.headers.get("content-type", "html").lower()
+        if not any(cached_type in content_type for cached_type in CACHED_BODY_TYPES):
+            self.cache.put(request.url, CachedResponse(response.status_code, response.reason, headers, b""), False)
+            return response
+        # the body is stored as received (possibly compressed) and decoded by the reader, as it would be when fetched
+        body = self._read_raw(response)
+        if self.max_body_size is not None and len(body) > self.max_body_size:
+            passed_on = CachedResponse(response.status_code, response.reason, headers, b"")
+            return self._build(request, passed_on, _PeekedBody(body, response))
+        cached = CachedResponse(response.status_code, response.reason, headers, body)
+        self.cache.put(request.url, cached)
+        return self._build(request, cached)
+
+    def _read_raw(self, response: requests.Response) -> bytes:
+        """Whole raw body, or its first `max_body_size` + 1 bytes if it is longer."""
+        if self.max_body_size is None:
+            return response.raw.read(decode_content=False)
+        chunks: List[bytes] = []
+        left = self.max_body_size + 1
+        while left > 0:
+            chunk = response.raw.read(left, decode_content=False)
+            if not chunk:
+                break
+            chunks.append(chunk)
+            left -= len(chunk)
+        return b"".join(chunks)
+
+    def _build(
+            self, request: requests.PreparedRequest, cached: CachedResponse, body: Optional[io.RawIOBase] = None,
+    ) -> requests.Response:
+        raw = urllib3.response.HTTPResponse(
+            body=body if body is not None else io.BytesIO(cached.body),
+            headers=cached.headers,
+            status=cached.status,
+            reason=cached.reason,
+            preload_content=False,
+            decode_content=False,
+        )
+        return self.build_response(request, raw)
@@ -0,0 +1,157 @@
+import re
+import urllib.parse
+from typing import Dict, List, Optional, Tuple
+
+import requests
+
+import website_analyser.parsing.fetcher
+from website_analyser.mixins.logger_mixin import LoggerMixin
+
+USER_AGENT = website_analyser.parsing.fetcher.USER_AGENT
+_END = None  # key of trie node holding whether the pattern ending there allows
+
+
+class RobotsRules(LoggerMixin):
+    """Allow/Disallow rules of one user-agent group. The longest matching pattern wins, Allow wins a tie.
+
+    Plain patterns are kept in a character trie, so matching them costs one walk over the path. Patterns with `*` or `$`
+    are compiled to regular expressions.
+    """
+
+    def __init__(self, crawl_delay: Optional[float] = None, sitemaps: Optional[List[str]] = None) -> None:
+        self.crawl_delay = crawl_delay
+        self.sitemaps = sitemaps or []
+        self._trie: Dict = {}
+        self._wildcards: List[Tuple[int, bool, re.Pattern]] = []
+        self._disallow_all = False
+
+    @staticmethod
+    def disallowing_all() -> 'RobotsRules':
+        rules = RobotsRules()
+        rules._disallow_all = True
+        return rules
+
+    def add(self, pattern: str, is_allowed: bool) -> None:
+        if not pattern:
+            return
+        if "*" in pattern or pattern.endswith("$"):
+            self._wildcards.append((len(pattern), is_allowed, _compile_wildcard(pattern)))
+            return
+        node = self._trie
+        for character in pattern:
+            node = node.setdefault(character, {})
+        node[_END] = node.get(_END, False) or is_allowed
+
+    def is_allowed(self, path: str) -> bool:
+        if self._disallow_all:
+            return False
+        matched_length, is_allowed = -1, True
+        node = self._trie
+        for depth, character in enumerate(path, 1):
+            node = node.get(character)
+            if node is None:
+                break
+            if _END in node:
+                matched_length, is_allowed = depth, node[_END]
+        for length, is_pattern_allowed, regex in self._wildcards:
+            if (length > matched_length or length == matched_length and is_pattern_allowed) and regex.match(path):
+                matched_length, is_allowed = length, is_pattern_allowed
+        return is_allowed
+
+    @staticmethod
+    def parse(content: str, user_agent: str = USER_AGENT) -> 'RobotsRules':
+        """Merges groups naming `user_agent` or, if there are none, groups of `*`. Sitemaps are collected from all."""
+        groups: List[Tuple[List[str], List[Tuple[str, str]]]] = []
+        sitemaps: List[str] = []
+        is_reading_agents = False
+        for line in content.splitlines():
+            key, _, value = line.split("#", 1)[0].partition(":")
+            key, value = key.strip().lower(), value.strip()
+            if key == "user-agent":
+                if not is_reading_agents:
+                    groups.append(([], []))
+                groups[-1][0].append(value.lower())
+                is_reading_agents = True
+            elif key == "sitemap":
+                sitemaps.append(value)
+            elif key in ("allow", "disallow", "crawl-delay") and groups:
+                groups[-1][1].append((key, value))
+                is_reading_agents = False
+
+        agent = user_agent.lower()
+        selected = [rules for agents, rules in groups if agent in agents]
+        if not selected:
+            selected = [rules for agents, rules in groups if "*" in agents]
+
+        robots_rules = RobotsRules(sitemaps=sitemaps)
+        for rules in selected:
+            for key, value in rules:
+                if key == "crawl-delay":
+                    try:
+                        robots_rules.crawl_delay = float(value)
+                    except ValueError:
+                        robots_rules.logger.debug(f"Invalid Crawl-delay {value}")
+                else:
+                    robots_rules.add(value, key == "allow")
+        return robots_rules
+
+
+class RobotsCache(LoggerMixin):
+    """Fetches and parses robots.txt of every origin once, when a URL of it is first checked."""
+
+    def __init__(
+            self,
+            fetcher: website_analyser.parsing.fetcher.Fetcher,
+            user_agent: str = USER_AGENT,
+            max_crawl_delay: float = 30.0,
+    ) -> None:
+        self.fetcher = fetcher
+        self.user_agent = user_agent
+        self.max_crawl_delay = max_crawl_delay
+        self._rules: Dict[str, RobotsRules] = {}
+
+    def rules_for(self, url: str) -> RobotsRules:
+        origin = get_origin(url)
+        rules = self._rules.get(origin)
+        if rules is None:
+            rules = self._rules[origin] = self._fetch(origin)
+        return rules
+
+    def is_allowed(self, url: str) -> bool:
+        parts = urllib.parse.urlsplit(url)
+        path = (parts.path or "/") + (f"?{parts.query}" if parts.query else "")
+        return self.rules_for(url).is_allowed(path)
+
+    def crawl_delay(self, origin: str) -> float:
+        """Seconds between requests to the origin, 0 if its robots.txt was not fetched yet or sets no delay."""
+        rules = self._rules.get(origin)
+        if rules is None or rules.crawl_delay is None:
+            return 0.0
+        return min(rules.crawl_delay, self.max_crawl_delay)
+
+    def _fetch(self, origin: str) -> RobotsRules:
+        """Missing robots.txt allows everything, unreachable one (server error) disallows everything."""
+        try:
+            response = self.fetcher.get(f"{origin}/robots.txt")
+        except requests.exceptions.RequestException as exc:
+            self.logger.warning(f"Failed to fetch robots.txt of {origin}: {exc}")
+            return RobotsRules.disallowing_all()
+        if response.status_code == 200:
+            self.logger.debug(f"Received robots.txt of {origin}")
+            return RobotsRules.parse(response.text, self.user_agent)
+        if response.status_code >= 500:
+            self.logger.warning(f"robots.txt of {origin} unavailable ({response.status_code}), not crawling it")
+            return RobotsRules.disallowing_all()
+        self.logger.debug(f"No robots.txt for {origin}")
+        return RobotsRules()
+
+
+def get_origin(url: str) -> str:
+    parts = urllib.parse.urlsplit(url)
+    return f"{parts.scheme}://{parts.netloc}"
+
+
+def _compile_wildcard(pattern: str) -> re.Pattern:
+    is_anchored = pattern.endswith("$")
+    body = pattern[:-1] if is_anchored else pattern
+    return re.compile(".*".join(re.escape(part) for part in body.split("*")) + ("$" if is_anchored else ""))
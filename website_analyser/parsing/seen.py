@@ -0,0 +1,131 @@
+import abc
+import hashlib
+import math
+import os
+import sqlite3
+import tempfile
+from typing import Iterator, Optional, Set
+
+from website_analyser.mixins.logger_mixin import LoggerMixin
+
+
+class SeenUrlsBase:
+    """Index of clean URL strings already discovered by a crawl."""
+
+    @abc.abstractmethod
+    def add(self, url: str) -> bool:
+        """Returns True if `url` was not seen before."""
+
+    @abc.abstractmethod
+    def __contains__(self, url: str) -> bool: ...
+
+    @abc.abstractmethod
+    def __len__(self) -> int: ...
+
+    def close(self) -> None:
+        pass
+
+
+class ExactSeenUrls(SeenUrlsBase):
+
+    def __init__(self) -> None:
+        self._urls: Set[str] = set()
+
+    def add(self, url: str) -> bool:
+        if url in self._urls:
+            return False
+        self._urls.add(url)
+        return True
+
+    def __contains__(self, url: str) -> bool:
+        return url in self._urls
+
+    def __len__(self) -> int:
+        return len(self._urls)
+
+
+class BloomFilter:
+    """Bit array with `hashes` positions per item, derived from a single blake2b digest by double hashing."""
+
+    def __init__(self, capacity: int, error_rate: float) -> None:
+        self.size = max(8, math.ceil(-capacity * math.log(error_rate) / math.log(2) ** 2))
+        self.hashes = max(1, round(self.size / capacity * math.log(2)))
+        self.bits = bytearray((self.size + 7) // 8)
+
+    def add(self, item: str) -> None:
+        for position in self._positions(item):
+            self.bits[position >> 3] |= 1 << (position & 7)
+
+    def __contains__(self, item: str) -> bool:
+        return all(self.bits[position >> 3] & (1 << (position & 7)) for position in self._positions(item))
+
+    def _positions(self, item: str) -> Iterator[int]:
+        digest = hashlib.blake2b(item.encode("utf-8"), digest_size=16).digest()
+        first, second = int.from_bytes(digest[:8], "little"), int.from_bytes(digest[8:], "little") | 1
+        for index in range(self.hashes):
+            yield (first + index * second) % self.size
+
+
+class BloomSeenUrls(SeenUrlsBase, LoggerMixin):
+    """Bloom filter in memory, exact URLs in SQLite on disk.
+
+    URLs missed by the filter are new and never touch the disk on lookup. Only URLs the filter reports as possibly seen
+    are confirmed with an indexed query, so false positives don't lose pages. New URLs are written in batches.
+    """
+
+    def __init__(
+            self,
+            file_path: Optional[str] = None,
+            capacity: int = 10 ** 6,
+            error_rate: float = 0.01,
+            batch_size: int = 10 ** 4,
+    ) -> None:
+        self.is_temporary = file_path is None
+        if file_path is None:
+            handle, file_path = tempfile.mkstemp(prefix="seen_urls_", suffix=".sqlite")
+            os.close(handle)
+        self.file_path = file_path
+        self.filter = BloomFilter(capacity, error_rate)
+        self.batch_size = batch_size
+        self.disk_lookups = 0
+        self.false_positives = 0
+        self._count = 0
+        self._pending: Set[str] = set()
+        self._connection = sqlite3.connect(file_path)
+        self._connection.execute("CREATE TABLE IF NOT EXISTS seen (url TEXT PRIMARY KEY) WITHOUT ROWID")
+
+    def add(self, url: str) -> bool:
+        if url in self:
+            return False
+        self.filter.add(url)
+        self._pending.add(url)
+        self._count += 1
+        if len(self._pending) >= self.batch_size:
+            self.flush()
+        return True
+
+    def __contains__(self, url: str) -> bool:
+        if url not in self.filter:
+            return False
+        if url in self._pending:
+            return True
+        self.disk_lookups += 1
+        is_seen = self._connection.execute("SELECT 1 FROM seen WHERE url = ?", (url, )).fetchone() is not None
+        self.false_positives += not is_seen
+        return is_seen
+
+    def __len__(self) -> int:
+        return self._count
+
+    def flush(self) -> None:
+        with self._connection:
+            self._connection.executemany("INSERT OR IGNORE INTO seen VALUES (?)", ((url, ) for url in self._pending))
+        self._pending.clear()
+
+    def close(self) -> None:
+        self.logger.debug(
+            f"Seen {self._count} urls, {self.disk_lookups} disk lookups, {self.false_positives} false positives"
+        )
+        self._connection.close()
+        if self.is_temporary:
+            os.remove(self.file_path)
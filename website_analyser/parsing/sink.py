@@ -0,0 +1,42 @@
+import json
+from typing import IO, Optional
+
+import website_analyser.shared.webpage
+import website_analyser.shared.website
+from website_analyser.mixins.logger_mixin import LoggerMixin
+
+Webpage = website_analyser.shared.webpage.Webpage
+Website = website_analyser.shared.website.Website
+
+EXTENSION = ".jsonl"
+
+
+class JsonLinesSink(LoggerMixin):
+    """Appends one JSON record per settled webpage, flushing after every line so the file can be tailed."""
+
+    def __init__(self, file_path: str, mode: str = "w") -> None:
+        self.file_path = file_path
+        self.mode = mode
+        self.written = 0
+        self._f_h: Optional[IO[str]] = None
+
+    def __enter__(self) -> 'JsonLinesSink':
+        self._f_h = open(self.file_path, self.mode)
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        if self._f_h is not None:
+            self._f_h.close()
+            self._f_h = None
+        self.logger.info(f"Written {self.written} webpages to {self.file_path}")
+
+    def write(self, webpage: Webpage) -> None:
+        if self._f_h is None:
+            raise RuntimeError("JsonLinesSink has to be used as a context manager")
+        self._f_h.write(json.dumps(Website.webpage_to_dict(webpage)) + "\n")
+        self._f_h.flush()
+        self.written += 1
+
+
+def is_json_lines_path(file_path: str) -> bool:
+    return file_path.endswith(EXTENSION)
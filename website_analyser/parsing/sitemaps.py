@@ -0,0 +1,123 @@
+import gzip
+import io
+import urllib.parse
+import xml.etree.ElementTree
+import zlib
+from typing import IO, Iterable, List, Optional, Set, Tuple
+
+import requests
+
+import website_analyser.parsing.concurrency
+import website_analyser.parsing.fetcher
+import website_analyser.shared.canonical
+from website_analyser.mixins.logger_mixin import LoggerMixin
+
+GZIP_MAGIC = b"\x1f\x8b"
+SITEMAP_NAMESPACE = "http://www.sitemaps.org/schemas/sitemap/0.9"
+ENTRY_NAMES = ("url", "sitemap")
+CONCURRENCY = 4
+
+SitemapContent = Tuple[List[str], List[str]]  # page urls, nested sitemap urls
+
+
+class SitemapReader(LoggerMixin):
+    """Collects page URLs of sitemaps, following `<sitemapindex>` entries.
+
+    Every sitemap is downloaded once, several at a time, and parsed incrementally from the response stream, plain or
+    gzipped, so parsing memory doesn't grow with the size of a sitemap file.
+    """
+
+    def __init__(
+            self,
+            fetcher: website_analyser.parsing.fetcher.Fetcher,
+            canonicalizer: Optional[website_analyser.shared.canonical.Canonicalizer] = None,
+            concurrency: int = CONCURRENCY,
+            per_host_concurrency: Optional[int] = None,
+    ) -> None:
+        self.fetcher = fetcher
+        self.canonicalizer = canonicalizer or website_analyser.shared.canonical.Canonicalizer()
+        self.concurrency = concurrency
+        self.per_host_concurrency = per_host_concurrency
+
+    def read(self, sitemap_urls: Iterable[str]) -> Set[str]:
+        pages: Set[str] = set()
+        visited: Set[str] = set()
+        pool = website_analyser.parsing.concurrency.HostLimitedPool(
+            self.read_sitemap, self.concurrency, self.per_host_concurrency,
+        )
+        with pool:
+            self._submit(pool, sitemap_urls, visited)
+            for sitemap_url, (page_urls, nested_sitemap_urls) in pool.completed():
+                self.logger.debug(
+                    f"Found {len(page_urls)} pages and {len(nested_sitemap_urls)} sitemaps in {sitemap_url}"
+                )
+                pages.update(filter(None, map(self.canonicalizer.canonicalize, page_urls)))
+                self._submit(pool, nested_sitemap_urls, visited)
+        self.logger.debug(f"Read {len(visited)} sitemaps with {len(pages)} pages")
+        return pages
+
+    @staticmethod
+    def _submit(
+            pool: website_analyser.parsing.concurrency.HostLimitedPool[str, SitemapContent],
+            sitemap_urls: Iterable[str],
+            visited: Set[str],
+    ) -> None:
+        for sitemap_url in sitemap_urls:
+            if sitemap_url not in visited:
+                visited.add(sitemap_url)
+                pool.submit(urllib.parse.urlsplit(sitemap_url).netloc, sitemap_url)
+
+    def read_sitemap(self, sitemap_url: str) -> SitemapContent:
+        """Page and nested sitemap URLs listed in a single sitemap. Failures are logged and yield what was parsed."""
+        page_urls: List[str] = []
+        nested_sitemap_urls: List[str] = []
+        try:
+            with self.fetcher.stream(sitemap_url) as response:
+                if response.status_code != 200:
+                    self.logger.warning(f"Failed to fetch sitemap {sitemap_url} ({response.status_code})")
+                    return page_urls, nested_sitemap_urls
+                response.raw.decode_content = True
+                # the body is read through a buffer, which must not see the stream closed by the last read
+                response.raw.auto_close = False
+                parse_locs(_open_body(response.raw), page_urls, nested_sitemap_urls)
+        except requests.exceptions.RequestException as exc:
+            self.logger.warning(f"Failed to fetch sitemap {sitemap_url}: {exc}")
+        except (xml.etree.ElementTree.ParseError, OSError, EOFError, zlib.error) as exc:
+            self.logger.warning(f"Failed to parse sitemap {sitemap_url}: {exc}")
+        return page_urls, nested_sitemap_urls
+
+
+def parse_locs(stream: IO[bytes], page_urls: List[str], nested_sitemap_urls: List[str]) -> None:
+    """Appends `<loc>` values of `<url>` entries to `page_urls` and of `<sitemap>` entries to `nested_sitemap_urls`.
+
+    Only `<loc>` children of the entries themselves are read, locations of extensions (`<image:loc>`, `<video:loc>`)
+    are not pages. Parsed entries are cleared from the tree as soon as they end, so only one entry is held at a time.
+    """
+    root = None
+    locs = page_urls
+    names: List[Optional[str]] = []  # sitemap protocol names of the open elements, None for other namespaces
+    for event, element in xml.etree.ElementTree.iterparse(stream, events=("start", "end")):
+        if event == "start":
+            names.append(_sitemap_name(element.tag))
+            if root is None:
+                root = element
+                locs = nested_sitemap_urls if names[0] == "sitemapindex" else page_urls
+            continue
+        name = names.pop()
+        if name == "loc" and names and names[-1] in ENTRY_NAMES:
+            if element.text:
+                locs.append(element.text.strip())
+        elif name in ENTRY_NAMES:
+            root.clear()
+
+
+def _open_body(raw: IO[bytes]) -> IO[bytes]:
+    """Gzipped sitemaps (`.xml.gz`) are usually served as files, not with `Content-Encoding`, so check the content."""
+    body = io.BufferedReader(raw)
+    return gzip.GzipFile(fileobj=body) if body.peek(len(GZIP_MAGIC)).startswith(GZIP_MAGIC) else body
+
+
+def _sitemap_name(tag: str) -> Optional[str]:
+    """Name of an element of the sitemap protocol, written with its namespace or without any."""
+    namespace, _, name = tag.rpartition("}")
+    return name if namespace in ("", "{" + SITEMAP_NAMESPACE) else None
@@ -0,0 +1,114 @@
+import array
+import collections.abc
+import mmap
+import struct
+import sys
+from typing import BinaryIO, Iterator, List, Sequence, Tuple, Union, overload
+
+import website_analyser.shared.compact_website
+
+CompactWebsite = website_analyser.shared.compact_website.CompactWebsite
+
+EXTENSION = ".gats"
+MAGIC = b"GATSNAP\x00"
+VERSION = 1
+# magic, version, pages count, links count, url table size in bytes
+HEADER = struct.Struct("<8sIxxxxQQQ")
+ALIGNMENT = 8
+
+
+class StringTable(collections.abc.Sequence):
+    """Read only sequence of strings decoded lazily from a UTF-8 blob and an array of offsets into it."""
+
+    def __init__(self, offsets: Sequence[int], blob: Union[bytes, memoryview]) -> None:
+        self.offsets = offsets
+        self.blob = blob
+
+    def __len__(self) -> int:
+        return len(self.offsets) - 1
+
+    @overload
+    def __getitem__(self, index: int) -> str: ...
+
+    @overload
+    def __getitem__(self, index: slice) -> List[str]: ...
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return [self[position] for position in range(*index.indices(len(self)))]
+        if index < 0:
+            index += len(self)
+        if not 0 <= index < len(self):
+            raise IndexError(index)
+        return bytes(self.blob[self.offsets[index]:self.offsets[index + 1]]).decode("utf-8")
+
+    def __iter__(self) -> Iterator[str]:
+        for index in range(len(self)):
+            yield self[index]
+
+
+def save(graph: CompactWebsite, file_path: str) -> None:
+    """Writes header, url table (offsets and blob), flags, status codes, content lengths, CSR offsets and targets."""
+    encoded_urls = [url.encode("utf-8") for url in graph.urls]
+    url_offsets = array.array("q", [0])
+    for encoded_url in encoded_urls:
+        url_offsets.append(url_offsets[-1] + len(encoded_url))
+    with open(file_path, "wb") as f_h:
+        f_h.write(HEADER.pack(MAGIC, VERSION, graph.size, graph.edges_count, url_offsets[-1]))
+        _write_array(f_h, url_offsets)
+        _write_aligned(f_h, b"".join(encoded_urls))
+        _write_array(f_h, array.array("B", graph.flags))
+        _write_array(f_h, array.array("i", graph.status_codes))
+        _write_array(f_h, array.array("q", graph.content_lengths))
+        _write_array(f_h, array.array("q", graph.offsets))
+        _write_array(f_h, array.array("I", graph.targets))
+
+
+def load(file_path: str) -> CompactWebsite:
+    """Maps the snapshot into memory. Arrays of the returned website are views of the mapping, nothing is copied."""
+    with open(file_path, "rb") as f_h:
+        mapping = mmap.mmap(f_h.fileno(), 0, access=mmap.ACCESS_READ)
+    view = memoryview(mapping)
+    magic, version, pages_count, links_count, urls_size = HEADER.unpack_from(view)
+    if magic != MAGIC:
+        raise ValueError(f"{file_path} is not a website snapshot")
+    if version != VERSION:
+        raise ValueError(f"Unsupported snapshot version {version}")
+    position = HEADER.size
+    url_offsets, position = _read_array(view, position, "q", pages_count + 1)
+    urls_blob, position = view[position:position + urls_size], _aligned(position + urls_size)
+    flags, position = _read_array(view, position, "B", pages_count)
+    status_codes, position = _read_array(view, position, "i", pages_count)
+    content_lengths, position = _read_array(view, position, "q", pages_count)
+    offsets, position = _read_array(view, position, "q", pages_count + 1)
+    targets, position = _read_array(view, position, "I", links_count)
+    return CompactWebsite(StringTable(url_offsets, urls_blob), flags, status_codes, content_lengths, offsets, targets)
+
+
+def is_snapshot_path(file_path: str) -> bool:
+    return file_path.endswith(EXTENSION)
+
+
+def _write_array(f_h: BinaryIO, values: array.array) -> None:
+    if sys.byteorder != "little":
+        values.byteswap()
+    _write_aligned(f_h, values.tobytes())
+
+
+def _write_aligned(f_h: BinaryIO, raw: bytes) -> None:
+    f_h.write(raw)
+    f_h.write(b"\x00" * (_aligned(len(raw)) - len(raw)))
+
+
+def _read_array(view: memoryview, position: int, typecode: str, length: int) -> Tuple[Sequence[int], int]:
+    end = position + length * struct.calcsize(typecode)
+    if sys.byteorder == "little":
+        values: Sequence[int] = view[position:end].cast(typecode)
+    else:
+        values = array.array(typecode, view[position:end])
+        values.byteswap()
+    return values, _aligned(end)
+
+
+def _aligned(position: int) -> int:
+    return (position + ALIGNMENT - 1) // ALIGNMENT * ALIGNMENT
@@ -0,0 +1,127 @@
+import dataclasses
+import fnmatch
+import re
+import urllib.parse
+from typing import Dict, Optional, Tuple
+
+from website_analyser.mixins.logger_mixin import LoggerMixin
+
+DEFAULT_PORTS = {"http": 80, "https": 443}
+TRACKING_PARAMETERS = ("utm_*", "gclid", "dclid", "fbclid", "msclkid", "yclid", "mc_cid", "mc_eid", "_ga", "_hsenc")
+INDEX_PAGES = ("index.html", "index.htm", "index.php", "default.htm", "default.html", "default.aspx")
+UNRESERVED = re.compile(r"[A-Za-z0-9\-._~]")
+PERCENT_ENCODED = re.compile(r"%[0-9A-Fa-f]{2}")
+
+
+@dataclasses.dataclass
+class CanonicalizationRules:
+    remove_fragment: bool = True
+    remove_default_port: bool = True
+    remove_index_page: bool = True
+    sort_query: bool = True
+    strip_tracking_parameters: bool = False
+    tracking_parameters: Tuple[str, ...] = TRACKING_PARAMETERS
+    index_pages: Tuple[str, ...] = INDEX_PAGES
+    # URLs used to be stored without trailing slash, which is kept for snapshots to stay comparable
+    strip_trailing_slash: bool = True
+    follow_rel_canonical: bool = True
+
+
+class Canonicalizer(LoggerMixin):
+    """Maps every spelling of a URL to a single canonical one.
+
+    Links are resolved against their base with RFC 3986 semantics (`urljoin`), then the scheme and host are lowercased,
+    dot segments, default port, fragment and index page are removed, percent-encoding is normalized and query parameters
+    are sorted (optionally without tracking ones). Pages declaring `<link rel=canonical>` on the same host become its
+    aliases. Non-HTTP(S) links are rejected.
+    """
+
+    def __init__(self, rules: Optional[CanonicalizationRules] = None) -> None:
+        self.rules = rules or CanonicalizationRules()
+        self.aliases: Dict[str, str] = {}
+        # URLs whose canonical spelling differs, e.g. only by a trailing slash, every occurrence counted
+        self.rewrites_count = 0
+
+    def canonicalize(self, url: str, base: Optional[str] = None) -> Optional[str]:
+        url = url.strip()
+        try:
+            resolved = urllib.parse.urljoin(base, url) if base else url
+            parts = urllib.parse.urlsplit(resolved)
+            port = parts.port
+        except ValueError:
+            return None
+        scheme = parts.scheme.lower()
+        if scheme not in DEFAULT_PORTS or not parts.hostname:
+            return None
+        canonical = urllib.parse.urlunsplit((
+            scheme,
+            self._canonical_netloc(parts, scheme, port),
+            self._canonical_path(parts.path),
+            self._canonical_query(parts.query),
+            "" if self.rules.remove_fragment else parts.fragment,
+        ))
+        canonical = self.aliases.get(canonical, canonical)
+        if canonical != resolved:
+            self.rewrites_count += 1
+        return canonical
+
+    def add_alias(self, url: str, canonical_url: str) -> bool:
+        """Makes `url` canonicalize to `canonical_url`, if it is on the same host. Returns if the alias was added."""
+        if (
+                not self.rules.follow_rel_canonical
+                or url == canonical_url
+                or urllib.parse.urlsplit(url).netloc != urllib.parse.urlsplit(canonical_url).netloc
+        ):
+            return False
+        self.aliases[url] = self.aliases.get(canonical_url, canonical_url)
+        self.logger.debug(f"{url} is an alias of {canonical_url}")
+        return True
+
+    def _canonical_netloc(self, parts: urllib.parse.SplitResult, scheme: str, port: Optional[int]) -> str:
+        userinfo = parts.netloc.rpartition("@")[0]
+        host = f"[{parts.hostname}]" if ":" in parts.hostname else parts.hostname
+        if port is not None and not (self.rules.remove_default_port and port == DEFAULT_PORTS[scheme]):
+            host = f"{host}:{port}"
+        return f"{userinfo}@{host}" if userinfo else host
+
+    def _canonical_path(self, path: str) -> str:
+        path = PERCENT_ENCODED.sub(_normalize_escape, path) or "/"
+        if "." in path:
+            path = _remove_dot_segments(path)
+        if self.rules.remove_index_page:
+            directory, _, last_segment = path.rpartition("/")
+            if last_segment.lower() in self.rules.index_pages:
+                path = directory + "/"
+        if self.rules.strip_trailing_slash:
+            path = path.rstrip("/")
+        return path
+
+    def _canonical_query(self, query: str) -> str:
+        parameters = [parameter for parameter in query.split("&") if parameter]
+        if self.rules.strip_tracking_parameters:
+            parameters = [parameter for parameter in parameters if not self._is_tracking(parameter.split("=", 1)[0])]
+        if self.rules.sort_query:
+            parameters.sort(key=lambda parameter: parameter.split("=", 1)[0])
+        return "&".join(PERCENT_ENCODED.sub(_normalize_escape, parameter) for parameter in parameters)
+
+    def _is_tracking(self, name: str) -> bool:
+        return any(fnmatch.fnmatchcase(name, pattern) for pattern in self.rules.tracking_parameters)
+
+
+def _remove_dot_segments(path: str) -> str:
+    segments = path.split("/")
+    resolved = []
+    for segment in segments[1:]:
+        if segment == "..":
+            if resolved:
+                resolved.pop()
+        elif segment != ".":
+            resolved.append(segment)
+    if segments[-1] in (".", ".."):
+        resolved.append("")
+    return "/" + "/".join(resolved)
+
+
+def _normalize_escape(match: re.Match) -> str:
+    character = chr(int(match.group()[1:], 16))
+    return character if UNRESERVED.fullmatch(character) else match.group().upper()
@@ -0,0 +1,200 @@
+import array
+import bisect
+import dataclasses
+import functools
+from typing import Dict, List, Optional, Sequence, Tuple, Union
+
+import website_analyser.shared.url_utils
+import website_analyser.shared.webpage
+import website_analyser.shared.website
+
+Webpage = website_analyser.shared.webpage.Webpage
+Website = website_analyser.shared.website.Website
+
+IN_WEBSITE_SPACE = 1
+ACCEPTED_PATH = 2
+FROM_DOMAIN = 4
+FROM_DOMAIN_SPACE = 8
+
+NO_VALUE = -1
+
+# categories of pages on the other end of links counted by LinkIndex, domain pages are in the domain space as well
+DOMAIN = "domain"
+DOMAIN_SPACE = "domain_space"
+EXTERNAL = "external"
+
+
+@dataclasses.dataclass
+class CompactWebsite:
+    """Website graph with pages numbered 0..N-1 in URL order, typed per-page arrays and CSR adjacency.
+
+    Successors of page `i` are `targets[offsets[i]:offsets[i + 1]]`. Missing status codes and content lengths are
+    stored as `NO_VALUE`.
+    """
+    urls: Sequence[str]
+    flags: Sequence[int]
+    status_codes: Sequence[int]
+    content_lengths: Sequence[int]
+    offsets: Sequence[int]
+    targets: Sequence[int]
+
+    @property
+    def size(self) -> int:
+        return len(self.urls)
+
+    @property
+    def edges_count(self) -> int:
+        return len(self.targets)
+
+    def __len__(self) -> int:
+        return self.size
+
+    def __contains__(self, url: str) -> bool:
+        index = bisect.bisect_left(self.urls, url)
+        return index < self.size and self.urls[index] == url
+
+    def index_of(self, url: str) -> int:
+        index = bisect.bisect_left(self.urls, url)
+        if index < self.size and self.urls[index] == url:
+            return index
+        raise KeyError(url)
+
+    def successors(self, index: int) -> Sequence[int]:
+        return self.targets[self.offsets[index]:self.offsets[index + 1]]
+
+    @functools.cached_property
+    def reverse_adjacency(self) -> Tuple[Sequence[int], Sequence[int]]:
+        """CSR offsets and sources of links coming into every page."""
+        offsets = array.array("q", [0]) * (self.size + 1)
+        for target in self.targets:
+            offsets[target + 1] += 1
+        for index in range(self.size):
+            offsets[index + 1] += offsets[index]
+        sources = array.array("I", [0]) * self.edges_count
+        position = array.array("q", offsets)
+        for source in range(self.size):
+            for target in self.successors(source):
+                sources[position[target]] = source
+                position[target] += 1
+        return offsets, sources
+
+    @functools.cached_property
+    def link_index(self) -> 'LinkIndex':
+        return LinkIndex.build(self)
+
+    def predecessors(self, index: int) -> Sequence[int]:
+        offsets, sources = self.reverse_adjacency
+        return sources[offsets[index]:offsets[index + 1]]
+
+    def has_flag(self, index: int, flag: int) -> bool:
+        return bool(self.flags[index] & flag)
+
+    def flag_mask(self, flag: int) -> List[bool]:
+        return [bool(page_flags & flag) for page_flags in self.flags]
+
+    def status_code(self, index: int) -> Optional[int]:
+        return _from_stored(self.status_codes[index])
+
+    def content_length(self, index: int) -> Optional[int]:
+        return _from_stored(self.content_lengths[index])
+
+    @staticmethod
+    def of(website: Union[Website, 'CompactWebsite']) -> 'CompactWebsite':
+        if isinstance(website, CompactWebsite):
+            return website
+        return CompactWebsite.from_website(website)
+
+    @staticmethod
+    def from_website(website: Website) -> 'CompactWebsite':
+        urls = sorted(website.urls)
+        url_to_index: Dict[str, int] = {url: index for index, url in enumerate(urls)}
+        flags = array.array("B")
+        status_codes = array.array("i")
+        content_lengths = array.array("q")
+        offsets = array.array("q", [0])
+        targets = array.array("I")
+        for url in urls:
+            page = website[url]
+            flags.append(
+                IN_WEBSITE_SPACE * page.is_in_website_space
+                | ACCEPTED_PATH * page.is_accepted_path
+                | FROM_DOMAIN * page.is_from_domain
+                | FROM_DOMAIN_SPACE * page.is_from_domain_space
+            )
+            status_codes.append(_to_stored(page.response_status_code))
+            content_lengths.append(_to_stored(page.response_content_length))
+            targets.extend(sorted(
+                url_to_index[linked.url.url] for linked in page.linked_webpages if linked.url.url in url_to_index
+            ))
+            offsets.append(len(targets))
+        return CompactWebsite(urls, flags, status_codes, content_lengths, offsets, targets)
+
+    def to_website(self) -> Website:
+        webpages: List[Webpage] = []
+        for index, url in enumerate(self.urls):
+            page = Webpage(
+                url=website_analyser.shared.url_utils.Url(url),
+                is_in_website_space=self.has_flag(index, IN_WEBSITE_SPACE),
+                is_accepted_path=self.has_flag(index, ACCEPTED_PATH),
+                is_from_domain=self.has_flag(index, FROM_DOMAIN),
+                is_from_domain_space=self.has_flag(index, FROM_DOMAIN_SPACE),
+            )
+            page.set_response_status_code(self.status_code(index))
+            page.set_response_content_length(self.content_length(index))
+            webpages.append(page)
+        for index, page in enumerate(webpages):
+            page.linked_webpages.update(webpages[linked] for linked in self.successors(index))
+        return Website(set(webpages))
+
+
+@dataclasses.dataclass
+class LinkIndex:
+    """Numbers of links going out of and coming into every page, by category of the page on the other end, and pages
+    grouped by status code (`None` when not known).
+    """
+    out_degrees: Dict[str, Sequence[int]]
+    in_degrees: Dict[str, Sequence[int]]
+    status_buckets: Dict[Optional[int], Sequence[int]]
+
+    def pages_with_status(self, status_code: Optional[int]) -> Sequence[int]:
+        return self.status_buckets.get(status_code, ())
+
+    @property
+    def dead_pages(self) -> List[int]:
+        """Pages which responded with other status than 200, in index order."""
+        return sorted(
+            page
+            for status_code, pages in self.status_buckets.items() if status_code not in (None, 200)
+            for page in pages
+        )
+
+    @staticmethod
+    def build(graph: CompactWebsite) -> 'LinkIndex':
+        # every page coded by a byte, so links of a page to every category are counted by `bytes.count` on a slice
+        page_codes = bytes(page_flags & (FROM_DOMAIN | FROM_DOMAIN_SPACE) for page_flags in graph.flags)
+        reverse_offsets, sources = graph.reverse_adjacency
+        out_degrees = _count_by_category(graph.offsets, bytes(map(page_codes.__getitem__, graph.targets)))
+        in_degrees = _count_by_category(reverse_offsets, bytes(map(page_codes.__getitem__, sources)))
+        status_buckets: Dict[Optional[int], Sequence[int]] = {}
+        for page, status_code in enumerate(graph.status_codes):
+            status_buckets.setdefault(_from_stored(status_code), array.array("I")).append(page)
+        return LinkIndex(out_degrees, in_degrees, status_buckets)
+
+
+def _count_by_category(offsets: Sequence[int], codes: bytes) -> Dict[str, Sequence[int]]:
+    counts: Dict[str, Sequence[int]] = {category: array.array("I") for category in (DOMAIN, DOMAIN_SPACE, EXTERNAL)}
+    for page in range(len(offsets) - 1):
+        page_codes = codes[offsets[page]:offsets[page + 1]]
+        both = page_codes.count(FROM_DOMAIN | FROM_DOMAIN_SPACE)
+        counts[DOMAIN].append(page_codes.count(FROM_DOMAIN) + both)
+        counts[DOMAIN_SPACE].append(page_codes.count(FROM_DOMAIN_SPACE) + both)
+        counts[EXTERNAL].append(page_codes.count(0))
+    return counts
+
+
+def _to_stored(value: Optional[int]) -> int:
+    return NO_VALUE if value is None else value
+
+
+def _from_stored(value: int) -> Optional[int]:
+    return None if value == NO_VALUE else value
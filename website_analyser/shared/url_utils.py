@@ -1,29 +1,55 @@
+import functools
 import urllib.parse
-from typing import Optional, Tuple
+from typing import Any, Optional, Tuple
 
 import tld
 
+URL_CACHE_SIZE = 2 ** 16
+HOST_CACHE_SIZE = 2 ** 12
 
-class Url:
 
-    def __init__(self, url: str) -> None:
-        self.tld_suffix: Optional[str]
-        self.tld: Optional[str]
-        self.tld_prefix: Optional[str]
-        self.domain: Optional[str]
-        self.protocol_prefix: Optional[str]
-        self.resource_path: Optional[str]
-
-        self.url = url
-        self.tld_suffix, self.tld, self.tld_prefix = tld.parse_tld(url)
-        if self.tld and self.tld_suffix:
-            self.domain = ".".join(map(str, filter(lambda x: bool(x), [self.tld_prefix, self.tld, self.tld_suffix])))
-            self.protocol_prefix, resource_path = self.url.split(self.domain, maxsplit=1)
-            self.resource_path = resource_path.rstrip("/") or None
+class Url:
+    """Immutable, parsed URL. Instances are interned, so constructing a recently seen URL again is a cache lookup."""
+    __slots__ = ("url", "tld_suffix", "tld", "tld_prefix", "domain", "protocol_prefix", "resource_path", "_hash")
+
+    url: str
+    tld_suffix: Optional[str]
+    tld: Optional[str]
+    tld_prefix: Optional[str]
+    domain: Optional[str]
+    protocol_prefix: Optional[str]
+    resource_path: Optional[str]
+
+    def __new__(cls, url: str) -> 'Url':
+        return _intern_url(url)
+
+    @classmethod
+    def _parse(cls, url: str) -> 'Url':
+        self = object.__new__(cls)
+        tld_suffix, tld_, tld_prefix = _split_host(urllib.parse.urlsplit(url).netloc)
+        if tld_ and tld_suffix:
+            domain = ".".join(map(str, filter(lambda x: bool(x), [tld_prefix, tld_, tld_suffix])))
+            protocol_prefix, resource_path = url.split(domain, maxsplit=1)
+            resource_path = resource_path.rstrip("/") or None
         else:
-            self.domain = None
-            self.protocol_prefix = None
-            self.resource_path = None
+            domain = None
+            protocol_prefix = None
+            resource_path = None
+        for name, value in (
+                ("url", url), ("tld_suffix", tld_suffix), ("tld", tld_), ("tld_prefix", tld_prefix), ("domain", domain),
+                ("protocol_prefix", protocol_prefix), ("resource_path", resource_path), ("_hash", hash(url)),
+        ):
+            object.__setattr__(self, name, value)
+        return self
+
+    def __setattr__(self, name: str, value: Any) -> None:
+        raise AttributeError(f"{type(self).__name__} is immutable")
+
+    def __delattr__(self, name: str) -> None:
+        raise AttributeError(f"{type(self).__name__} is immutable")
+
+    def __reduce__(self) -> Tuple[type, Tuple[str]]:
+        return Url, (self.url, )
 
     @property
     def url_base(self) -> Optional[str]:
@@ -35,10 +61,10 @@ class Url:
         return self.tld == other.tld and self.tld_suffix == other.tld_suffix
 
     def __hash__(self) -> int:
-        return hash(self.url)
+        return self._hash
 
     def __eq__(self, other) -> bool:
-        return bool(self.url == other.url)
+        return self is other or bool(self.url == other.url)
 
     def __str__(self) -> str:
         return self.url
@@ -46,6 +72,15 @@ class Url:
     __repr__ = __str__
 
 
+_intern_url = functools.lru_cache(maxsize=URL_CACHE_SIZE)(Url._parse)
+
+
+@functools.lru_cache(maxsize=HOST_CACHE_SIZE)
+def _split_host(netloc: str) -> Tuple[Optional[str], Optional[str], Optional[str]]:
+    """`tld.parse_tld` looks only at the host of a URL, so its result is shared by all URLs with the same netloc."""
+    return tld.parse_tld(f"//{netloc}")
+
+
 def is_uri(url: str, check_attributes: Tuple[str, ...] = ("scheme", "netloc")):
     _parse_url = urllib.parse.urlparse(url)
     return all(map(bool, (getattr(_parse_url, attr_name) for attr_name in check_attributes)))
@@ -14,6 +14,9 @@ class Webpage:
     response_status_code: Optional[int] = dataclasses.field(default=None, compare=False, init=False, repr=False)
     response_content_length: Optional[int] = dataclasses.field(default=None, compare=False, init=False, repr=False)
     linked_webpages: Set['Webpage'] = dataclasses.field(default_factory=set, compare=False, init=False, repr=False)
+    # validators of the response, sent back in conditional requests of the next crawl
+    etag: Optional[str] = dataclasses.field(default=None, compare=False, init=False, repr=False)
+    last_modified: Optional[str] = dataclasses.field(default=None, compare=False, init=False, repr=False)
 
     def __hash__(self) -> int:
         return hash(self.url)
@@ -23,3 +26,7 @@ class Webpage:
 
     def set_response_content_length(self, content_length: Optional[int]) -> None:
         object.__setattr__(self, "response_content_length", content_length)
+
+    def set_validators(self, etag: Optional[str], last_modified: Optional[str]) -> None:
+        object.__setattr__(self, "etag", etag)
+        object.__setattr__(self, "last_modified", last_modified)
@@ -1,11 +1,13 @@
 import dataclasses
 import json
-from typing import List, Any, Dict, Set, Collection
+from typing import IO, Iterable, Iterator, List, Any, Dict, Optional, Set, Collection, Tuple
 
+import website_analyser.shared.canonical
 import website_analyser.shared.url_utils
 import website_analyser.shared.webpage
 
 Webpage = website_analyser.shared.webpage.Webpage
+Canonicalizer = website_analyser.shared.canonical.Canonicalizer
 
 
 @dataclasses.dataclass
@@ -37,29 +39,53 @@ class Website:
             f_h.write(self.to_json())
 
     @staticmethod
-    def load(file_path: str) -> 'Website':
+    def load(file_path: str, canonicalizer: Optional[Canonicalizer] = None) -> 'Website':
         with open(file_path, "r") as f_h:
-            json_structure = json.loads(f_h.read())
-        site_to_links: Dict[Webpage, Set[str]] = {}
-        for page_json in json_structure:
-            site = Webpage(
-                url=website_analyser.shared.url_utils.Url(page_json["url_obj"]),
-                is_in_website_space=page_json["is_in_website_space"],
-                is_accepted_path=page_json["is_accepted_path"],
-                is_from_domain=page_json["is_from_domain"],
-                is_from_domain_space=page_json["is_from_domain_space"],
-            )
-            site.set_response_status_code(page_json["response_status_code"])
-            site.set_response_content_length(page_json["response_content_length"])
-            site_to_links[site] = set(page_json.get("linked_webpages", []))
-        structure: Set[website_analyser.shared.webpage.Webpage] = set(site_to_links.keys())
-        for site, links in site_to_links.items():
-            site.linked_webpages.update({linked for linked in structure if linked.url.url in links})
-        return Website(structure)
+            return Website.from_records(iter_json_array(f_h), canonicalizer)
+
+    @staticmethod
+    def load_json_lines(file_path: str, canonicalizer: Optional[Canonicalizer] = None) -> 'Website':
+        with open(file_path, "r") as f_h:
+            return Website.from_records(iter_json_lines(f_h), canonicalizer)
+
+    @staticmethod
+    def from_records(records: Iterable[Dict[str, Any]], canonicalizer: Optional[Canonicalizer] = None) -> 'Website':
+        """With a canonicalizer, records of URLs with the same canonical form are merged, with links of all of them."""
+        url_to_webpage: Dict[str, Webpage] = {}
+        webpage_links: List[Tuple[Webpage, List[str]]] = []
+        for page_json in records:
+            links = page_json.get("linked_webpages", [])
+            if canonicalizer is not None:
+                url = canonicalizer.canonicalize(page_json["url_obj"]) or page_json["url_obj"]
+                links = [canonicalizer.canonicalize(link) or link for link in links]
+                if url in url_to_webpage:
+                    webpage_links.append((url_to_webpage[url], links))
+                    continue
+                page_json = {**page_json, "url_obj": url}
+            site = Website.webpage_from_dict(page_json)
+            url_to_webpage[site.url.url] = site
+            webpage_links.append((site, links))
+        for site, links in webpage_links:
+            site.linked_webpages.update(url_to_webpage[link] for link in links if link in url_to_webpage)
+        return Website(set(url_to_webpage.values()))
+
+    @staticmethod
+    def webpage_from_dict(page_json: Dict[str, Any]) -> Webpage:
+        site = Webpage(
+            url=website_analyser.shared.url_utils.Url(page_json["url_obj"]),
+            is_in_website_space=page_json["is_in_website_space"],
+            is_accepted_path=page_json["is_accepted_path"],
+            is_from_domain=page_json["is_from_domain"],
+            is_from_domain_space=page_json["is_from_domain_space"],
+        )
+        site.set_response_status_code(page_json["response_status_code"])
+        site.set_response_content_length(page_json["response_content_length"])
+        site.set_validators(page_json.get("etag"), page_json.get("last_modified"))
+        return site
 
     @staticmethod
     def webpage_to_dict(webpage: Webpage) -> Dict[str, Any]:
-        return {
+        page_json = {
             "url_obj": webpage.url.url,
             "is_from_domain_space": webpage.is_from_domain_space,
             "is_from_domain": webpage.is_from_domain,
@@ -69,3 +95,60 @@ class Website:
             "response_content_length": webpage.response_content_length,
             "linked_webpages": [page.url.url for page in webpage.linked_webpages],
         }
+        # written only when known, so structures of servers without validators look as they used to
+        if webpage.etag is not None:
+            page_json["etag"] = webpage.etag
+        if webpage.last_modified is not None:
+            page_json["last_modified"] = webpage.last_modified
+        return page_json
+
+
+def iter_json_array(f_h: IO[str], chunk_size: int = 2 ** 16) -> Iterator[Any]:
+    """Yields elements of a top level JSON array one by one, reading the file in chunks."""
+    decoder = json.JSONDecoder()
+    buffer = ""
+    position = 0
+    is_array_open = False
+    while True:
+        while position < len(buffer) and (buffer[position].isspace() or buffer[position] == ","):
+            position += 1
+        if position < len(buffer):
+            if not is_array_open:
+                if buffer[position] != "[":
+                    raise ValueError("Expected JSON array")
+                is_array_open = True
+                position += 1
+                continue
+            if buffer[position] == "]":
+                return
+            try:
+                element, end = decoder.raw_decode(buffer, position)
+            except json.JSONDecodeError:
+                pass
+            else:
+                if end < len(buffer):
+                    position = end
+                    yield element
+                    continue
+        chunk = f_h.read(chunk_size)
+        if not chunk:
+            if position < len(buffer):
+                element, position = decoder.raw_decode(buffer, position)
+                yield element
+                continue
+            raise ValueError("Unexpected end of JSON array")
+        buffer = buffer[position:] + chunk
+        position = 0
+
+
+def iter_json_lines(f_h: IO[str]) -> Iterator[Any]:
+    """Yields one element per line. An incomplete last line, left by an interrupted writer, is skipped."""
+    for line in f_h:
+        if not line.strip():
+            continue
+        try:
+            yield json.loads(line)
+        except json.JSONDecodeError:
+            if line.endswith("\n"):
+                raise
+            return